@@ -1,11 +1,21 @@
 from fastapi import APIRouter
+from app.core.config import settings
+from app.core.security import password_hasher
+from app.core.startup import startup
+from app.db.mongodb import close_mongo_connection, connect_to_mongo, mongodb
+from app.services.market_snapshot import market_snapshot
+from app.services.peer_stats import peer_stats
+from app.services.prefetch import prefetcher
+from app.services.symbol_search import symbol_search
 from app.api.api_v1.endpoints import (
     auth,
     users,
     stocks,
     screeners,
     trades,
-    portfolio
+    portfolio,
+    quotes,
+    profiling
 )
 
 api_router = APIRouter()
@@ -15,4 +25,47 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(stocks.router, prefix="/stocks", tags=["stocks"])
 api_router.include_router(screeners.router, prefix="/screeners", tags=["screeners"])
 api_router.include_router(trades.router, prefix="/trades", tags=["trades"])
-api_router.include_router(portfolio.router, prefix="/portfolio", tags=["portfolio"]) 
\ No newline at end of file
+api_router.include_router(portfolio.router, prefix="/portfolio", tags=["portfolio"])
+api_router.include_router(quotes.router, prefix="/quotes", tags=["quotes"])
+api_router.include_router(profiling.router, prefix="/admin/profiler", tags=["admin"], include_in_schema=False) 
+
+# Run in the warm-up phase of whichever app mounts these routes, instead of on the
+# first login and the first search
+startup.add_warmup("password_hasher", password_hasher.warm_up)
+startup.add_warmup("symbol_search", symbol_search.rebuild)
+if settings.MARKET_SNAPSHOT_ENABLED:
+    startup.add_warmup("market_snapshot", market_snapshot.refresh)
+
+# The background jobs read MongoDB and the prefetcher counts requests to these routes,
+# so they start and stop with the app that mounts the router: include_router() carries
+# these hooks over to it
+_connected_here = False
+
+async def start_services() -> None:
+    global _connected_here
+    # An app (or benchmark) that already connected, possibly to a stand-in, keeps its client
+    if mongodb.client is None:
+        await connect_to_mongo()
+        _connected_here = True
+    if settings.PEER_STATS_ENABLED:
+        peer_stats.start()
+    if settings.MARKET_SNAPSHOT_ENABLED:
+        market_snapshot.start()
+    # Not a warm-up: within its call budget a full pass can take minutes, and nothing
+    # needs it to finish before serving
+    if settings.PREFETCH_ENABLED:
+        prefetcher.start()
+    # A no-op when the app's own startup hook already began it
+    startup.begin_warm_up()
+
+async def stop_services() -> None:
+    global _connected_here
+    await peer_stats.stop()
+    await market_snapshot.stop()
+    await prefetcher.stop()
+    if _connected_here:
+        await close_mongo_connection()
+        _connected_here = False
+
+api_router.add_event_handler("startup", start_services)
+api_router.add_event_handler("shutdown", stop_services)
@@ -2,7 +2,7 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.core.security import create_access_token, password_hasher
 from app.core.config import settings
 from app.models.user import User, UserCreate
 from app.db.mongodb import mongodb
@@ -15,7 +15,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
     OAuth2 compatible token login, get an access token for future requests
     """
     user = await mongodb.get_collection("users").find_one({"email": form_data.username})
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    if not user or not await password_hasher.verify(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -57,7 +57,7 @@ async def register(user_in: UserCreate) -> Any:
     
     # Create new user
     user_dict = user_in.dict()
-    user_dict["hashed_password"] = get_password_hash(user_in.password)
+    user_dict["hashed_password"] = await password_hasher.hash(user_in.password)
     del user_dict["password"]
     
     result = await mongodb.get_collection("users").insert_one(user_dict)
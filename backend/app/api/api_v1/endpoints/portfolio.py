@@ -1,9 +1,15 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
-from app.api.deps import get_current_active_user
+import asyncio
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
+from app.api.deps import get_current_active_user, get_websocket_user
+from app.core.config import settings
+from app.core.responses import MongoJSONResponse
 from app.models.user import User
 from app.models.trade import Portfolio
 from app.services.alpha_vantage import alpha_vantage
+from app.services.performance import performance_service
+from app.services.risk import risk_service
+from app.services.valuation import ValuationSubscriber, valuation_service
 from app.db.mongodb import mongodb
 from datetime import datetime
 
@@ -14,43 +20,69 @@ async def get_portfolio(
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
-    Get user's portfolio
+    Get user's portfolio, valued from the in-memory mark-to-market state
     """
-    portfolio = await mongodb.get_collection("portfolios").find_one(
-        {"user_id": str(current_user.id)}
-    )
-    
-    if not portfolio:
-        # Create new portfolio if it doesn't exist
-        portfolio = {
-            "user_id": str(current_user.id),
-            "holdings": {},
-            "cash_balance": current_user.virtual_capital,
-            "total_value": current_user.virtual_capital,
-            "last_updated": datetime.utcnow()
-        }
-        await mongodb.get_collection("portfolios").insert_one(portfolio)
+    user_id = str(current_user.id)
+    valuation = valuation_service.get(user_id)
+    if valuation is None:
+        portfolio = await mongodb.get_collection("portfolios").find_one({"user_id": user_id})
+        
+        if not portfolio:
+            # Create new portfolio if it doesn't exist
+            portfolio = {
+                "user_id": user_id,
+                "holdings": {},
+                "cash_balance": current_user.virtual_capital,
+                "total_value": current_user.virtual_capital,
+                "last_updated": datetime.utcnow()
+            }
+            await mongodb.get_collection("portfolios").insert_one(portfolio)
+        
+        valuation = await valuation_service.activate(portfolio)
     
-    # Update portfolio value with current prices
-    total_value = portfolio["cash_balance"]
-    for symbol, quantity in portfolio["holdings"].items():
-        quote = await alpha_vantage.get_quote(symbol)
-        if "Error Message" not in quote:
-            price = float(quote["Global Quote"]["05. price"])
-            total_value += price * quantity
+    return Portfolio(**valuation.to_dict())
+
+@router.websocket("/ws")
+async def portfolio_websocket(
+    websocket: WebSocket,
+    current_user: User = Depends(get_websocket_user)
+) -> None:
+    """
+    Push the user's portfolio valuation whenever a held symbol ticks
+    """
+    user_id = str(current_user.id)
+    await websocket.accept()
+    if valuation_service.get(user_id) is None:
+        portfolio = await mongodb.get_collection("portfolios").find_one({"user_id": user_id})
+        if not portfolio:
+            await websocket.close(code=1008)
+            return
+        await valuation_service.activate(portfolio)
     
-    portfolio["total_value"] = total_value
-    portfolio["last_updated"] = datetime.utcnow()
+    async def send(message: Dict[str, Any]) -> None:
+        await websocket.send_text(MongoJSONResponse(message).body.decode())
     
-    # Update portfolio in database
-    await mongodb.get_collection("portfolios").update_one(
-        {"user_id": str(current_user.id)},
-        {"$set": portfolio}
-    )
+    async def wait_for_disconnect() -> None:
+        while True:
+            await websocket.receive_text()
     
-    return Portfolio(**portfolio)
+    subscriber = ValuationSubscriber(send)
+    valuation_service.subscribe(user_id, subscriber)
+    reader = asyncio.create_task(wait_for_disconnect())
+    writer = asyncio.create_task(subscriber.run(settings.QUOTE_STREAM_SEND_TIMEOUT_SECONDS))
+    try:
+        done, pending = await asyncio.wait({reader, writer}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if isinstance(task.exception(), asyncio.TimeoutError):
+                await websocket.close(code=1013)
+    finally:
+        valuation_service.unsubscribe(user_id, subscriber)
+        reader.cancel()
+        writer.cancel()
 
-@router.get("/holdings")
+@router.get("/holdings", response_class=MongoJSONResponse)
 async def get_holdings(
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -62,7 +94,7 @@ async def get_holdings(
     )
     
     if not portfolio:
-        return {"holdings": []}
+        return MongoJSONResponse({"holdings": []})
     
     holdings = []
     for symbol, quantity in portfolio["holdings"].items():
@@ -94,7 +126,7 @@ async def get_holdings(
                 "unrealized_pnl": market_value - (avg_price * quantity) if avg_price > 0 else 0
             })
     
-    return {"holdings": holdings}
+    return MongoJSONResponse({"holdings": holdings})
 
 @router.get("/performance")
 async def get_performance(
@@ -130,4 +162,48 @@ async def get_performance(
         "invested_amount": invested_amount,
         "unrealized_pnl": unrealized_pnl,
         "return_percentage": return_percentage
-    } 
\ No newline at end of file
+    } 
+
+@router.get("/performance/history", response_class=MongoJSONResponse)
+async def get_performance_history(
+    days: int = Query(365, ge=1, le=3650),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Daily equity curve replayed from executed trades and stored closes
+    """
+    user_id = str(current_user.id)
+    curve = await performance_service.equity_curve(user_id, current_user.virtual_capital, days)
+    
+    # Stored snapshots end at the last completed day; today comes from the live valuation
+    valuation = valuation_service.get(user_id)
+    if valuation is not None:
+        curve.append({
+            "date": datetime.utcnow().strftime("%Y-%m-%d"),
+            "value": round(valuation.total_value, 2)
+        })
+    
+    return MongoJSONResponse(curve)
+
+@router.get("/risk", response_class=MongoJSONResponse)
+async def get_portfolio_risk(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Volatility, beta, Sharpe/Sortino, VaR/CVaR and holdings correlation
+    """
+    user_id = str(current_user.id)
+    valuation = valuation_service.get(user_id)
+    if valuation is not None:
+        portfolio = valuation.to_dict()
+    else:
+        portfolio = await mongodb.get_collection("portfolios").find_one(
+            {"user_id": user_id},
+            {"user_id": 1, "holdings": 1, "cash_balance": 1}
+        )
+    
+    if not portfolio or not any(portfolio.get("holdings", {}).values()):
+        raise HTTPException(status_code=404, detail="Portfolio has no holdings")
+    
+    results = await risk_service.portfolio_risk([portfolio])
+    return MongoJSONResponse(results[user_id])
@@ -0,0 +1,85 @@
+import hmac
+import threading
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.profiling import profiler
+
+router = APIRouter()
+
+def require_profiler_access(request: Request) -> None:
+    """
+    Profiling is for operators only: it must be enabled and the caller must present the
+    shared profiling token. Anything else looks like a route that does not exist.
+    """
+    supplied = request.headers.get(settings.PROFILING_HEADER, "")
+    if not (settings.PROFILING_ENABLED and settings.PROFILING_TOKEN
+            and hmac.compare_digest(supplied.encode(), settings.PROFILING_TOKEN.encode())):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@router.get("/status", dependencies=[Depends(require_profiler_access)])
+async def profiler_status() -> Any:
+    """
+    Whether the on-demand profiler is running, the last finished session and the ids of
+    recently profiled requests
+    """
+    return profiler.status()
+
+@router.post("/start", dependencies=[Depends(require_profiler_access)])
+async def start_profiler(
+    interval_ms: float = Query(None, gt=0, le=1000),
+    max_seconds: float = Query(None, gt=0)
+) -> Any:
+    """
+    Start sampling the event loop thread. Sampling stops counting after `max_seconds`
+    (capped by PROFILING_MAX_SECONDS) even if nobody calls /stop.
+    """
+    interval = (interval_ms or settings.PROFILING_INTERVAL_MS) / 1000
+    limit = min(max_seconds or settings.PROFILING_MAX_SECONDS, settings.PROFILING_MAX_SECONDS)
+    try:
+        session = profiler.start(interval, limit, threading.get_ident())
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.summary()
+
+@router.post("/stop", response_class=PlainTextResponse, dependencies=[Depends(require_profiler_access)])
+async def stop_profiler() -> Any:
+    """
+    Stop the on-demand profiler and return its collapsed stacks (`frame;frame;frame count`
+    per line), ready for flamegraph.pl or speedscope
+    """
+    try:
+        session = profiler.stop()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(session.collapsed())
+
+@router.get("/last", response_class=PlainTextResponse, dependencies=[Depends(require_profiler_access)])
+async def last_profile() -> Any:
+    """
+    Collapsed stacks of the last finished on-demand session
+    """
+    if profiler.last is None:
+        raise HTTPException(status_code=404, detail="No finished profile")
+    return PlainTextResponse(profiler.last.collapsed())
+
+@router.get("/requests/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_profiler_access)])
+async def request_profile(profile_id: str) -> Any:
+    """
+    Collapsed stacks for a request profiled through the X-Profile header; the id is the
+    X-Profile-Id response header of that request
+    """
+    session = profiler.requests.get(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(session.collapsed())
+
+@router.get("/loop-stalls", dependencies=[Depends(require_profiler_access)])
+async def loop_stalls() -> Any:
+    """
+    Recent event loop stalls caught by the lag watchdog, each with the blocked task and
+    the loop thread's stack at the time
+    """
+    return loop_monitor.stats()
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Dict
+import orjson
+from fastapi import APIRouter, Depends, WebSocket
+from app.api.deps import get_websocket_user
+from app.core.config import settings
+from app.models.user import User
+from app.services.quote_stream import QuoteSubscriber, quote_hub
+
+router = APIRouter()
+
+async def _read_commands(websocket: WebSocket, subscriber: QuoteSubscriber) -> None:
+    while True:
+        message = orjson.loads(await websocket.receive_text())
+        action = message.get("action")
+        symbols = [str(symbol).upper() for symbol in message.get("symbols", [])]
+        refused = []
+        if action == "subscribe":
+            room = settings.QUOTE_STREAM_MAX_SYMBOLS - len(subscriber.symbols)
+            refused = quote_hub.subscribe(subscriber, symbols[:max(room, 0)])
+        elif action == "unsubscribe":
+            quote_hub.unsubscribe(subscriber, symbols)
+        await websocket.send_text(orjson.dumps({
+            "type": "subscriptions",
+            "symbols": sorted(subscriber.symbols),
+            # Not polled because the server already polls its maximum of distinct symbols
+            "refused": refused
+        }).decode())
+
+@router.websocket("/ws")
+async def quotes_websocket(
+    websocket: WebSocket,
+    current_user: User = Depends(get_websocket_user)
+) -> None:
+    """
+    Push quote updates for a set of symbols.
+    Send `{"action": "subscribe" | "unsubscribe", "symbols": [...]}`;
+    updates arrive as `{"type": "quotes", "data": [tick, ...]}` with only the latest tick per symbol.
+    Each command is answered with the connection's subscriptions and the symbols refused
+    because the server already polls QUOTE_HUB_MAX_SYMBOLS distinct symbols.
+    """
+    await websocket.accept()
+
+    async def send(message: Dict[str, Any]) -> None:
+        await websocket.send_text(orjson.dumps(message).decode())
+
+    subscriber = QuoteSubscriber(send)
+    reader = asyncio.create_task(_read_commands(websocket, subscriber))
+    writer = asyncio.create_task(subscriber.run(settings.QUOTE_STREAM_SEND_TIMEOUT_SECONDS))
+    try:
+        # Either side ending (disconnect, bad message, stalled client) ends the connection
+        done, pending = await asyncio.wait({reader, writer}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if isinstance(task.exception(), asyncio.TimeoutError):
+                await websocket.close(code=1013)
+    finally:
+        quote_hub.unsubscribe(subscriber)
+        reader.cancel()
+        writer.cancel()
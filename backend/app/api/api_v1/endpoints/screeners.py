@@ -1,9 +1,15 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from app.api.deps import get_current_active_user
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from app.api.deps import get_current_active_user, object_id, pinned_snapshot
+from app.core.config import settings
+from app.core.responses import MongoJSONResponse, model_projection
+from app.core.streaming import iter_batches, iter_chunks, negotiate_stream_format, streaming_response
 from app.models.user import User
 from app.models.screener import Screener, ScreenerCreate, ScreenerUpdate, ScreeningRule
+from app.models.stock import Stock
 from app.services.alpha_vantage import alpha_vantage
+from app.services.market_snapshot import SNAPSHOT_VERSION_HEADER, MarketSnapshot
+from app.services.stock_store import stock_store
 from app.db.mongodb import mongodb
 from datetime import datetime
 
@@ -25,7 +31,7 @@ async def create_screener(
     
     return Screener(**screener_dict)
 
-@router.get("/", response_model=List[Screener])
+@router.get("/", response_model=List[Screener], response_class=MongoJSONResponse)
 async def list_screeners(
     skip: int = 0,
     limit: int = 100,
@@ -35,12 +41,13 @@ async def list_screeners(
     List user's screeners
     """
     screeners = await mongodb.get_collection("screeners").find(
-        {"user_id": str(current_user.id)}
+        {"user_id": str(current_user.id)},
+        model_projection(Screener)
     ).skip(skip).limit(limit).to_list(length=limit)
     
-    return [Screener(**screener) for screener in screeners]
+    return MongoJSONResponse(screeners)
 
-@router.get("/{screener_id}", response_model=Screener)
+@router.get("/{screener_id}", response_model=Screener, response_class=MongoJSONResponse)
 async def get_screener(
     screener_id: str,
     current_user: User = Depends(get_current_active_user)
@@ -49,14 +56,14 @@ async def get_screener(
     Get a specific screener
     """
     screener = await mongodb.get_collection("screeners").find_one({
-        "_id": screener_id,
+        "_id": object_id(screener_id),
         "user_id": str(current_user.id)
-    })
+    }, model_projection(Screener))
     
     if not screener:
         raise HTTPException(status_code=404, detail="Screener not found")
     
-    return Screener(**screener)
+    return MongoJSONResponse(screener)
 
 @router.put("/{screener_id}", response_model=Screener)
 async def update_screener(
@@ -68,7 +75,7 @@ async def update_screener(
     Update a screener
     """
     screener = await mongodb.get_collection("screeners").find_one({
-        "_id": screener_id,
+        "_id": object_id(screener_id),
         "user_id": str(current_user.id)
     })
     
@@ -77,11 +84,11 @@ async def update_screener(
     
     update_data = screener_in.dict(exclude_unset=True)
     await mongodb.get_collection("screeners").update_one(
-        {"_id": screener_id},
+        {"_id": object_id(screener_id)},
         {"$set": update_data}
     )
     
-    updated_screener = await mongodb.get_collection("screeners").find_one({"_id": screener_id})
+    updated_screener = await mongodb.get_collection("screeners").find_one({"_id": object_id(screener_id)})
     return Screener(**updated_screener)
 
 @router.delete("/{screener_id}")
@@ -93,7 +100,7 @@ async def delete_screener(
     Delete a screener
     """
     result = await mongodb.get_collection("screeners").delete_one({
-        "_id": screener_id,
+        "_id": object_id(screener_id),
         "user_id": str(current_user.id)
     })
     
@@ -102,72 +109,117 @@ async def delete_screener(
     
     return {"message": "Screener deleted successfully"}
 
+def _field_value(stock: dict, field: str) -> Any:
+    """A rule field's value; dotted paths such as peers.sector.pe_ratio.pct reach nested fields"""
+    value: Any = stock
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    if value is None and "." not in field:
+        # Statement-derived ratios (roe, debt_equity, ...) live under financial_metrics
+        value = (stock.get("financial_metrics") or {}).get(field)
+    return value
+
+def _matches_rules(stock: dict, rules: List[dict]) -> bool:
+    for rule in rules:
+        field = rule["field"]
+        operator = rule["operator"]
+        value = rule["value"]
+        
+        stock_value = _field_value(stock, field)
+        if stock_value is None:
+            return False
+        
+        if operator == "<":
+            if not (stock_value < value):
+                return False
+        elif operator == ">":
+            if not (stock_value > value):
+                return False
+        elif operator == "==":
+            if not (stock_value == value):
+                return False
+        elif operator == "!=":
+            if not (stock_value != value):
+                return False
+    return True
+
+async def _record_screener_run(screener_id: str, results_count: int) -> None:
+    await mongodb.get_collection("screeners").update_one(
+        {"_id": object_id(screener_id)},
+        {
+            "$set": {
+                "last_run": datetime.utcnow(),
+                "results_count": results_count
+            }
+        }
+    )
+
 @router.post("/{screener_id}/run")
 async def run_screener(
     screener_id: str,
+    request: Request,
+    snapshot: Optional[MarketSnapshot] = Depends(pinned_snapshot),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
-    Run a screener and get matching stocks
+    Run a screener and get matching stocks.
+    Send `Accept: application/x-ndjson` or `Accept: application/vnd.apache.arrow.stream`
+    to stream matches as they are found instead of building one JSON document.
+    With an in-memory market snapshot loaded, rules are evaluated column-wise against
+    it and the response carries its version in X-Snapshot-Version.
     """
     screener = await mongodb.get_collection("screeners").find_one({
-        "_id": screener_id,
+        "_id": object_id(screener_id),
         "user_id": str(current_user.id)
     })
     
     if not screener:
         raise HTTPException(status_code=404, detail="Screener not found")
     
-    # Get all stocks from database
-    stocks = await mongodb.get_collection("stocks").find().to_list(length=None)
+    rules = screener["rules"]
+    stream_format = negotiate_stream_format(request)
+    if snapshot is not None:
+        matching_stocks = snapshot.rows(snapshot.select(rules))
+        await _record_screener_run(screener_id, len(matching_stocks))
+        if stream_format:
+            response = streaming_response(iter_chunks(matching_stocks), stream_format, row_model=Stock)
+        else:
+            response = MongoJSONResponse({
+                "screener_id": screener_id,
+                "results_count": len(matching_stocks),
+                "snapshot_version": snapshot.version,
+                "stocks": matching_stocks
+            })
+        response.headers[SNAPSHOT_VERSION_HEADER] = snapshot.version
+        return response
     
-    # Apply screening rules
-    matching_stocks = []
-    for stock in stocks:
-        matches = True
-        for rule in screener["rules"]:
-            field = rule["field"]
-            operator = rule["operator"]
-            value = rule["value"]
-            
-            stock_value = stock.get(field)
-            if stock_value is None:
-                matches = False
-                break
-            
-            if operator == "<":
-                if not (stock_value < value):
-                    matches = False
-                    break
-            elif operator == ">":
-                if not (stock_value > value):
-                    matches = False
-                    break
-            elif operator == "==":
-                if not (stock_value == value):
-                    matches = False
-                    break
-            elif operator == "!=":
-                if not (stock_value != value):
-                    matches = False
-                    break
+    # Compact stock documents only; bars and statements live in their own collections
+    cursor = stock_store.find_stocks().batch_size(settings.STREAM_BATCH_SIZE)
+    
+    if stream_format:
+        async def matching_batches():
+            results_count = 0
+            async for batch in iter_batches(cursor):
+                matched = [stock for stock in batch if _matches_rules(stock, rules)]
+                if matched:
+                    results_count += len(matched)
+                    yield matched
+            await _record_screener_run(screener_id, results_count)
         
-        if matches:
+        return streaming_response(matching_batches(), stream_format, row_model=Stock)
+    
+    # Apply screening rules while reading the cursor so non-matching stocks are dropped early
+    matching_stocks = []
+    async for stock in cursor:
+        if _matches_rules(stock, rules):
             matching_stocks.append(stock)
     
-    # Update screener with results
-    await mongodb.get_collection("screeners").update_one(
-        {"_id": screener_id},
-        {
-            "$set": {
-                "last_run": datetime.utcnow(),
-                "results_count": len(matching_stocks)
-            }
-        }
-    )
+    await _record_screener_run(screener_id, len(matching_stocks))
     
-    return {
+    return MongoJSONResponse({
         "screener_id": screener_id,
         "results_count": len(matching_stocks),
         "stocks": matching_stocks
-    } 
\ No newline at end of file
+    })
\ No newline at end of file
@@ -1,9 +1,22 @@
+from datetime import date, datetime
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.core.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from app.core.responses import MongoJSONResponse
+from app.core.streaming import iter_chunks, negotiate_stream_format, streaming_response
 from app.models.user import User
-from app.models.stock import Stock, StockCreate, StockUpdate
+from app.models.stock import DailyBar, Stock, StockCreate, StockUpdate
 from app.services.alpha_vantage import alpha_vantage
+from app.services.auth_cache import auth_cache
+from app.services.fundamentals import fundamentals
+from app.services.peer_stats import peer_stats
+from app.services.prefetch import prefetcher
+from app.services.price_history import price_history, to_rows
+from app.services.stock_store import stock_store
+from app.services.symbol_search import symbol_search
 from app.db.mongodb import mongodb
 
 router = APIRouter()
@@ -11,13 +24,14 @@ router = APIRouter()
 @router.get("/search")
 async def search_stocks(
     query: str,
+    limit: int = Query(settings.SYMBOL_SEARCH_LIMIT, ge=1, le=50),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
-    Search for stocks by symbol or company name
+    Search for stocks by symbol or company name.
+    Served from the local symbol index; ranked exact, then prefix, then fuzzy matches.
     """
-    results = await alpha_vantage.search_symbols(query)
-    return results
+    return await symbol_search.search(query, limit)
 
 @router.get("/{symbol}")
 async def get_stock(
@@ -31,6 +45,7 @@ async def get_stock(
     quote = await alpha_vantage.get_quote(symbol)
     if "Error Message" in quote:
         raise HTTPException(status_code=404, detail="Stock not found")
+    prefetcher.record(symbol)
     
     # Get company overview
     overview = await alpha_vantage.get_company_overview(symbol)
@@ -43,6 +58,10 @@ async def get_stock(
     # Get historical data
     historical = await alpha_vantage.get_daily_adjusted(symbol)
     
+    # Precomputed sector / industry comparison (see peer_stats)
+    stock = await stock_store.get_stock(symbol, ["sector", "industry", "peers"])
+    peers = await peer_stats.compare(stock) if stock else {}
+    
     return {
         "quote": quote,
         "overview": overview,
@@ -51,41 +70,124 @@ async def get_stock(
             "balance_sheet": balance_sheet,
             "cash_flow": cash_flow
         },
-        "historical_data": historical
+        "historical_data": historical,
+        "peers": peers
     }
 
 @router.get("/{symbol}/historical")
 async def get_historical_data(
     symbol: str,
+    request: Request,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: str = Query("daily", regex="^(daily|weekly|monthly)$"),
     outputsize: str = Query("compact", regex="^(compact|full)$"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
+    method: str = Query("lttb", regex="^(lttb|minmax)$"),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
-    Get historical price data for a stock
+    Get historical price data for a stock, oldest bar first.
+    Served from stored daily bars, which are brought up to date with small compact
+    fetches. Filter with `start`/`end` and roll up with `interval=weekly|monthly`;
+    without a range, `compact` returns the last HISTORICAL_COMPACT_POINTS bars.
+    `max_points` thins the bars for charting, keeping the shape of the close series
+    (`method=lttb`, Largest-Triangle-Three-Buckets) or each bucket's extremes (`minmax`).
+    Send `Accept: application/x-ndjson` or `Accept: application/vnd.apache.arrow.stream`
+    to receive one typed row per bar in batches.
     """
-    data = await alpha_vantage.get_daily_adjusted(symbol, outputsize)
-    if "Error Message" in data:
+    symbol = symbol.upper()
+    stream_format = negotiate_stream_format(request)
+    # Stored bars only change with the sync version. While it is fresh, a revalidation
+    # costs one state read; the sync (and its upstream fetch) only runs once it is stale
+    state = await price_history.state(symbol)
+    if not price_history.is_fresh(state):
+        state = await price_history.sync(symbol)
+    if state is None:
         raise HTTPException(status_code=404, detail="Stock not found")
-    return data
+    prefetcher.record(symbol)
+    
+    etag = make_etag("historical", symbol, state.get("version"), start, end, interval, outputsize, max_points, method, stream_format)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    start_at = datetime.combine(start, datetime.min.time()) if start else None
+    end_at = datetime.combine(end, datetime.min.time()) if end else None
+    limit = settings.HISTORICAL_COMPACT_POINTS if outputsize == "compact" and start is None and end is None else None
+    if max_points:
+        rows = await price_history.chart(symbol, state.get("version"), start_at, end_at, interval, limit, max_points, method)
+    else:
+        rows = list(to_rows(await price_history.load(symbol, start_at, end_at, interval, limit)))
+    
+    if stream_format:
+        response = streaming_response(iter_chunks(rows), stream_format, row_model=DailyBar)
+    else:
+        response = JSONResponse({"symbol": symbol, "interval": interval, "count": len(rows), "bars": rows})
+    set_cache_headers(response, etag)
+    return response
 
 @router.get("/{symbol}/financials")
 async def get_financial_statements(
     symbol: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
     Get financial statements (Income Statement, Balance Sheet, Cash Flow)
     """
+    async def financials_etag() -> Optional[str]:
+        entries = [
+            await alpha_vantage.cached_entry(function, symbol=symbol)
+            for function in ("INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW")
+        ]
+        if any(entry is None for entry in entries):
+            return None
+        return make_etag("financials", symbol, *(entry.fetched_at for entry in entries))
+    
+    prefetcher.record(symbol)
+    etag = await financials_etag()
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    
     income_stmt = await alpha_vantage.get_income_statement(symbol)
     balance_sheet = await alpha_vantage.get_balance_sheet(symbol)
     cash_flow = await alpha_vantage.get_cash_flow(symbol)
     
+    # Statements that were just refetched replace the stored table and ratios
+    if await fundamentals.refresh(symbol) is None:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    
+    etag = await financials_etag()
+    if etag:
+        set_cache_headers(response, etag)
+    
     return {
         "income_statement": income_stmt,
         "balance_sheet": balance_sheet,
         "cash_flow": cash_flow
     }
 
+@router.get("/{symbol}/fundamentals")
+async def get_fundamentals(
+    symbol: str,
+    frequency: str = Query("annual", regex="^(annual|quarterly)$"),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get parsed statement figures and derived ratios (roe, roce, debt_equity,
+    current_ratio, quick_ratio) per fiscal period, column-wise and oldest first
+    """
+    symbol = symbol.upper()
+    if await fundamentals.refresh(symbol) is None:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    table = await fundamentals.get_table(symbol, frequency)
+    # A table without periods has nothing to serve
+    if table is None or not table.get("dates"):
+        raise HTTPException(status_code=404, detail="Stock not found")
+    prefetcher.record(symbol)
+    return MongoJSONResponse(table)
+
 @router.post("/watchlist/add/{symbol}")
 async def add_to_watchlist(
     symbol: str,
@@ -98,9 +200,10 @@ async def add_to_watchlist(
         raise HTTPException(status_code=400, detail="Stock already in watchlist")
     
     await mongodb.get_collection("users").update_one(
-        {"_id": current_user.id},
+        {"email": current_user.email},
         {"$push": {"watchlist": symbol}}
     )
+    await auth_cache.invalidate_user(current_user.email)
     
     return {"message": f"Added {symbol} to watchlist"}
 
@@ -116,8 +219,9 @@ async def remove_from_watchlist(
         raise HTTPException(status_code=400, detail="Stock not in watchlist")
     
     await mongodb.get_collection("users").update_one(
-        {"_id": current_user.id},
+        {"email": current_user.email},
         {"$pull": {"watchlist": symbol}}
     )
+    await auth_cache.invalidate_user(current_user.email)
     
     return {"message": f"Removed {symbol} from watchlist"} 
\ No newline at end of file
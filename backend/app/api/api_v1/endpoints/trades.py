@@ -1,9 +1,11 @@
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, object_id
+from app.core.responses import MongoJSONResponse, model_projection
 from app.models.user import User
 from app.models.trade import Trade, TradeCreate, TradeUpdate, TradeType, TradeStatus
 from app.services.alpha_vantage import alpha_vantage
+from app.services.valuation import valuation_service
 from app.db.mongodb import mongodb
 from datetime import datetime
 
@@ -59,7 +61,7 @@ async def create_trade(
     
     return Trade(**trade_dict)
 
-@router.get("/", response_model=List[Trade])
+@router.get("/", response_model=List[Trade], response_class=MongoJSONResponse)
 async def list_trades(
     skip: int = 0,
     limit: int = 100,
@@ -69,12 +71,13 @@ async def list_trades(
     List user's trades
     """
     trades = await mongodb.get_collection("trades").find(
-        {"user_id": str(current_user.id)}
+        {"user_id": str(current_user.id)},
+        model_projection(Trade)
     ).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
     
-    return [Trade(**trade) for trade in trades]
+    return MongoJSONResponse(trades)
 
-@router.get("/{trade_id}", response_model=Trade)
+@router.get("/{trade_id}", response_model=Trade, response_class=MongoJSONResponse)
 async def get_trade(
     trade_id: str,
     current_user: User = Depends(get_current_active_user)
@@ -83,14 +86,14 @@ async def get_trade(
     Get a specific trade
     """
     trade = await mongodb.get_collection("trades").find_one({
-        "_id": trade_id,
+        "_id": object_id(trade_id),
         "user_id": str(current_user.id)
-    })
+    }, model_projection(Trade))
     
     if not trade:
         raise HTTPException(status_code=404, detail="Trade not found")
     
-    return Trade(**trade)
+    return MongoJSONResponse(trade)
 
 @router.post("/{trade_id}/execute")
 async def execute_trade(
@@ -101,7 +104,7 @@ async def execute_trade(
     Execute a pending trade
     """
     trade = await mongodb.get_collection("trades").find_one({
-        "_id": trade_id,
+        "_id": object_id(trade_id),
         "user_id": str(current_user.id)
     })
     
@@ -120,7 +123,7 @@ async def execute_trade(
     
     # Update trade status and price
     await mongodb.get_collection("trades").update_one(
-        {"_id": trade_id},
+        {"_id": object_id(trade_id)},
         {
             "$set": {
                 "status": TradeStatus.EXECUTED,
@@ -153,19 +156,18 @@ async def execute_trade(
         portfolio["holdings"][trade["symbol"]] = portfolio["holdings"].get(trade["symbol"], 0) - trade["quantity"]
         portfolio["cash_balance"] += current_price * trade["quantity"]
     
-    # Update total value
-    total_value = portfolio["cash_balance"]
-    for symbol, quantity in portfolio["holdings"].items():
-        quote = await alpha_vantage.get_quote(symbol)
-        if "Error Message" not in quote:
-            price = float(quote["Global Quote"]["05. price"])
-            total_value += price * quantity
-    
-    portfolio["total_value"] = total_value
-    
     await mongodb.get_collection("portfolios").update_one(
         {"user_id": str(current_user.id)},
-        {"$set": portfolio}
+        {"$set": {
+            "holdings": portfolio["holdings"],
+            "cash_balance": portfolio["cash_balance"],
+            "last_updated": datetime.utcnow()
+        }}
     )
     
+    # Only positions that were saved reach the live valuation; it re-values them from the
+    # streamed prices instead of re-quoting every holding, and its next snapshot writes
+    # total_value
+    await valuation_service.refresh_positions(portfolio)
+    
     return {"message": "Trade executed successfully"} 
\ No newline at end of file
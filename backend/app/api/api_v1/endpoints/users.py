@@ -0,0 +1,76 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.api.deps import get_current_active_superuser, get_current_active_user, object_id
+from app.core.security import password_hasher
+from app.db.mongodb import mongodb
+from app.models.user import User, UserUpdate
+from app.services.auth_cache import auth_cache
+
+router = APIRouter()
+
+@router.get("/me", response_model=User)
+async def read_current_user(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get the current user
+    """
+    return current_user
+
+@router.put("/me", response_model=User)
+async def update_current_user(
+    user_in: UserUpdate,
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Update the current user's profile
+    """
+    update_data = user_in.dict(exclude_unset=True, exclude={"id"})
+    if "password" in update_data:
+        update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
+    
+    if "email" in update_data and update_data["email"] != current_user.email:
+        if await mongodb.get_collection("users").find_one({"email": update_data["email"]}):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+    
+    if update_data:
+        await mongodb.get_collection("users").update_one(
+            {"email": current_user.email},
+            {"$set": update_data}
+        )
+        await auth_cache.invalidate_user(current_user.email)
+    
+    user = await mongodb.get_collection("users").find_one(
+        {"email": update_data.get("email", current_user.email)}
+    )
+    return User(id=str(user["_id"]), **user)
+
+@router.post("/{user_id}/deactivate")
+async def deactivate_user(
+    user_id: str,
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """
+    Deactivate a user; their existing tokens stop working on the next request
+    """
+    user = await mongodb.get_collection("users").find_one_and_update(
+        {"_id": object_id(user_id)},
+        {"$set": {"is_active": False}}
+    )
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    await auth_cache.invalidate_user(user["email"])
+    return {"message": "User deactivated"}
+
+@router.get("/auth-cache/stats")
+async def get_auth_cache_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """
+    Token and user cache statistics, including database reads saved per request
+    """
+    return auth_cache.stats()
@@ -1,5 +1,6 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import AsyncIterator, Generator, Optional
+from bson import ObjectId
+from fastapi import Depends, HTTPException, Query, WebSocketException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -7,32 +8,51 @@ from app.core.config import settings
 from app.core.security import verify_token
 from app.db.mongodb import mongodb
 from app.models.user import User
+from app.services.auth_cache import auth_cache
+from app.services.market_snapshot import MarketSnapshot, market_snapshot
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+def object_id(value: str) -> ObjectId:
+    """Parse a document id from the URL; anything that is not an ObjectId cannot exist"""
+    if not ObjectId.is_valid(value):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return ObjectId(value)
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    try:
-        payload = verify_token(token)
-        if payload is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        email: str = payload.get("sub")
-        if email is None:
+    auth_cache.requests += 1
+    payload = auth_cache.get_payload(token)
+    if payload is None:
+        try:
+            payload = verify_token(token)
+            if payload is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Could not validate credentials",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+        except (jwt.JWTError, ValidationError):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-    except (jwt.JWTError, ValidationError):
+        auth_cache.put_payload(token, payload)
+    
+    email: str = payload.get("sub")
+    if email is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    cached_user = await auth_cache.get_user(email)
+    if cached_user is not None:
+        return cached_user
+    
+    auth_cache.db_reads += 1
+    generation = await auth_cache.user_generation(email)
     user = await mongodb.get_collection("users").find_one({"email": email})
     if not user:
         raise HTTPException(
@@ -41,7 +61,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return User(**user)
+    current_user = User(id=str(user["_id"]), **user)
+    await auth_cache.put_user(email, current_user, generation)
+    return current_user
 
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
@@ -61,4 +83,21 @@ async def get_current_active_superuser(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges"
         )
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+async def get_websocket_user(token: str = Query(...)) -> User:
+    """Authenticate a WebSocket handshake from the ?token= query parameter"""
+    try:
+        user = await get_current_active_user(await get_current_user(token))
+    except HTTPException:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+    return user
+
+async def pinned_snapshot() -> AsyncIterator[Optional[MarketSnapshot]]:
+    """
+    The current market snapshot, pinned until the response has been sent (streamed
+    bodies included) so a refresh mid-request cannot change what the handler reads.
+    None when no snapshot has been built.
+    """
+    with market_snapshot.pin() as snapshot:
+        yield snapshot
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl
 
@@ -11,6 +11,10 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"  # Change this in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
@@ -18,9 +22,136 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "financial_screener"
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    # How long an operation may wait for a free pooled connection before failing; 0 waits forever
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 2000
+    MONGODB_MAX_IDLE_TIME_MS: int = 0
+    # Comma-separated, in order of preference: "zstd,snappy,zlib". zstd needs the
+    # zstandard package and snappy python-snappy; unavailable ones are skipped with a warning
+    MONGODB_COMPRESSORS: str = ""
+    # primary, primaryPreferred, secondary, secondaryPreferred or nearest
+    MONGODB_READ_PREFERENCE: str = "primary"
+    # "majority" or a number of members
+    MONGODB_WRITE_CONCERN: str = "1"
+    MONGODB_JOURNAL: Optional[bool] = None
     
     # Alpha Vantage API
     ALPHA_VANTAGE_API_KEY: str = "your-api-key-here"
+    ALPHA_VANTAGE_CACHE_MAX_ENTRIES: int = 10000
+    QUOTE_CACHE_TTL_SECONDS: int = 60
+    HISTORICAL_CACHE_TTL_SECONDS: int = 3600
+    # Stored daily bars are brought up to date at most this often per symbol
+    HISTORICAL_SYNC_INTERVAL_SECONDS: int = 3600
+    # Trading days in an outputsize=compact reply (and in a compact API response)
+    HISTORICAL_COMPACT_POINTS: int = 100
+    # Decimated (max_points) chart series kept per symbol, version and range
+    HISTORICAL_CHART_CACHE_MAX_ENTRIES: int = 2000
+    FUNDAMENTALS_CACHE_TTL_SECONDS: int = 86400
+    
+    # Cache backend: "memory" (per process, single worker only) or "redis" (shared by
+    # all workers, with cross-worker invalidation over pub/sub)
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_KEY_PREFIX: str = "fs"
+    CACHE_NEAR_TTL_SECONDS: float = 5.0
+    
+    # Server (python main.py); WORKERS > 1 turns off reload and needs CACHE_BACKEND=redis
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    WORKERS: int = 1
+    
+    # Local symbol search
+    SYMBOL_SEARCH_LIMIT: int = 10
+    SYMBOL_INDEX_REFRESH_SECONDS: float = 3600.0
+    
+    # Streaming responses (NDJSON / Arrow IPC)
+    STREAM_BATCH_SIZE: int = 500
+    
+    # Real-time quote stream
+    QUOTE_POLL_INTERVAL_SECONDS: float = 15.0
+    QUOTE_STREAM_SEND_TIMEOUT_SECONDS: float = 10.0
+    QUOTE_STREAM_MAX_SYMBOLS: int = 50
+    # Distinct symbols polled upstream at once across all connections; keeps arbitrary
+    # client subscriptions from spending the Alpha Vantage quota
+    QUOTE_HUB_MAX_SYMBOLS: int = 200
+    
+    # Live portfolio valuation
+    VALUATION_SNAPSHOT_INTERVAL_SECONDS: float = 60.0
+    VALUATION_IDLE_SECONDS: float = 900.0
+    
+    # Portfolio risk analytics
+    RISK_LOOKBACK_DAYS: int = 252
+    RISK_BENCHMARK_SYMBOL: str = "SPY"
+    RISK_FREE_RATE: float = 0.04
+    RISK_VAR_CONFIDENCE: float = 0.95
+    # Cached per-user results and per-universe returns matrices; both are only valid for a day
+    RISK_RESULT_CACHE_MAX_ENTRIES: int = 10000
+    RISK_MATRIX_CACHE_MAX_ENTRIES: int = 32
+    
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESS_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    
+    # Metrics
+    METRICS_ENABLED: bool = True
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    # Fraction of INFO/DEBUG records kept per event name; unlisted events are always kept
+    LOG_SAMPLE_RATES: Dict[str, float] = {"http.request": 0.1}
+    
+    # Sector / industry peer statistics. The scheduler runs in the app that mounts the API
+    # routers (which connects MongoDB) and is off by default;
+    # `python -m app.services.peer_stats full` runs it once instead
+    PEER_STATS_ENABLED: bool = False
+    PEER_STATS_NIGHTLY_HOUR_UTC: int = 2
+    PEER_STATS_INCREMENTAL_SECONDS: float = 900.0
+    PEER_STATS_QUANTILES: List[float] = [0.1, 0.25, 0.5, 0.75, 0.9]
+    
+    # In-memory columnar market snapshot for screener runs, refreshed in the app that
+    # mounts the API routers. Off by default; screeners scan the collection without it
+    MARKET_SNAPSHOT_ENABLED: bool = False
+    MARKET_SNAPSHOT_REFRESH_SECONDS: float = 300.0
+    
+    # Prefetch of popular symbols into the Alpha Vantage cache, run by the app that mounts
+    # the API routers (whose stock endpoints count the requests). Off by default
+    PREFETCH_ENABLED: bool = False
+    PREFETCH_TOP_K: int = 50
+    PREFETCH_INTERVAL_SECONDS: float = 60.0
+    # Upstream calls per minute prefetching may spend; keep it well under the API key's
+    # limit so user requests that miss the cache still get through
+    PREFETCH_CALLS_PER_MINUTE: float = 30.0
+    # Score of one recent request, one watchlist entry and one holding
+    PREFETCH_SOURCE_WEIGHTS: Dict[str, float] = {"requests": 1.0, "watchlists": 5.0, "holdings": 10.0}
+    # Days of request counts kept; each day back counts half as much as the day after
+    PREFETCH_REQUEST_DAYS: int = 7
+    # Refetch an entry once less than this fraction of its TTL is left
+    PREFETCH_REFRESH_AHEAD: float = 0.2
+    # Prefetched entries live TTL * uniform(1 - jitter, 1) so they do not expire together
+    PREFETCH_TTL_JITTER: float = 0.2
+
+    # Cold start: answer 503 (except /ready and /metrics) until the warm-up phase is done
+    READINESS_GATE_ENABLED: bool = True
+
+    # Event loop lag watchdog
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_MS: float = 100.0
+    # A single callback holding the loop longer than this is logged with its stack
+    LOOP_BLOCKED_THRESHOLD_MS: float = 250.0
+    
+    # Sampling profiler (admin only; nothing is installed unless enabled and a token is set)
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_REQUEST_INTERVAL_MS: float = 1.0
+    PROFILING_MAX_SECONDS: float = 300.0
+    # Path prefixes that may be profiled per request via the PROFILING_HEADER header
+    PROFILING_ROUTES: List[str] = ["/api/v1/backtest", "/api/v1/stocks", "/api/v1/screeners"]
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,49 @@
+import hashlib
+from typing import Any
+from fastapi import Request, Response
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the values that identify one version of a representation"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+# Content codings CompressionMiddleware may append to an ETag
+ETAG_CODINGS = ("br", "gzip")
+
+def encoded_etag(etag: str, coding: str) -> str:
+    """ETag of the `coding`-compressed body of the representation tagged `etag`"""
+    return f'{etag[:-1]}-{coding}"'
+
+def _strip_coding(etag: str) -> str:
+    for coding in ETAG_CODINGS:
+        if etag.endswith(f'-{coding}"'):
+            return f'{etag[:-len(coding) - 2]}"'
+    return etag
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of If-None-Match against etag, as RFC 9110 requires for GET. The
+    tags of compressed bodies match too: the 304 carries no body, so which coding the
+    client holds does not matter here.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if _strip_coding(candidate) == etag:
+            return True
+    return False
+
+def set_cache_headers(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["Vary"] = "Accept, Accept-Encoding, Authorization"
+    return response
+
+def not_modified(etag: str) -> Response:
+    return set_cache_headers(Response(status_code=304), etag)
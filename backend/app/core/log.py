@@ -0,0 +1,225 @@
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler
+from typing import Dict, Optional, TextIO
+import orjson
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is logged as a field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "event"}
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, event, message, request id and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                document[key] = value
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(document, default=str).decode()
+
+class ContextFilter(logging.Filter):
+    """Copies the current request id onto the record while still on the request's task"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of records per `event` name (passed as extra={"event": ...}).
+    Warnings and errors are never sampled away.
+    """
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "event", None), 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without formatting them on the event loop.
+    When the queue is full the record is counted and dropped rather than blocking.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message now so later changes to the args do not leak into the log
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogWriter:
+    """
+    Background thread that drains the queue in batches: every record waiting is
+    formatted and written with a single write() and flush(), so a burst of log lines
+    costs one syscall instead of one per line.
+    """
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.Queue, stream: TextIO, formatter: logging.Formatter, max_batch: int = 512):
+        self.queue = log_queue
+        self.stream = stream
+        self.formatter = formatter
+        self.max_batch = max_batch
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(record is self._STOP for record in batch)
+            lines = []
+            for record in batch:
+                if record is self._STOP:
+                    continue
+                try:
+                    lines.append(self.formatter.format(record))
+                except Exception:
+                    lines.append(f"log formatting failed for {record.name}: {record.msg!r}")
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except Exception:
+                    pass
+            if stopping:
+                return
+
+    def stop(self) -> None:
+        """Write everything already queued, then end the thread"""
+        if self._thread is not None:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+_listener: Optional[LogWriter] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+def configure_logging(
+    level: str = "INFO",
+    json_format: bool = True,
+    sample_rates: Optional[Dict[str, float]] = None,
+    queue_size: int = 10000,
+    stream: TextIO = sys.stdout
+) -> NonBlockingQueueHandler:
+    """
+    Route the root logger through a bounded queue to a single writer thread. Callers
+    only pay for building the record; formatting and the write to `stream` happen off
+    the event loop.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    formatter = JSONFormatter() if json_format else logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+    )
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    handler.addFilter(SamplingFilter(sample_rates or {}))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = LogWriter(handler.queue, stream, formatter)
+    _listener.start()
+    _queue_handler = handler
+    return handler
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+
+class RequestIDMiddleware:
+    """
+    Assigns each HTTP request an id (the client's X-Request-ID if it sent one), makes
+    it available to every log record emitted while handling the request, echoes it in
+    the response headers and writes one sampled access-log event.
+    """
+    def __init__(self, app: ASGIApp, header: str = "X-Request-ID") -> None:
+        self.app = app
+        self.header = header
+        self.raw_header = header.lower().encode("latin-1")
+        self.logger = logging.getLogger("app.access")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next(
+            (value.decode("latin-1") for key, value in scope["headers"] if key == self.raw_header),
+            None
+        ) or uuid.uuid4().hex
+        token = request_id_var.set(request_id[:64])
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)[self.header] = request_id_var.get()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            self.logger.info(
+                "%s %s %s", scope["method"], route, status,
+                extra={
+                    "event": "http.request",
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+                }
+            )
+            request_id_var.reset(token)
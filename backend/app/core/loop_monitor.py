@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop heartbeat woke up compared with when it was scheduled",
+    buckets=LAG_BUCKETS
+)
+loop_blocked = registry.counter(
+    "event_loop_blocked_total",
+    "Times the event loop was stuck on one callback for longer than the blocking threshold"
+)
+
+def _describe_task(task: Optional[asyncio.Task]) -> Dict[str, Optional[str]]:
+    if task is None:
+        return {"task": None, "coroutine": None}
+    coro = task.get_coro()
+    return {"task": task.get_name(), "coroutine": getattr(coro, "__qualname__", repr(coro))}
+
+class LoopLagMonitor:
+    """
+    Two halves that watch the event loop from opposite sides:
+
+    - a heartbeat coroutine sleeps `interval` and records how late it woke up in
+      event_loop_lag_seconds; that lateness is time other callbacks held the loop
+    - a watchdog thread checks that the heartbeat keeps advancing. Once it has been
+      stuck for longer than `threshold`, the loop thread is blocked right now, so the
+      thread grabs its current stack and the task that is running. The innermost
+      frames point at the blocking call (bcrypt, a CPU loop, a sync HTTP client).
+
+    Each stall is reported once, however long it lasts.
+    """
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, keep: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._last_beat = 0.0
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None
+
+    def start(self) -> None:
+        """Start on the running loop (call from a startup hook)"""
+        if self._heartbeat is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self._heartbeat = self._loop.create_task(self._beat(), name="loop-lag-heartbeat")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._heartbeat is None:
+            return
+        self._stopping.set()
+        self._heartbeat.cancel()
+        try:
+            await self._heartbeat
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat = None
+        self._watchdog = None
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            loop_lag.observe(max(0.0, now - expected))
+
+    def _watch(self) -> None:
+        reported_beat = None
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stopping.wait(poll):
+            beat = self._last_beat
+            stuck_for = time.monotonic() - beat - self.interval
+            if stuck_for > self.threshold and beat != reported_beat:
+                reported_beat = beat
+                self._report(stuck_for)
+
+    def capture(self) -> List[str]:
+        """Current stack of the loop thread, outermost frame first"""
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return []
+        return [line.rstrip() for line in traceback.format_stack(frame)]
+
+    def _report(self, stuck_for: float) -> None:
+        stack = self.capture()
+        # The loop is blocked inside this task's step, so it cannot change under us
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        stall = {
+            "at": time.time(),
+            "blocked_ms": round(stuck_for * 1000, 1),
+            **_describe_task(task),
+            "stack": stack
+        }
+        self.stalls.append(stall)
+        loop_blocked.inc()
+        logger.warning(
+            "Event loop blocked for %.0f ms in %s", stuck_for * 1000, stall["coroutine"] or "a callback",
+            extra={"event": "loop.blocked", **stall}
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "stalls": list(self.stalls)
+        }
+
+loop_monitor = LoopLagMonitor(settings.LOOP_LAG_INTERVAL_MS / 1000, settings.LOOP_BLOCKED_THRESHOLD_MS / 1000)
@@ -0,0 +1,157 @@
+from typing import Dict, Optional, Sequence
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.http_cache import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+def accepted_codings(accept_encoding: str) -> Dict[str, float]:
+    """Content codings of an Accept-Encoding header with their q-values, lower-cased"""
+    codings: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+def negotiate_coding(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """
+    The coding of `available` (in order of preference) the client rates highest, or
+    None for identity. q=0 rules a coding out; "*" stands for any coding not listed.
+    """
+    codings = accepted_codings(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = codings.get(coding, codings.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+class CompressionMiddleware:
+    """
+    Compress responses of at least minimum_size bytes with brotli or gzip, whichever
+    the client's Accept-Encoding rates higher (brotli on a tie, when the brotli package
+    is installed). A compressed body is a different representation from the identity
+    one, so its ETag gets the coding as a suffix; a 304 keeps the suffixed tag the
+    client revalidated with.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.available = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        coding = negotiate_coding(request_headers.get("Accept-Encoding", ""), self.available)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        if_none_match = request_headers.get("If-None-Match", "")
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                etag = headers.get("etag")
+                if etag is not None and (
+                    headers.get("content-encoding") == coding
+                    or (message["status"] == 304 and encoded_etag(etag, coding) in if_none_match)
+                ):
+                    headers["ETag"] = encoded_etag(etag, coding)
+            await send(message)
+
+        if coding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        else:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        await responder(scope, receive, send_with_etag)
+
+class BrotliResponder:
+    """Brotli counterpart of starlette's GZipResponder"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.send: Send = unattached_send
+        self.initial_message: Message = {}
+        self.started = False
+        self.content_encoding_set = False
+        self.compressor = brotli.Compressor(quality=quality)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_brotli)
+
+    def _set_encoding_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers["Content-Encoding"] = "br"
+        headers.add_vary_header("Accept-Encoding")
+        return headers
+
+    async def send_with_brotli(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the start message until the first body chunk tells us whether to compress
+            self.initial_message = message
+            headers = Headers(raw=self.initial_message["headers"])
+            self.content_encoding_set = "content-encoding" in headers
+        elif message_type == "http.response.body" and self.content_encoding_set:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+        elif message_type == "http.response.body" and not self.started:
+            self.started = True
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+            elif not more_body:
+                body = self.compressor.process(body) + self.compressor.finish()
+                headers = self._set_encoding_headers()
+                headers["Content-Length"] = str(len(body))
+                message["body"] = body
+                await self.send(self.initial_message)
+                await self.send(message)
+            else:
+                headers = self._set_encoding_headers()
+                del headers["Content-Length"]
+                # Flush every chunk so streamed NDJSON rows reach the client promptly
+                message["body"] = self.compressor.process(body) + self.compressor.flush()
+                await self.send(self.initial_message)
+                await self.send(message)
+        elif message_type == "http.response.body":
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if more_body:
+                message["body"] = self.compressor.process(body) + self.compressor.flush()
+            else:
+                message["body"] = self.compressor.process(body) + self.compressor.finish()
+            await self.send(message)
+
+async def unattached_send(message: Message) -> None:
+    raise RuntimeError("send awaitable not set")
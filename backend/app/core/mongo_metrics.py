@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Dict, Tuple
+from pymongo import monitoring
+from app.core.metrics import Counter, Histogram, registry
+
+mongo_command_duration = registry.histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by collection, command and outcome",
+    ("collection", "command", "outcome")
+)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener feeding mongo_command_duration. Registered on the Motor
+    client, so every collection call (including cursor getMore batches) is timed by the
+    driver itself without wrapping each collection method.
+    """
+    def __init__(self, histogram: Histogram = mongo_command_duration):
+        self.histogram = histogram
+        self._collections: Dict[Tuple[object, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        self._collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def _finish(self, event, outcome: str) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        self.histogram.observe(event.duration_micros / 1e6, collection, event.command_name, outcome)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, "error")
+
+mongo_pool_wait = registry.histogram(
+    "mongo_pool_wait_seconds",
+    "Time an operation waited to check a connection out of the MongoDB pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+mongo_pool_checkout_failures = registry.counter(
+    "mongo_pool_checkout_failures_total",
+    "Connection checkouts that failed, by reason (timeout = waitQueueTimeoutMS exceeded)",
+    ("reason",)
+)
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Pool listener for checked-out and open connections per server and checkout wait
+    time. Motor runs each pymongo call on one executor thread, so the checkout started
+    and checked-out events of a single wait arrive on the same thread and can be paired
+    through a thread local.
+    """
+    def __init__(self, wait: Histogram = mongo_pool_wait, failures: Counter = mongo_pool_checkout_failures):
+        self.wait = wait
+        self.failures = failures
+        self.checked_out: Dict[str, int] = {}
+        self.open: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def _adjust(self, counts: Dict[str, int], event, delta: int) -> None:
+        address = self._address(event)
+        with self._lock:
+            counts[address] = counts.get(address, 0) + delta
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            self.wait.observe(time.perf_counter() - started)
+            self._local.started = None
+        self._adjust(self.checked_out, event, 1)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        self._local.started = None
+        self.failures.inc(event.reason)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        self._adjust(self.checked_out, event, -1)
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        self._adjust(self.open, event, 1)
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        self._adjust(self.open, event, -1)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        with self._lock:
+            self.checked_out.pop(self._address(event), None)
+            self.open.pop(self._address(event), None)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+mongo_pool_metrics = MongoPoolMetrics()
+
+registry.gauge(
+    "mongo_pool_checked_out_connections",
+    "MongoDB connections currently checked out of the pool, by server",
+    lambda: [((address,), count) for address, count in list(mongo_pool_metrics.checked_out.items())],
+    ("address",)
+)
+registry.gauge(
+    "mongo_pool_open_connections",
+    "Open MongoDB connections (idle or in use), by server",
+    lambda: [((address,), count) for address, count in list(mongo_pool_metrics.open.items())],
+    ("address",)
+)
@@ -0,0 +1,214 @@
+import hmac
+import logging
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Sequence
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.log import request_id_var
+
+logger = logging.getLogger(__name__)
+
+def collapse_stack(frame, max_depth: int = 128) -> str:
+    """Render a frame and its callers root-first as `module:function;module:function`"""
+    names: List[str] = []
+    while frame is not None and len(names) < max_depth:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        names.append(f"{module}:{getattr(code, 'co_qualname', code.co_name)}")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+class ProfileSession:
+    """Stack counts for one thread, collected while the session is active"""
+
+    def __init__(self, thread_id: int, interval: float, max_seconds: Optional[float] = None, label: str = ""):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.label = label
+        self.started = time.monotonic()
+        self.deadline = self.started + max_seconds if max_seconds else None
+        self.ended: Optional[float] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    @property
+    def duration(self) -> float:
+        return (self.ended or time.monotonic()) - self.started
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format, one `stack count` per line, for flamegraph.pl or speedscope"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "label": self.label,
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "duration_seconds": round(self.duration, 3),
+            "unique_stacks": len(self.stacks),
+            "active": self.ended is None
+        }
+
+class StackSampler:
+    """
+    Sampling profiler: a daemon thread wakes every `interval`, reads the current frame
+    of each profiled thread from sys._current_frames() and counts the collapsed stack.
+    The profiled code is never instrumented, so overhead is one stack walk per sample,
+    and the thread only runs while at least one session is open.
+    """
+    def __init__(self):
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def begin(self, interval: float, thread_id: Optional[int] = None, max_seconds: Optional[float] = None, label: str = "") -> ProfileSession:
+        session = ProfileSession(thread_id or threading.get_ident(), max(interval, 0.0005), max_seconds, label)
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            else:
+                self._wakeup.set()
+        return session
+
+    def end(self, session: ProfileSession) -> ProfileSession:
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+            if session.ended is None:
+                session.ended = time.monotonic()
+        return session
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                sessions = [s for s in self._sessions if s.deadline is None or now < s.deadline]
+                if not self._sessions:
+                    self._thread = None
+                    return
+            if sessions:
+                frames = sys._current_frames()
+                rendered: Dict[int, str] = {}
+                for session in sessions:
+                    if session.thread_id == me:
+                        continue
+                    frame = frames.get(session.thread_id)
+                    if frame is None:
+                        continue
+                    stack = rendered.get(session.thread_id)
+                    if stack is None:
+                        stack = rendered[session.thread_id] = collapse_stack(frame)
+                    session.stacks[stack] += 1
+                    session.samples += 1
+                del frames
+                interval = min(s.interval for s in sessions)
+            else:
+                # Only expired sessions remain; idle until someone ends them or opens another
+                interval = 0.5
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+
+stack_sampler = StackSampler()
+
+class Profiler:
+    """
+    Admin-facing wrapper: one on-demand session over the event loop thread, plus the
+    most recent per-request profiles keyed by request id.
+    """
+    def __init__(self, sampler: StackSampler, keep_requests: int = 50):
+        self.sampler = sampler
+        self.keep_requests = keep_requests
+        self.session: Optional[ProfileSession] = None
+        self.last: Optional[ProfileSession] = None
+        self.requests: "OrderedDict[str, ProfileSession]" = OrderedDict()
+
+    def start(self, interval: float, max_seconds: float, thread_id: Optional[int] = None) -> ProfileSession:
+        if self.session is not None:
+            raise RuntimeError("Profiler is already running")
+        self.session = self.sampler.begin(interval, thread_id, max_seconds, label="on-demand")
+        logger.warning("Sampling profiler started", extra={"event": "profiler.start", "interval_ms": interval * 1000})
+        return self.session
+
+    def stop(self) -> ProfileSession:
+        if self.session is None:
+            raise RuntimeError("Profiler is not running")
+        self.last = self.sampler.end(self.session)
+        self.session = None
+        logger.warning("Sampling profiler stopped", extra={"event": "profiler.stop", "samples": self.last.samples})
+        return self.last
+
+    def record_request(self, request_id: str, session: ProfileSession) -> None:
+        self.requests[request_id] = session
+        self.requests.move_to_end(request_id)
+        while len(self.requests) > self.keep_requests:
+            self.requests.popitem(last=False)
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "running": self.session is not None,
+            "current": self.session.summary() if self.session else None,
+            "last": self.last.summary() if self.last else None,
+            "recent_requests": list(self.requests)
+        }
+
+profiler = Profiler(stack_sampler)
+
+class RequestProfilerMiddleware:
+    """
+    Samples the event loop thread for the lifetime of a single request when it carries
+    `header` with the profiling token and its path starts with one of `routes`. The
+    collapsed stacks are kept under the request id, which is returned in X-Profile-Id.
+
+    Samples cover whatever the loop ran while the request was in flight, so profile
+    under light concurrency or expect frames from neighbouring requests too.
+    Only installed when profiling is enabled; otherwise it is not in the stack at all.
+    An empty token is refused rather than letting anyone trigger sampling.
+    """
+    def __init__(self, app: ASGIApp, token: str, routes: Sequence[str], interval: float, header: str = "X-Profile") -> None:
+        if not token:
+            raise ValueError("Request profiling needs a non-empty PROFILING_TOKEN")
+        self.app = app
+        self.token = token.encode("latin-1")
+        self.routes = tuple(routes)
+        self.interval = interval
+        self.raw_header = header.lower().encode("latin-1")
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        if not scope["path"].startswith(self.routes):
+            return False
+        # Constant-time, so response timing does not leak how much of a guess was right
+        return any(
+            key == self.raw_header and hmac.compare_digest(value, self.token)
+            for key, value in scope["headers"]
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = request_id_var.get()
+        profile_id = request_id if request_id != "-" else f"{time.time_ns():x}"
+        session = stack_sampler.begin(self.interval, label=f"{scope['method']} {scope['path']}")
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.record_request(profile_id, stack_sampler.end(session))
@@ -0,0 +1,40 @@
+import time
+from typing import Any, Dict, Type
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.core.metrics import registry
+
+render_duration = registry.histogram(
+    "response_render_duration_seconds",
+    "Time spent serializing response bodies, by response class",
+    ("response_class",)
+)
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class MongoJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson straight from Mongo documents.
+    ObjectId becomes a string and datetimes are written in ISO 8601, so endpoints
+    can return raw documents without building a pydantic model per row first.
+    """
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        render_duration.observe(time.perf_counter() - started, type(self).__name__)
+        return body
+
+def model_projection(model: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection that returns exactly the fields a response model would keep"""
+    return {field.alias or name: 1 for name, field in model.model_fields.items()}
@@ -0,0 +1,240 @@
+"""
+Cold start: phase timings, the async warm-up phase and the readiness gate.
+
+main.py imports this module before anything else, so the clock starts ahead of
+FastAPI, the settings and the app's models. Phases are seconds since the process
+was created (the interpreter's own start-up included where /proc is available):
+- imported: main.py finished executing, the app and its routes are built
+- started: the startup hooks returned and the server accepts connections
+- warm: every registered warm-up finished
+- first_request: the first request outside the probe paths was answered
+
+Work that is too slow for import time (building indexes, loading the market
+snapshot, loading the bcrypt backend) is registered with add_warmup() and runs
+concurrently once the server is up. Until it has finished ReadinessMiddleware
+answers 503 with Retry-After for everything but the probe paths and /ready reports
+503, so the load balancer only sends traffic to warm instances. A warm-up that fails
+is logged and reported on /ready but does not hold the instance back; whatever it
+would have prepared is then built on first use.
+
+Profile a cold start from the backend directory:
+    python main.py --startup-profile
+runs `python -X importtime -c "import main"` for per-module import times, then
+starts a real server and reports how long it took to answer its first request.
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+Warmup = Callable[[], Awaitable[Any]]
+
+def _process_age() -> float:
+    """Seconds since this process was created; 0 where /proc is not available"""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the command name, which may itself contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return 0.0
+    return max(uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"), 0.0)
+
+class Startup:
+    """Phase clock, warm-up registry and readiness flag of this process"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {"interpreter": round(_process_age(), 4)}
+        self.warmups: Dict[str, Warmup] = {}
+        self.warmup_seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    def elapsed(self) -> float:
+        return self.phases["interpreter"] + time.perf_counter() - self.started
+
+    def mark(self, phase: str) -> None:
+        """Record the first time a phase is reached"""
+        if phase in self.phases:
+            return
+        self.phases[phase] = round(self.elapsed(), 4)
+        logger.info("Startup phase reached", extra={"event": f"startup.{phase}", "seconds": self.phases[phase]})
+
+    def add_warmup(self, name: str, warmup: Warmup) -> None:
+        self.warmups[name] = warmup
+
+    async def _run(self, name: str, warmup: Warmup) -> None:
+        started = time.perf_counter()
+        try:
+            await warmup()
+        except Exception as exc:
+            self.errors[name] = repr(exc)
+            logger.exception("Warm-up failed", extra={"event": "startup.warmup_failed", "warmup": name})
+        finally:
+            self.warmup_seconds[name] = round(time.perf_counter() - started, 4)
+
+    async def warm_up(self) -> None:
+        await asyncio.gather(*(self._run(name, warmup) for name, warmup in self.warmups.items()))
+        self.ready = True
+        self.mark("warm")
+
+    def begin_warm_up(self) -> None:
+        """Called last in the startup hook: the server starts accepting probes while warm-ups run"""
+        self.mark("started")
+        if self._task is None:
+            self._task = asyncio.create_task(self.warm_up(), name="warm-up")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "phases": self.phases,
+            "warmups": {
+                name: {"seconds": self.warmup_seconds.get(name), "error": self.errors.get(name)}
+                for name in self.warmups
+            },
+        }
+
+startup = Startup()
+
+class ReadinessMiddleware:
+    """
+    Sheds requests with 503 and Retry-After until the warm-up phase has finished, so a
+    cold instance is never handed traffic it would serve slowly. Probe paths (the
+    readiness endpoint, metrics) always pass. With gate=False nothing is shed and the
+    middleware only records the first request.
+    """
+    def __init__(self, app: ASGIApp, startup: Startup = startup, probe_paths: Sequence[str] = ("/ready", "/metrics"),
+                 gate: bool = True, retry_after: int = 1) -> None:
+        self.app = app
+        self.startup = startup
+        self.probe_paths = frozenset(probe_paths)
+        self.gate = gate
+        self.body = orjson.dumps({"detail": "Warming up, retry shortly"})
+        self.headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self.body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.probe_paths:
+            await self.app(scope, receive, send)
+            return
+        if self.gate and not self.startup.ready:
+            await send({"type": "http.response.start", "status": 503, "headers": self.headers})
+            await send({"type": "http.response.body", "body": self.body})
+            return
+        await self.app(scope, receive, send)
+        if "first_request" not in self.startup.phases:
+            self.startup.mark("first_request")
+
+def _package(module: str) -> str:
+    """Grouping key for import times: the top-level package, or app.<layer> for our own modules"""
+    parts = module.split(".")
+    return ".".join(parts[:2]) if parts[0] == "app" else parts[0]
+
+def import_profile(module: str = "main", top: int = 20) -> Dict[str, Any]:
+    """Per-module import times of a fresh interpreter importing `module`, from -X importtime"""
+    import subprocess
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    modules: List[Dict[str, Any]] = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not own.strip().isdigit():
+            continue  # the column header
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        entry = {"module": name, "self": int(own) / 1e6, "cumulative": int(cumulative) / 1e6}
+        modules.append(entry)
+        if depth == 0:
+            total += entry["cumulative"]
+
+    packages: Dict[str, float] = {}
+    for entry in modules:
+        group = _package(entry["module"])
+        packages[group] = packages.get(group, 0.0) + entry["self"]
+    return {
+        "total_seconds": round(total, 4),
+        "modules": len(modules),
+        "packages": [
+            {"package": name, "seconds": round(seconds, 4)}
+            for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        "slowest": sorted(modules, key=lambda entry: -entry["self"])[:top],
+    }
+
+def _free_port() -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def first_request_profile(app: str = "main:app", path: str = "/", timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Start a server in a new process and poll `path` until it answers 200. Returns the
+    wall time from spawning the process to that first response, and the server's own
+    phase timings from /ready.
+    """
+    # Only needed for profiling; urllib.request alone loads http.client and ssl
+    import subprocess
+    import urllib.error
+    import urllib.request
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    attempts = {"refused": 0, "warming": 0}
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"No successful response from {app} within {timeout}s")
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode} before answering")
+            try:
+                with urllib.request.urlopen(base + path, timeout=timeout) as response:
+                    response.read()
+                break
+            except urllib.error.HTTPError as exc:
+                if exc.code != 503:
+                    raise
+                attempts["warming"] += 1
+            except (urllib.error.URLError, ConnectionError):
+                attempts["refused"] += 1
+            time.sleep(0.005)
+        first_response = time.perf_counter() - started
+        with urllib.request.urlopen(base + "/ready", timeout=timeout) as response:
+            server_status = orjson.loads(response.read())
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return {"first_response_seconds": round(first_response, 4), "attempts": attempts, "server": server_status}
+
+def profile(module: str = "main", top: int = 20) -> Dict[str, Any]:
+    return {"imports": import_profile(module, top), "first_request": first_request_profile(f"{module}:app")}
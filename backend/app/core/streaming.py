@@ -0,0 +1,165 @@
+import io
+import json
+import typing
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Type
+from bson import ObjectId
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.core.config import settings
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+STREAM_MEDIA_TYPES = {
+    NDJSON_MEDIA_TYPE: NDJSON_MEDIA_TYPE,
+    "application/ndjson": NDJSON_MEDIA_TYPE,
+    "application/jsonlines": NDJSON_MEDIA_TYPE,
+    ARROW_STREAM_MEDIA_TYPE: ARROW_STREAM_MEDIA_TYPE,
+}
+
+def negotiate_stream_format(request: Request) -> Optional[str]:
+    """Return the streaming media type asked for in the Accept header, or None for plain JSON"""
+    accept = request.headers.get("accept", "")
+    for part in accept.split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in STREAM_MEDIA_TYPES:
+            return STREAM_MEDIA_TYPES[media_type]
+    return None
+
+async def iter_batches(rows: AsyncIterable[Dict[str, Any]], batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Group an async cursor (or any async iterable) into lists of at most batch_size rows"""
+    batch_size = batch_size or settings.STREAM_BATCH_SIZE
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def iter_chunks(rows: Iterable[Dict[str, Any]], batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Same as iter_batches but for rows that are already in memory"""
+    batch_size = batch_size or settings.STREAM_BATCH_SIZE
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _to_arrow_value(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, dict):
+        return {k: _to_arrow_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_arrow_value(v) for v in value]
+    return value
+
+async def _ndjson_stream(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        lines = [json.dumps(row, default=_json_default) for row in batch]
+        yield ("\n".join(lines) + "\n").encode()
+
+def _arrow_type(annotation: Any):
+    """Arrow type of a model field's annotation, or None when it has no fixed one (Dict, Any, unions)"""
+    import pyarrow as pa
+
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _arrow_type(args[0]) if len(args) == 1 else None
+    if origin is list:
+        item = _arrow_type(typing.get_args(annotation)[0])
+        return pa.list_(item) if item is not None else None
+    if not isinstance(annotation, type):
+        return None
+    if issubclass(annotation, BaseModel):
+        return pa.struct(list(arrow_schema(annotation)))
+    # bool before int: it is a subclass
+    for python_type, arrow_type in (
+        (bool, pa.bool_()), (int, pa.int64()), (float, pa.float64()), (str, pa.string()),
+        (ObjectId, pa.string()), (datetime, pa.timestamp("ms")), (date, pa.date32()),
+    ):
+        if issubclass(annotation, python_type):
+            return arrow_type
+    return None
+
+def arrow_schema(model: Type[BaseModel]):
+    """
+    Arrow schema for rows shaped like `model`, keyed by field alias (`_id`). Every
+    column is nullable; fields without a fixed Arrow type are left out.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for name, field in model.model_fields.items():
+        arrow_type = _arrow_type(field.annotation)
+        if arrow_type is not None:
+            fields.append(pa.field(field.alias or name, arrow_type))
+    return pa.schema(fields)
+
+async def _replay(batches: List[List[Dict[str, Any]]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    for batch in batches:
+        yield batch
+
+async def _arrow_stream(batches: AsyncIterator[List[Dict[str, Any]]], schema) -> AsyncIterator[bytes]:
+    """
+    An IPC stream has one schema, sent before the first batch. With a declared schema
+    every batch is converted to it as it arrives: missing columns are null, ints fill
+    float columns and columns the schema does not list are dropped. Without one, rows
+    are collected first and the stream's schema unifies every batch's, promoting types
+    (null to anything, int to float), so no later batch can fail after the headers are out.
+    """
+    import pyarrow as pa
+
+    if schema is None:
+        collected = [[_to_arrow_value(row) for row in batch] async for batch in batches]
+        inferred = [pa.RecordBatch.from_pylist(rows).schema for rows in collected]
+        schema = pa.unify_schemas(inferred, promote_options="permissive") if inferred else pa.schema([])
+        batches = _replay(collected)
+
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    async for batch in batches:
+        rows = [_to_arrow_value(row) for row in batch]
+        writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    writer.close()
+    yield sink.getvalue()
+
+def streaming_response(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    media_type: str,
+    row_model: Optional[Type[BaseModel]] = None
+) -> StreamingResponse:
+    """
+    Build a StreamingResponse that serializes each batch as soon as it is read. Arrow
+    responses take their schema from `row_model`; without one the rows are collected
+    before the first byte so their schema can be unified (see _arrow_stream).
+    """
+    if media_type == ARROW_STREAM_MEDIA_TYPE:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail="Arrow IPC responses are not available on this server"
+            )
+        schema = arrow_schema(row_model) if row_model is not None else None
+        return StreamingResponse(_arrow_stream(batches, schema), media_type=media_type)
+    return StreamingResponse(_ndjson_stream(batches), media_type=media_type)
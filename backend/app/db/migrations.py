@@ -0,0 +1,82 @@
+"""
+One-off data migrations.
+
+split_stock_documents moves `historical_data` and `financial_statements` out of
+stock documents into the `stock_bars` and `stock_statements` collections. Those two
+fields are then removed from the stock document. It is safe to re-run: bars are merged
+by date and statements are upserted by kind, and stocks already migrated are skipped.
+
+compress_bar_buckets rewrites `stock_bars` buckets that still hold plain lists into the
+compressed column encoding. Buckets already encoded are skipped.
+
+Run from the backend directory:
+    python -m app.db.migrations split_stock_documents
+    python -m app.db.migrations compress_bar_buckets
+"""
+import argparse
+import asyncio
+import json
+from typing import Dict
+from app.db.mongodb import close_mongo_connection, connect_to_mongo, mongodb
+from app.services.stock_store import (
+    BAR_FIELDS, BARS, BUCKET_ENCODING, EMBEDDED_FIELDS, STOCKS, bars_to_series, stock_store
+)
+
+async def split_stock_documents(batch_size: int = 100) -> Dict[str, int]:
+    await stock_store.ensure_indexes()
+    stocks = mongodb.get_collection(STOCKS)
+    cursor = stocks.find(
+        {"$or": [{field: {"$exists": True}} for field in EMBEDDED_FIELDS]},
+        {"symbol": 1, **{field: 1 for field in EMBEDDED_FIELDS}}
+    ).batch_size(batch_size)
+
+    counts = {"stocks": 0, "bars": 0, "bar_buckets": 0, "statements": 0}
+    async for stock in cursor:
+        bars = stock.get("historical_data") or []
+        statements = stock.get("financial_statements") or {}
+        if bars:
+            counts["bar_buckets"] += await stock_store.save_bars(stock["symbol"], bars_to_series(bars))
+            counts["bars"] += len(bars)
+        if statements:
+            await stock_store.save_statements(stock["symbol"], statements)
+            counts["statements"] += len(statements)
+        # Only drop the embedded copies once they are stored in the new collections
+        await stocks.update_one({"_id": stock["_id"]}, {"$unset": {field: "" for field in EMBEDDED_FIELDS}})
+        counts["stocks"] += 1
+    return counts
+
+async def compress_bar_buckets(batch_size: int = 100) -> Dict[str, int]:
+    await stock_store.ensure_indexes()
+    cursor = mongodb.get_collection(BARS).find({"encoding": {"$ne": BUCKET_ENCODING}}).batch_size(batch_size)
+    counts = {"buckets": 0, "bars": 0}
+    async for bucket in cursor:
+        bars = [
+            {"date": day, **{field: (bucket.get(field) or [None] * len(bucket["dates"]))[i] for field in BAR_FIELDS}}
+            for i, day in enumerate(bucket["dates"])
+        ]
+        # save_bars merges with the stored bucket, which is this one, and rewrites it encoded
+        await stock_store.save_bars(bucket["symbol"], bars_to_series(bars))
+        counts["buckets"] += 1
+        counts["bars"] += len(bars)
+    return counts
+
+MIGRATIONS = {
+    "split_stock_documents": split_stock_documents,
+    "compress_bar_buckets": compress_bar_buckets,
+}
+
+async def run(name: str) -> Dict[str, int]:
+    await connect_to_mongo()
+    try:
+        return await MIGRATIONS[name]()
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("migration", choices=sorted(MIGRATIONS))
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.migration)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,36 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Any, Dict
 from app.core.config import settings
+from app.core.mongo_metrics import MongoCommandMetrics, mongo_pool_metrics
+
+def client_options() -> Dict[str, Any]:
+    """Pool, compression, read preference and write concern keyword arguments from settings"""
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "readPreference": settings.MONGODB_READ_PREFERENCE,
+        "w": int(settings.MONGODB_WRITE_CONCERN) if settings.MONGODB_WRITE_CONCERN.isdigit() else settings.MONGODB_WRITE_CONCERN,
+    }
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGODB_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = settings.MONGODB_MAX_IDLE_TIME_MS
+    if settings.MONGODB_COMPRESSORS:
+        options["compressors"] = settings.MONGODB_COMPRESSORS
+    if settings.MONGODB_JOURNAL is not None:
+        options["journal"] = settings.MONGODB_JOURNAL
+    return options
 
 class MongoDB:
     client: AsyncIOMotorClient = None
     db = None
 
     async def connect_to_mongo(self):
-        self.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        self.client = AsyncIOMotorClient(
+            settings.MONGODB_URL,
+            event_listeners=[MongoCommandMetrics(), mongo_pool_metrics],
+            **client_options()
+        )
         self.db = self.client[settings.DATABASE_NAME]
 
     async def close_mongo_connection(self):
@@ -17,6 +41,7 @@ class MongoDB:
         return self.db[collection_name]
 
 db = MongoDB()
+mongodb = db
 
 async def get_database():
     return db.db
@@ -25,4 +50,4 @@ async def connect_to_mongo():
     await db.connect_to_mongo()
 
 async def close_mongo_connection():
-    await db.close_mongo_connection()
\ No newline at end of file
+    await db.close_mongo_connection()
@@ -1,18 +1,25 @@
 from typing import Optional
 from pydantic import BaseModel, Field
+from pydantic_core import core_schema
 from bson import ObjectId
 
 class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-
     @classmethod
     def validate(cls, v):
+        if isinstance(v, ObjectId):
+            return v
         if not ObjectId.is_valid(v):
             raise ValueError("Invalid ObjectId")
         return ObjectId(v)
 
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        # Accept ObjectId instances as well as their hex strings; serialize back to a string
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str)
+        )
+
     @classmethod
     def __get_pydantic_json_schema__(cls, core_schema, handler):
         return {"type": "string"}
@@ -23,4 +30,4 @@ class MongoBaseModel(BaseModel):
     class Config:
         json_encoders = {ObjectId: str}
         populate_by_name = True
-        arbitrary_types_allowed = True 
\ No newline at end of file
+        arbitrary_types_allowed = True
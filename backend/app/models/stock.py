@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict, Union
 from datetime import datetime
 from pydantic import Field, BaseModel
 from app.models.base import MongoBaseModel
@@ -24,6 +24,18 @@ class HistoricalData(MongoBaseModel):
     volume: int
     adjusted_close: float
 
+class DailyBar(BaseModel):
+    """One row of the historical endpoint's streamed output; also its Arrow schema"""
+    date: str
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    close: Optional[float] = None
+    adjusted_close: Optional[float] = None
+    volume: Optional[int] = None
+    dividend_amount: Optional[float] = None
+    split_coefficient: Optional[float] = None
+
 class StockBase(BaseModel):
     symbol: str
     name: str
@@ -40,8 +52,46 @@ class Stock(StockBase, MongoBaseModel):
     dividend_yield: Optional[float] = None
     last_updated: datetime = Field(default_factory=datetime.utcnow)
     financial_metrics: FinancialMetrics = Field(default_factory=FinancialMetrics)
-    historical_data: List[HistoricalData] = []
-    financial_statements: Dict[str, Dict] = {}  # P&L, Balance Sheet, Cash Flow
+    # Daily bars are in `stock_bars` and statements in `stock_statements`; see StockStore
+
+class PriceBucket(BaseModel):
+    """
+    One symbol's daily bars for one month, stored column-wise in `stock_bars`. With
+    encoding "shuffle-zlib" each column is a compressed array (see StockStore).
+    """
+    symbol: str
+    month: datetime
+    start: datetime
+    end: datetime
+    count: int
+    encoding: Optional[str] = None
+    dates: Union[bytes, List[datetime]]
+    open: Union[bytes, List[Optional[float]]]
+    high: Union[bytes, List[Optional[float]]]
+    low: Union[bytes, List[Optional[float]]]
+    close: Union[bytes, List[Optional[float]]]
+    adjusted_close: Union[bytes, List[Optional[float]]]
+    volume: Union[bytes, List[Optional[float]]]
+    dividend_amount: Optional[bytes] = None
+    split_coefficient: Optional[bytes] = None
+
+class StockStatement(BaseModel):
+    """One financial statement (income_statement, balance_sheet or cash_flow) for a symbol"""
+    symbol: str
+    kind: str
+    data: Dict[str, Any]
+    updated_at: datetime
+
+class Fundamentals(BaseModel):
+    """
+    Parsed statement figures and derived ratios for one symbol, one document per
+    frequency ("annual" or "quarterly") in `fundamentals`, stored column-wise
+    """
+    symbol: str
+    frequency: str
+    dates: List[datetime]
+    columns: Dict[str, List[Optional[float]]]
+    updated_at: datetime
 
 class StockUpdate(MongoBaseModel):
     name: Optional[str] = None
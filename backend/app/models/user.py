@@ -11,6 +11,11 @@ class UserCreate(UserBase):
 
 class User(UserBase):
     id: str
+    full_name: Optional[str] = None
+    is_active: bool = True
+    is_superuser: bool = False
+    virtual_capital: float = 100000.0
+    watchlist: List[str] = []
 
     class Config:
         from_attributes = True
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from app.models.user import User, UserCreate
-from app.services.auth import create_access_token, get_password_hash, verify_password
+from app.services.auth import create_access_token, password_hasher
 from app.db.mongodb import get_database
 
 router = APIRouter()
@@ -13,7 +13,7 @@ async def register(user: UserCreate):
     if await db.users.find_one({"username": user.username}):
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     user_dict = user.dict()
     user_dict["password"] = hashed_password
     
@@ -25,7 +25,7 @@ async def register(user: UserCreate):
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     db = await get_database()
     user = await db.users.find_one({"username": form_data.username})
-    if not user or not verify_password(form_data.password, user["password"]):
+    if not user or not await password_hasher.verify(form_data.password, user["password"]):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     
     access_token = create_access_token(data={"sub": user["username"]})
@@ -1,18 +1,81 @@
+import time
 import aiohttp
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 from app.core.config import settings
+from app.core.metrics import registry, upstream_request_duration, upstream_requests
+from app.services.cache import CacheEntry
+from app.services.cache_backend import cache_hub
+
+# Upstream payloads that report a problem instead of data must never be cached
+ERROR_KEYS = ("Error Message", "Note", "Information")
 
 class AlphaVantageAPI:
     BASE_URL = "https://www.alphavantage.co/query"
     
+    CACHE_TTLS = {
+        "GLOBAL_QUOTE": settings.QUOTE_CACHE_TTL_SECONDS,
+        "OVERVIEW": settings.FUNDAMENTALS_CACHE_TTL_SECONDS,
+        "INCOME_STATEMENT": settings.FUNDAMENTALS_CACHE_TTL_SECONDS,
+        "BALANCE_SHEET": settings.FUNDAMENTALS_CACHE_TTL_SECONDS,
+        "CASH_FLOW": settings.FUNDAMENTALS_CACHE_TTL_SECONDS,
+        "TIME_SERIES_DAILY_ADJUSTED": settings.HISTORICAL_CACHE_TTL_SECONDS,
+        "SYMBOL_SEARCH": settings.FUNDAMENTALS_CACHE_TTL_SECONDS,
+    }
+    
     def __init__(self):
         self.api_key = settings.ALPHA_VANTAGE_API_KEY
+        # Shared between workers when CACHE_BACKEND=redis, so N workers spend one quota
+        self.cache = cache_hub.cache("alpha_vantage", max_entries=settings.ALPHA_VANTAGE_CACHE_MAX_ENTRIES)
+    
+    @staticmethod
+    def _cache_key(params: Dict[str, Any]) -> str:
+        return "&".join(f"{k}={v}" for k, v in sorted(params.items()) if k != "apikey")
+    
+    async def cached_entry(self, function: str, **params: Any) -> Optional[CacheEntry]:
+        """Return the live cache entry for a request without calling upstream"""
+        return await self.cache.get_entry(self._cache_key({"function": function, **params}))
     
-    async def _make_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def remaining_ttls(self, requests: Sequence[Dict[str, Any]]) -> List[Optional[float]]:
+        """Seconds each request's cached reply has left (None when not cached); not counted as cache reads"""
+        return await self.cache.ttl_remaining([self._cache_key(params) for params in requests])
+    
+    async def _make_request(self, params: Dict[str, Any], ttl: Optional[float] = None, refresh: bool = False) -> Dict[str, Any]:
+        function = params["function"]
+        key = self._cache_key(params)
+        if ttl is None:
+            ttl = self.CACHE_TTLS.get(function)
+        if ttl and not refresh:
+            entry = await self.cache.get_entry(key)
+            if entry is not None:
+                upstream_requests.inc(function, "hit")
+                return entry.value
+        
         params["apikey"] = self.api_key
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.BASE_URL, params=params) as response:
-                return await response.json()
+        started = time.perf_counter()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(self.BASE_URL, params=params) as response:
+                    data = await response.json()
+        except Exception:
+            upstream_requests.inc(function, "error")
+            raise
+        finally:
+            upstream_request_duration.observe(time.perf_counter() - started, function)
+        
+        if "Error Message" in data:
+            upstream_requests.inc(function, "error")
+        elif any(error_key in data for error_key in ERROR_KEYS):
+            # "Note" / "Information" are Alpha Vantage's rate-limit replies
+            upstream_requests.inc(function, "rate_limited")
+        else:
+            upstream_requests.inc(function, "miss")
+            if ttl:
+                await self.cache.set(key, data, ttl)
+        return data
+    
+    async def refresh(self, function: str, ttl: float, **params: Any) -> Dict[str, Any]:
+        """Fetch from upstream even if cached and store a successful reply for ttl seconds"""
+        return await self._make_request({"function": function, **params}, ttl=ttl, refresh=True)
     
     async def get_quote(self, symbol: str) -> Dict[str, Any]:
         """Get real-time quote for a symbol"""
@@ -71,4 +134,10 @@ class AlphaVantageAPI:
         }
         return await self._make_request(params)
 
-alpha_vantage = AlphaVantageAPI() 
\ No newline at end of file
+alpha_vantage = AlphaVantageAPI()
+
+registry.gauge(
+    "alpha_vantage_cache_entries",
+    "Live entries in the Alpha Vantage response cache",
+    lambda: [((), len(alpha_vantage.cache))]
+)
@@ -0,0 +1,74 @@
+import time
+import uuid
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.models.user import User
+from app.services.cache import TTLCache
+from app.services.cache_backend import cache_hub
+
+class AuthCache:
+    """
+    Cache for get_current_user: decoded JWT payloads keyed by token and User objects
+    keyed by subject (email). Payloads never outlive the token's own expiry; users are
+    dropped explicitly whenever their document changes.
+
+    Payloads are immutable and cheaper to decode than to fetch, so they stay in this
+    process. Users go through the cache backend: with several workers a deactivation
+    or watchlist change on one worker invalidates the copy on every other.
+
+    A request that read a user document before an invalidation must not put it back
+    afterwards. invalidate_user() therefore first gives the subject a new generation;
+    a request notes the generation before its database read and drops what it cached
+    if the generation moved meanwhile.
+    """
+    def __init__(self, max_entries: int, ttl: float):
+        self.ttl = ttl
+        self.tokens = TTLCache(max_entries=max_entries)
+        self.users = cache_hub.cache("auth_users", max_entries=max_entries)
+        self.generations = cache_hub.cache("auth_user_generations", max_entries=max_entries)
+        self.requests = 0
+        self.db_reads = 0
+
+    def get_payload(self, token: str) -> Optional[Dict[str, Any]]:
+        return self.tokens.get(token)
+
+    def put_payload(self, token: str, payload: Dict[str, Any]) -> None:
+        ttl = self.ttl
+        if payload.get("exp") is not None:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            self.tokens.set(token, payload, ttl)
+
+    async def get_user(self, subject: str) -> Optional[User]:
+        document = await self.users.get(subject)
+        return User(**document) if document is not None else None
+
+    async def user_generation(self, subject: str) -> Optional[str]:
+        """Read before fetching the user document; pass the result to put_user()"""
+        return await self.generations.get(subject)
+
+    async def put_user(self, subject: str, user: User, generation: Optional[str]) -> None:
+        await self.users.set(subject, user.model_dump(), self.ttl)
+        # Checked after the write: an invalidation that lands in between either moved the
+        # generation already or deletes this entry itself
+        if await self.generations.get(subject) != generation:
+            await self.users.delete(subject)
+
+    async def invalidate_user(self, subject: str) -> None:
+        """Call after any write to a user document (profile, watchlist, activation)"""
+        # Kept longer than a cached user lives, so no read that began before it can miss it
+        await self.generations.set(subject, uuid.uuid4().hex, self.ttl * 2)
+        await self.users.delete(subject)
+
+    def stats(self) -> Dict[str, Any]:
+        saved = self.requests - self.db_reads
+        return {
+            "requests": self.requests,
+            "db_reads": self.db_reads,
+            "db_reads_saved": saved,
+            "db_reads_saved_per_request": saved / self.requests if self.requests else 0.0,
+            "token_cache": {"size": len(self.tokens), "hits": self.tokens.hits, "misses": self.tokens.misses},
+            "user_cache": self.users.stats()
+        }
+
+auth_cache = AuthCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
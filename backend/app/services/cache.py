@@ -0,0 +1,73 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+class CacheEntry:
+    __slots__ = ("value", "fetched_at", "expires_at")
+
+    def __init__(self, value: Any, fetched_at: float, expires_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at <= time.time()
+
+class TTLCache:
+    """
+    Bounded in-process cache with a TTL per entry and LRU eviction. With max_entries
+    None nothing is evicted, for state that must not silently disappear.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the live entry for key without touching LRU order or hit counters"""
+        entry = self._entries.get(key)
+        if entry is None or entry.expired:
+            return None
+        return entry
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expired:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else default
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> CacheEntry:
+        now = time.time()
+        entry = CacheEntry(value, now, now + ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def values(self) -> List[Any]:
+        """Live values, without touching LRU order or hit counters"""
+        return [entry.value for entry in self._entries.values() if not entry.expired]
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
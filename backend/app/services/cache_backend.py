@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+import orjson
+from app.core.config import settings
+from app.services.cache import CacheEntry, TTLCache
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend:
+    """
+    A named cache. MemoryCache keeps entries in this process only; RedisCache keeps
+    them in a Redis-compatible server shared by every worker. A ttl of None means the
+    entry never expires (used for small pieces of shared state rather than caching).
+    """
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        entry = await self.get_entry(key)
+        return entry.value if entry is not None else default
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set key only if it is absent; False when another writer got there first"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    async def ttl_remaining(self, keys: Sequence[str]) -> List[Optional[float]]:
+        """Seconds each key has left (inf if it never expires, None if absent), without counting as a read"""
+        raise NotImplementedError
+
+    async def values(self) -> List[Any]:
+        """Every live value in the namespace; meant for small namespaces"""
+        raise NotImplementedError
+
+    async def append(self, key: str, value: Any) -> int:
+        """Append to the list stored at key (created empty, never expires); returns its new length"""
+        raise NotImplementedError
+
+    async def get_list(self, key: str) -> List[Any]:
+        """The list stored at key in append order, empty when absent"""
+        raise NotImplementedError
+
+    def invalidate_local(self, key: Optional[str]) -> None:
+        """Drop this process's copy of key (or of everything when key is None)"""
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+def _ttl(ttl: Optional[float]) -> float:
+    return float("inf") if ttl is None else ttl
+
+class MemoryCache(CacheBackend):
+    """TTLCache behind the backend interface; correct only with a single worker"""
+
+    def __init__(self, namespace: str, max_entries: Optional[int] = 10000):
+        super().__init__(namespace)
+        self.local = TTLCache(max_entries=max_entries)
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        return self.local.get_entry(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.local.set(key, value, _ttl(ttl))
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        if self.local.peek(key) is not None:
+            return False
+        self.local.set(key, value, _ttl(ttl))
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.local.delete(key)
+
+    async def clear(self) -> None:
+        self.local.clear()
+
+    async def ttl_remaining(self, keys: Sequence[str]) -> List[Optional[float]]:
+        now = time.time()
+        entries = [self.local.peek(key) for key in keys]
+        return [entry.expires_at - now if entry is not None else None for entry in entries]
+
+    async def values(self) -> List[Any]:
+        return self.local.values()
+
+    async def append(self, key: str, value: Any) -> int:
+        entry = self.local.peek(key)
+        if entry is None:
+            entry = self.local.set(key, [], float("inf"))
+        entry.value.append(value)
+        return len(entry.value)
+
+    async def get_list(self, key: str) -> List[Any]:
+        return list(self.local.get(key, ()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "size": len(self.local), "hits": self.local.hits, "misses": self.local.misses}
+
+class RedisCache(CacheBackend):
+    """
+    Entries live in Redis under `<prefix>:<namespace>:<key>` with the TTL set server
+    side, so every worker reads the same data. Each worker also keeps a near cache of
+    what it read recently, at most `near_ttl` old, so hot keys (the current user, a
+    popular quote) do not cost a round trip each time. Every write or delete is
+    published on the hub's invalidation channel and the other workers drop their near
+    copy straight away; `near_ttl` only bounds staleness if a message is lost.
+    """
+    def __init__(self, hub: "CacheHub", namespace: str, max_entries: int = 10000, near_ttl: float = 5.0):
+        super().__init__(namespace)
+        self.hub = hub
+        self.near = TTLCache(max_entries=max_entries)
+        self.near_ttl = near_ttl
+        self.key_prefix = f"{hub.prefix}:{namespace}:"
+        self.remote_hits = 0
+
+    def __len__(self) -> int:
+        return len(self.near)
+
+    @staticmethod
+    def _encode(entry: CacheEntry) -> bytes:
+        expires_at = None if entry.expires_at == float("inf") else entry.expires_at
+        return orjson.dumps({"v": entry.value, "f": entry.fetched_at, "e": expires_at})
+
+    @staticmethod
+    def _decode(raw: bytes) -> CacheEntry:
+        document = orjson.loads(raw)
+        expires_at = document["e"] if document["e"] is not None else float("inf")
+        return CacheEntry(document["v"], document["f"], expires_at)
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        ttl = min(self.near_ttl, entry.expires_at - time.time())
+        if ttl > 0:
+            self.near.set(key, entry.value, ttl).fetched_at = entry.fetched_at
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        entry = self.near.get_entry(key)
+        if entry is not None:
+            return entry
+        raw = await self.hub.client.get(self.key_prefix + key)
+        if raw is None:
+            return None
+        entry = self._decode(raw)
+        self.remote_hits += 1
+        self._remember(key, entry)
+        return entry
+
+    async def _write(self, key: str, value: Any, ttl: Optional[float], only_if_absent: bool) -> bool:
+        now = time.time()
+        entry = CacheEntry(value, now, now + _ttl(ttl))
+        written = await self.hub.client.set(
+            self.key_prefix + key,
+            self._encode(entry),
+            px=int(ttl * 1000) if ttl is not None else None,
+            nx=only_if_absent
+        )
+        if not written:
+            return False
+        self._remember(key, entry)
+        await self.hub.publish(self.namespace, key)
+        return True
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._write(key, value, ttl, only_if_absent=False)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return await self._write(key, value, ttl, only_if_absent=True)
+
+    async def delete(self, key: str) -> None:
+        self.near.delete(key)
+        await self.hub.client.delete(self.key_prefix + key)
+        await self.hub.publish(self.namespace, key)
+
+    async def ttl_remaining(self, keys: Sequence[str]) -> List[Optional[float]]:
+        # The near copy only knows its own short expiry; the server has the real one
+        async with self.hub.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.pttl(self.key_prefix + key)
+            replies = await pipe.execute()
+        return [None if ms == -2 else float("inf") if ms == -1 else ms / 1000 for ms in replies]
+
+    async def _keys(self) -> List[bytes]:
+        return [key async for key in self.hub.client.scan_iter(match=self.key_prefix + "*", count=500)]
+
+    async def clear(self) -> None:
+        self.near.clear()
+        keys = await self._keys()
+        for start in range(0, len(keys), 500):
+            await self.hub.client.delete(*keys[start:start + 500])
+        await self.hub.publish(self.namespace, None)
+
+    async def values(self) -> List[Any]:
+        keys = await self._keys()
+        if not keys:
+            return []
+        raws = await self.hub.client.mget(keys)
+        return [self._decode(raw).value for raw in raws if raw is not None]
+
+    # Lists are a native Redis list and bypass the near cache: one round trip per read,
+    # and appends from several workers never overwrite each other
+    async def append(self, key: str, value: Any) -> int:
+        return await self.hub.client.rpush(self.key_prefix + key, orjson.dumps(value))
+
+    async def get_list(self, key: str) -> List[Any]:
+        return [orjson.loads(raw) for raw in await self.hub.client.lrange(self.key_prefix + key, 0, -1)]
+
+    def invalidate_local(self, key: Optional[str]) -> None:
+        if key is None:
+            self.near.clear()
+        else:
+            self.near.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "near_size": len(self.near),
+            "near_hits": self.near.hits,
+            "remote_hits": self.remote_hits,
+            "misses": self.near.misses - self.remote_hits
+        }
+
+class CacheHub:
+    """
+    Creates the named caches for the configured backend and, for Redis, runs the
+    invalidation listener: one pub/sub subscription per worker that drops near-cache
+    entries written or deleted by other workers. If the subscription breaks, near
+    caches are cleared on reconnect because messages may have been missed meanwhile.
+    """
+    def __init__(self, backend: str = "memory", url: str = "redis://localhost:6379/0", prefix: str = "fs",
+                 near_ttl: float = 5.0):
+        if backend not in ("memory", "redis"):
+            raise ValueError(f"Unknown cache backend {backend!r}")
+        self.backend = backend
+        self.url = url
+        self.prefix = prefix
+        self.near_ttl = near_ttl
+        self.channel = f"{prefix}:invalidate"
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.caches: Dict[str, CacheBackend] = {}
+        self.client = self._connect(url) if backend == "redis" else None
+        self._listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _connect(url: str):
+        # Imported here so the memory backend never pays for loading the client
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)") from None
+        return aioredis.from_url(url)
+
+    @property
+    def shared(self) -> bool:
+        return self.backend == "redis"
+
+    def cache(self, namespace: str, max_entries: Optional[int] = 10000) -> CacheBackend:
+        """
+        The named cache, created on first use. max_entries=None never evicts, for shared
+        state rather than caching; Redis near copies of such a namespace stay bounded
+        since the server keeps every entry anyway.
+        """
+        if namespace not in self.caches:
+            if self.shared:
+                self.caches[namespace] = RedisCache(self, namespace, max_entries or 10000, self.near_ttl)
+            else:
+                self.caches[namespace] = MemoryCache(namespace, max_entries)
+        return self.caches[namespace]
+
+    async def publish(self, namespace: str, key: Optional[str]) -> None:
+        message = orjson.dumps({"origin": self.origin, "namespace": namespace, "key": key})
+        try:
+            await self.client.publish(self.channel, message)
+        except Exception:
+            # Other workers fall back to near_ttl expiry for this key
+            logger.warning("Cache invalidation publish failed", extra={"event": "cache.publish_failed", "namespace": namespace})
+
+    def _apply(self, data: bytes) -> None:
+        message = orjson.loads(data)
+        if message["origin"] == self.origin:
+            return
+        cache = self.caches.get(message["namespace"])
+        if cache is not None:
+            cache.invalidate_local(message["key"])
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                for cache in self.caches.values():
+                    cache.invalidate_local(None)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Cache invalidation listener lost its connection", extra={"event": "cache.listener_error"})
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
+
+    async def start(self) -> None:
+        if self.shared and self._listener is None:
+            self._listener = asyncio.create_task(self._listen(), name="cache-invalidation")
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.client is not None:
+            await self.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {namespace: cache.stats() for namespace, cache in self.caches.items()}
+
+cache_hub = CacheHub(
+    settings.CACHE_BACKEND,
+    settings.CACHE_REDIS_URL,
+    settings.CACHE_KEY_PREFIX,
+    settings.CACHE_NEAR_TTL_SECONDS
+)
@@ -0,0 +1,187 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+import numpy as np
+from pymongo import ASCENDING, UpdateOne
+from app.core.config import settings
+from app.db.mongodb import mongodb
+from app.services.alpha_vantage import ERROR_KEYS, alpha_vantage
+from app.services.stock_store import STOCKS
+
+logger = logging.getLogger(__name__)
+
+FUNDAMENTALS = "fundamentals"
+
+# Statement fields kept per kind, as Alpha Vantage names them
+STATEMENT_FIELDS = {
+    "income_statement": ("totalRevenue", "grossProfit", "operatingIncome", "netIncome", "ebit"),
+    "balance_sheet": (
+        "totalAssets", "totalCurrentAssets", "inventory", "totalLiabilities",
+        "totalCurrentLiabilities", "totalShareholderEquity", "shortLongTermDebtTotal"
+    ),
+    "cash_flow": ("operatingCashflow", "capitalExpenditures", "dividendPayout"),
+}
+FREQUENCIES = {"annual": "annualReports", "quarterly": "quarterlyReports"}
+RATIOS = ("roe", "roce", "debt_equity", "current_ratio", "quick_ratio")
+
+# A statement table: {"dates": datetime64[D], "netIncome": float64, ...}, oldest period first
+Table = Dict[str, np.ndarray]
+
+def parse_reports(reports: Sequence[Mapping[str, Any]], fields: Sequence[str]) -> Table:
+    """
+    One statement's reports as typed columns. Every value is collected into one string
+    matrix and converted in a single call; Alpha Vantage's "None" and missing values
+    become NaN.
+    """
+    if not reports:
+        return {"dates": np.array([], dtype="datetime64[D]"), **{field: np.array([], dtype=float) for field in fields}}
+    dates = np.array([report["fiscalDateEnding"] for report in reports], dtype="datetime64[D]")
+    raw = np.array([[str(report.get(field) or "nan") for field in fields] for report in reports])
+    values = np.where(np.isin(raw, ("None", "-", "")), "nan", raw).astype(float)
+    order = np.argsort(dates, kind="stable")
+    table = {"dates": dates[order]}
+    for column, field in enumerate(fields):
+        table[field] = values[order, column]
+    return table
+
+def align(tables: Sequence[Table]) -> Table:
+    """Join statement tables on fiscal period end; a period missing from one statement is NaN there"""
+    dates = np.unique(np.concatenate([table["dates"] for table in tables]))
+    joined = {"dates": dates}
+    for table in tables:
+        position = np.searchsorted(dates, table["dates"])
+        for field, values in table.items():
+            if field == "dates":
+                continue
+            column = np.full(len(dates), np.nan)
+            column[position] = values
+            joined[field] = column
+    return joined
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator, NaN where the denominator is not positive"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+def compute_ratios(table: Table) -> Table:
+    """Derived ratios for every period at once; inputs that are NaN give NaN ratios"""
+    equity = table["totalShareholderEquity"]
+    current_liabilities = table["totalCurrentLiabilities"]
+    # Not every filer reports total debt; total liabilities is the conservative fallback
+    debt = np.where(np.isnan(table["shortLongTermDebtTotal"]), table["totalLiabilities"], table["shortLongTermDebtTotal"])
+    return {
+        "roe": _ratio(table["netIncome"], equity),
+        "roce": _ratio(table["ebit"], table["totalAssets"] - current_liabilities),
+        "debt_equity": _ratio(debt, equity),
+        "current_ratio": _ratio(table["totalCurrentAssets"], current_liabilities),
+        "quick_ratio": _ratio(table["totalCurrentAssets"] - np.nan_to_num(table["inventory"]), current_liabilities),
+    }
+
+def has_reports(statements: Mapping[str, Mapping[str, Any]]) -> bool:
+    """Whether any statement holds a report; Alpha Vantage answers an unknown symbol with {}"""
+    return any(payload.get(key) for payload in statements.values() for key in FREQUENCIES.values())
+
+def parse_statements(statements: Mapping[str, Mapping[str, Any]], frequency: str = "annual") -> Table:
+    """The three statement payloads of one symbol as one table with ratios, per period"""
+    reports_key = FREQUENCIES[frequency]
+    table = align([
+        parse_reports(statements.get(kind, {}).get(reports_key) or [], fields)
+        for kind, fields in STATEMENT_FIELDS.items()
+    ])
+    table.update(compute_ratios(table))
+    return table
+
+def _column(values: np.ndarray) -> List[Optional[float]]:
+    return [None if value != value else value for value in values.tolist()]
+
+def latest(table: Table, field: str) -> Optional[float]:
+    """Most recent non-NaN value of a column"""
+    values = table[field]
+    present = np.flatnonzero(~np.isnan(values))
+    return float(values[present[-1]]) if len(present) else None
+
+class FundamentalsService:
+    """
+    Parsed statements and derived ratios in `fundamentals`, one document per symbol
+    and frequency holding the table column-wise (`dates`, `netIncome`, `roe`, ...).
+    The latest ratios are also copied into the stock document's `financial_metrics`
+    so screeners filter on them without touching statements. Balance sheet ratios
+    come from the latest quarter, return ratios from the latest fiscal year.
+    """
+    def __init__(self):
+        self._indexes_ready = False
+
+    async def _ensure_indexes(self) -> None:
+        if not self._indexes_ready:
+            await mongodb.get_collection(FUNDAMENTALS).create_index(
+                [("symbol", ASCENDING), ("frequency", ASCENDING)], unique=True
+            )
+            self._indexes_ready = True
+
+    async def ingest(self, symbol: str, statements: Mapping[str, Mapping[str, Any]]) -> Dict[str, Optional[float]]:
+        """Parse and store statement payloads; returns the ratios written to the stock"""
+        await self._ensure_indexes()
+        now = datetime.utcnow()
+        tables = {frequency: parse_statements(statements, frequency) for frequency in FREQUENCIES}
+        writes = [
+            UpdateOne(
+                {"symbol": symbol, "frequency": frequency},
+                {"$set": {
+                    "dates": [datetime.combine(day.astype(datetime), datetime.min.time()) for day in table["dates"]],
+                    "columns": {field: _column(values) for field, values in table.items() if field != "dates"},
+                    "updated_at": now
+                }},
+                upsert=True
+            )
+            for frequency, table in tables.items()
+        ]
+        await mongodb.get_collection(FUNDAMENTALS).bulk_write(writes, ordered=False)
+
+        annual, quarterly = tables["annual"], tables["quarterly"]
+        metrics = {
+            "roe": latest(annual, "roe"),
+            "roce": latest(annual, "roce"),
+            "revenue": latest(annual, "totalRevenue"),
+        }
+        for ratio in ("debt_equity", "current_ratio", "quick_ratio"):
+            value = latest(quarterly, ratio)
+            metrics[ratio] = value if value is not None else latest(annual, ratio)
+        await mongodb.get_collection(STOCKS).update_one(
+            {"symbol": symbol},
+            # last_updated lets the incremental peer statistics run pick this stock up
+            {"$set": {**{f"financial_metrics.{name}": value for name, value in metrics.items()}, "last_updated": now}}
+        )
+        return metrics
+
+    async def refresh(self, symbol: str) -> Optional[bool]:
+        """
+        Re-ingest from Alpha Vantage when the stored table is older than the statements'
+        cache TTL. Returns whether it was re-ingested, or None when upstream has no
+        statements for the symbol; nothing is stored then, so a later listing is picked up.
+        """
+        document = await mongodb.get_collection(FUNDAMENTALS).find_one(
+            {"symbol": symbol, "frequency": "annual"}, {"updated_at": 1}
+        )
+        if document is not None:
+            age = (datetime.utcnow() - document["updated_at"]).total_seconds()
+            if age < settings.FUNDAMENTALS_CACHE_TTL_SECONDS:
+                return False
+        statements = {
+            "income_statement": await alpha_vantage.get_income_statement(symbol),
+            "balance_sheet": await alpha_vantage.get_balance_sheet(symbol),
+            "cash_flow": await alpha_vantage.get_cash_flow(symbol),
+        }
+        if any(key in payload for payload in statements.values() for key in ERROR_KEYS):
+            return False
+        if not has_reports(statements):
+            return None
+        metrics = await self.ingest(symbol, statements)
+        logger.info("Fundamentals refreshed", extra={"event": "fundamentals.refreshed", "symbol": symbol, **metrics})
+        return True
+
+    async def get_table(self, symbol: str, frequency: str = "annual") -> Optional[Dict[str, Any]]:
+        return await mongodb.get_collection(FUNDAMENTALS).find_one(
+            {"symbol": symbol, "frequency": frequency}, {"_id": 0}
+        )
+
+fundamentals = FundamentalsService()
@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+import numpy as np
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services.stock_store import stock_store
+
+logger = logging.getLogger(__name__)
+
+snapshot_swaps = registry.counter("market_snapshot_swaps_total", "Market snapshots made current")
+snapshot_reclaimed = registry.counter("market_snapshot_reclaimed_total", "Retired market snapshots released once unpinned")
+snapshot_build_seconds = registry.histogram(
+    "market_snapshot_build_seconds",
+    "Time to read the stock universe and build a market snapshot",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+LABEL_FIELDS = ("symbol", "name", "sector", "industry")
+# Response header carrying the version a request was answered from
+SNAPSHOT_VERSION_HEADER = "X-Snapshot-Version"
+
+def _flatten(document: Mapping[str, Any], prefix: str = "") -> Iterator[tuple]:
+    """(dotted path, value) for every numeric leaf, e.g. ("peers.sector.roe.pct", 0.8)"""
+    for key, value in document.items():
+        if isinstance(value, Mapping):
+            yield from _flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+class MarketSnapshot:
+    """
+    One immutable, columnar copy of the stock universe: a float64 column per numeric
+    field (nested fields by dotted path, missing values NaN), label columns, and the
+    documents themselves for building responses. Arrays are read-only; nothing about
+    a snapshot changes after it is built, so a pinned reader sees one consistent
+    universe however long it takes.
+
+    `version` is a digest of the contents, so every worker that loads the same data
+    derives the same id and caches or ETags keyed on it agree across workers.
+    """
+    def __init__(self, documents: Sequence[Dict[str, Any]], seq: int):
+        self.seq = seq
+        self.built_at = datetime.utcnow()
+        self.documents = tuple(documents)
+        self.index = {document["symbol"]: i for i, document in enumerate(self.documents)}
+        self.labels = {
+            field: np.array([document.get(field) for document in self.documents], dtype=object)
+            for field in LABEL_FIELDS
+        }
+        flat = [dict(_flatten(document)) for document in self.documents]
+        fields = sorted({field for row in flat for field in row})
+        self.columns: Dict[str, np.ndarray] = {}
+        for field in fields:
+            column = np.array([row.get(field, np.nan) for row in flat], dtype=float)
+            column.flags.writeable = False
+            self.columns[field] = column
+        for column in self.labels.values():
+            column.flags.writeable = False
+
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update("\0".join(str(symbol) for symbol in self.labels["symbol"]).encode())
+        for field in fields:
+            digest.update(field.encode())
+            digest.update(self.columns[field].tobytes())
+        for field in ("sector", "industry"):
+            digest.update("\0".join(str(label) for label in self.labels[field]).encode())
+        self.version = digest.hexdigest()
+
+        self.refs = 0
+        self.retired = False
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def column(self, field: str) -> np.ndarray:
+        """Numeric column by dotted path; a bare ratio name falls back to financial_metrics.<name>"""
+        column = self.columns.get(field)
+        nested = self.columns.get(f"financial_metrics.{field}") if "." not in field else None
+        if column is None and nested is None:
+            return np.full(len(self), np.nan)
+        if column is None:
+            return nested
+        if nested is None:
+            return column
+        return np.where(np.isnan(column), nested, column)
+
+    def select(self, rules: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Indices of documents matching every rule, evaluated column-wise (same semantics as the cursor scan)"""
+        mask = np.ones(len(self), dtype=bool)
+        for rule in rules:
+            values = self.column(rule["field"])
+            present = ~np.isnan(values)
+            operator, target = rule["operator"], rule["value"]
+            if operator == "<":
+                matched = values < target
+            elif operator == ">":
+                matched = values > target
+            elif operator == "==":
+                matched = values == target
+            elif operator == "!=":
+                matched = values != target
+            else:
+                matched = np.ones(len(self), dtype=bool)
+            mask &= present & matched
+        return np.flatnonzero(mask)
+
+    def rows(self, indices: np.ndarray) -> List[Dict[str, Any]]:
+        return [self.documents[i] for i in indices]
+
+class SnapshotManager:
+    """
+    Double-buffered holder of the current MarketSnapshot.
+
+    refresh() reads the universe, builds the next snapshot in a worker thread and then
+    swaps it in with a single assignment on the event loop, so readers never see a
+    half-built one. pin() takes the current snapshot for the length of a request and
+    holds a reference count on it; a snapshot replaced while pinned is retired and
+    released when its last reader unpins. pin() and the swap both run on the loop
+    thread, so the count needs no lock.
+    """
+    def __init__(self):
+        self.current: Optional[MarketSnapshot] = None
+        self.retired: Dict[int, MarketSnapshot] = {}
+        self._seq = 0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.current.version if self.current is not None else None
+
+    @contextmanager
+    def pin(self) -> Iterator[Optional[MarketSnapshot]]:
+        snapshot = self.current
+        if snapshot is None:
+            yield None
+            return
+        snapshot.refs += 1
+        try:
+            yield snapshot
+        finally:
+            snapshot.refs -= 1
+            if snapshot.retired and snapshot.refs == 0:
+                self._reclaim(snapshot)
+
+    def _reclaim(self, snapshot: MarketSnapshot) -> None:
+        if self.retired.pop(snapshot.seq, None) is not None:
+            snapshot_reclaimed.inc()
+
+    def swap(self, snapshot: MarketSnapshot) -> None:
+        previous, self.current = self.current, snapshot
+        snapshot_swaps.inc()
+        if previous is None:
+            return
+        previous.retired = True
+        if previous.refs:
+            self.retired[previous.seq] = previous
+            if len(self.retired) > 2:
+                logger.warning(
+                    "Old market snapshots are still pinned",
+                    extra={"event": "market_snapshot.pinned", "retired": len(self.retired)}
+                )
+        else:
+            snapshot_reclaimed.inc()
+
+    async def _build(self) -> bool:
+        started = time.perf_counter()
+        documents = await stock_store.find_stocks().batch_size(settings.STREAM_BATCH_SIZE).to_list(length=None)
+        self._seq += 1
+        # Column building and hashing are pure CPU; keep them off the event loop
+        snapshot = await asyncio.to_thread(MarketSnapshot, documents, self._seq)
+        snapshot_build_seconds.observe(time.perf_counter() - started)
+        if self.current is not None and snapshot.version == self.current.version:
+            return False
+        self.swap(snapshot)
+        logger.info(
+            "Market snapshot swapped",
+            extra={"event": "market_snapshot.swapped", "version": snapshot.version, "stocks": len(snapshot)}
+        )
+        return True
+
+    async def refresh(self) -> bool:
+        """Build and swap in a new snapshot; False when the data has not changed. Concurrent calls share one build."""
+        if self._refreshing is None:
+            self._refreshing = asyncio.create_task(self._build(), name="market-snapshot-build")
+            self._refreshing.add_done_callback(lambda _: setattr(self, "_refreshing", None))
+        return await asyncio.shield(self._refreshing)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Market snapshot refresh failed", extra={"event": "market_snapshot.failed"})
+            await asyncio.sleep(settings.MARKET_SNAPSHOT_REFRESH_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="market-snapshot")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        current = self.current
+        return {
+            "version": current.version if current else None,
+            "stocks": len(current) if current else 0,
+            "built_at": current.built_at.isoformat() if current else None,
+            "pinned": current.refs if current else 0,
+            "retired": {snapshot.version: snapshot.refs for snapshot in self.retired.values()},
+        }
+
+market_snapshot = SnapshotManager()
+
+registry.gauge(
+    "market_snapshot_live",
+    "Market snapshots held in memory (current plus retired ones still pinned)",
+    lambda: [((), (1 if market_snapshot.current else 0) + len(market_snapshot.retired))]
+)
+registry.gauge(
+    "market_snapshot_age_seconds",
+    "Seconds since the current market snapshot was built",
+    lambda: [((), (datetime.utcnow() - market_snapshot.current.built_at).total_seconds())] if market_snapshot.current else []
+)
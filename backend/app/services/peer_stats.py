@@ -0,0 +1,320 @@
+"""
+Sector, industry and market-wide aggregates with per-stock percentile ranks.
+
+A full run reads the compact stock documents once as columns, groups them by
+sector, industry and the whole universe, and stores:
+- `peer_stats`: one document per group (`sector:TECHNOLOGY`) with count, mean and
+  quantiles per metric
+- `stocks.peers`: per stock and level, each metric's percentile within its group
+  (`pct`, 0 lowest to 1 highest, ties averaged) and its ratio to the group median
+  (`vs_median`)
+
+so stock detail reads a comparison with point lookups and screener rules can use
+fields such as `peers.sector.pe_ratio.vs_median` or `peers.industry.roe.pct`.
+
+An incremental run recomputes only the sectors and industries holding a stock whose
+`last_updated` changed since the previous run; market-wide ranks wait for the next
+full run. The scheduler does a full run once a day after PEER_STATS_NIGHTLY_HOUR_UTC
+and incremental runs in between; a lease in `job_runs` keeps several workers from
+running it at once.
+
+Run once from the backend directory:
+    python -m app.services.peer_stats full
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.db.mongodb import close_mongo_connection, connect_to_mongo, mongodb
+from app.services.stock_store import STOCKS, stock_store
+
+logger = logging.getLogger(__name__)
+
+PEER_STATS = "peer_stats"
+JOB_RUNS = "job_runs"
+JOB_ID = "peer_stats"
+
+LEVELS = ("sector", "industry", "market")
+# Top-level stock fields, then statement ratios kept under financial_metrics
+TOP_LEVEL_METRICS = ("pe_ratio", "market_cap", "dividend_yield")
+RATIO_METRICS = ("roe", "roce", "debt_equity", "current_ratio", "quick_ratio")
+METRICS = TOP_LEVEL_METRICS + RATIO_METRICS
+
+def _quantile_key(q: float) -> str:
+    return f"p{round(q * 100):g}"
+
+def group_quantiles(codes: np.ndarray, values: np.ndarray, groups: int, quantiles: Sequence[float]):
+    """
+    Count, mean and linearly interpolated quantiles of `values` per group code, for
+    every group in one sort. NaN values are left out; empty groups give NaN.
+    """
+    present = ~np.isnan(values)
+    codes, values = codes[present], values[present]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    counts = np.bincount(codes, minlength=groups)
+    starts = np.cumsum(counts) - counts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.bincount(codes, weights=values, minlength=groups) / counts
+    position = starts[:, None] + np.asarray(quantiles)[None, :] * np.maximum(counts - 1, 0)[:, None]
+    last = max(len(values) - 1, 0)
+    low = np.clip(np.floor(position).astype(np.int64), 0, last)
+    high = np.clip(np.ceil(position).astype(np.int64), 0, last)
+    if len(values):
+        result = values[low] + (values[high] - values[low]) * (position - low)
+    else:
+        result = np.full(position.shape, np.nan)
+    result[counts == 0] = np.nan
+    return counts, means, result
+
+def group_percentiles(codes: np.ndarray, values: np.ndarray, groups: int) -> np.ndarray:
+    """
+    Each value's percentile within its group: 0 for the lowest, 1 for the highest,
+    equal values share their average rank and a group of one sits at 0.5. NaN stays NaN.
+    """
+    result = np.full(len(values), np.nan)
+    present = np.flatnonzero(~np.isnan(values))
+    if not len(present):
+        return result
+    order = present[np.lexsort((values[present], codes[present]))]
+    sorted_codes, sorted_values = codes[order], values[order]
+    counts = np.bincount(sorted_codes, minlength=groups)
+    starts = np.cumsum(counts) - counts
+    # Runs of equal (group, value) are ties; every member gets the run's middle rank
+    new_run = np.ones(len(order), dtype=bool)
+    new_run[1:] = (sorted_codes[1:] != sorted_codes[:-1]) | (sorted_values[1:] != sorted_values[:-1])
+    run_starts = np.flatnonzero(new_run)
+    run_ends = np.append(run_starts[1:], len(order))
+    run = np.cumsum(new_run) - 1
+    rank = (run_starts[run] + run_ends[run] - 1) / 2 - starts[sorted_codes]
+    size = counts[sorted_codes]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result[order] = np.where(size > 1, rank / (size - 1), 0.5)
+    return result
+
+def _value(value: Optional[float]) -> Optional[float]:
+    return None if value is None or value != value else float(value)
+
+class Snapshot:
+    """The stock universe as columns: symbols, sector/industry labels and one float array per metric"""
+
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.symbols = np.array([document["symbol"] for document in documents], dtype=object)
+        self.labels = {
+            "sector": np.array([document.get("sector") or "" for document in documents], dtype=object),
+            "industry": np.array([document.get("industry") or "" for document in documents], dtype=object),
+            "market": np.full(len(documents), "all", dtype=object),
+        }
+        metrics = [document.get("financial_metrics") or {} for document in documents]
+        self.values = {
+            metric: np.array([
+                document.get(metric) if document.get(metric) is not None else extra.get(metric)
+                for document, extra in zip(documents, metrics)
+            ], dtype=float)
+            for metric in METRICS
+        }
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @classmethod
+    async def load(cls, query: Optional[Dict[str, Any]] = None) -> "Snapshot":
+        fields = ["symbol", "sector", "industry", "financial_metrics", *TOP_LEVEL_METRICS]
+        cursor = stock_store.find_stocks(query, fields).batch_size(settings.STREAM_BATCH_SIZE)
+        return cls(await cursor.to_list(length=None))
+
+def aggregate(snapshot: Snapshot, level: str, only: Optional[set] = None, quantiles: Sequence[float] = (0.5,)):
+    """
+    Group documents and per-stock rank fields for one level. With `only`, groups not
+    in it are skipped (the snapshot may hold just part of their members).
+    """
+    names, codes = np.unique(snapshot.labels[level].astype(str), return_inverse=True)
+    keep_group = np.array([bool(name) and (only is None or name in only) for name in names])
+    now = datetime.utcnow()
+    groups = [
+        {"_id": f"{level}:{name}", "level": level, "name": name, "as_of": now, "metrics": {}}
+        for name in names
+    ]
+    ranks = {metric: {} for metric in METRICS}
+    median_column = list(quantiles).index(0.5)
+    for metric in METRICS:
+        values = snapshot.values[metric]
+        counts, means, table = group_quantiles(codes, values, len(names), quantiles)
+        for code, group in enumerate(groups):
+            stats = {"count": int(counts[code]), "mean": _value(means[code])}
+            for column, q in enumerate(quantiles):
+                stats[_quantile_key(q)] = _value(table[code, column])
+            stats["median"] = stats[_quantile_key(0.5)]
+            group["metrics"][metric] = stats
+        medians = table[codes, median_column]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ranks[metric]["pct"] = group_percentiles(codes, values, len(names))
+            ranks[metric]["vs_median"] = np.where(medians > 0, values / medians, np.nan)
+    groups = [group for group, keep in zip(groups, keep_group) if keep]
+    members = keep_group[codes]
+    return groups, ranks, members
+
+class PeerStatsJob:
+    def __init__(self):
+        self.quantiles = tuple(sorted(set(settings.PEER_STATS_QUANTILES) | {0.5}))
+        self.owner = f"{os.getpid()}-{id(self):x}"
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    async def _write(self, snapshot: Snapshot, levels: Dict[str, Optional[set]]) -> Dict[str, int]:
+        """Aggregate each level (restricted to a set of group names, or all) and store the results"""
+        counts = {}
+        updates: Dict[int, Dict[str, Any]] = {}
+        for level, only in levels.items():
+            groups, ranks, members = aggregate(snapshot, level, only, self.quantiles)
+            if groups:
+                await mongodb.get_collection(PEER_STATS).bulk_write(
+                    [ReplaceOne({"_id": group["_id"]}, group, upsert=True) for group in groups], ordered=False
+                )
+            counts[f"{level}_groups"] = len(groups)
+            for i in np.flatnonzero(members):
+                updates.setdefault(i, {})[f"peers.{level}"] = {
+                    metric: {"pct": _value(ranks[metric]["pct"][i]), "vs_median": _value(ranks[metric]["vs_median"][i])}
+                    for metric in METRICS
+                }
+        # One update per stock covering every level it was ranked in
+        writes = [UpdateOne({"symbol": snapshot.symbols[i]}, {"$set": fields}) for i, fields in updates.items()]
+        stocks = mongodb.get_collection(STOCKS)
+        for start in range(0, len(writes), 1000):
+            await stocks.bulk_write(writes[start:start + 1000], ordered=False)
+        counts["ranked"] = len(writes)
+        return counts
+
+    async def run_full(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        as_of = datetime.utcnow()
+        snapshot = await Snapshot.load()
+        counts = {"stocks": len(snapshot), **await self._write(snapshot, {level: None for level in LEVELS})}
+        await self._finish("full", as_of, counts, started)
+        return counts
+
+    async def run_incremental(self, since: datetime) -> Dict[str, Any]:
+        started = time.perf_counter()
+        as_of = datetime.utcnow()
+        changed = await stock_store.find_stocks({"last_updated": {"$gt": since}}, ["sector", "industry"]).to_list(length=None)
+        sectors = {stock["sector"] for stock in changed if stock.get("sector")}
+        industries = {stock["industry"] for stock in changed if stock.get("industry")}
+        counts = {"changed": len(changed)}
+        if sectors or industries:
+            snapshot = await Snapshot.load({"$or": [
+                {"sector": {"$in": sorted(sectors)}}, {"industry": {"$in": sorted(industries)}}
+            ]})
+            counts.update(await self._write(snapshot, {"sector": sectors, "industry": industries}))
+        await self._finish("incremental", as_of, counts, started)
+        return counts
+
+    async def _finish(self, kind: str, as_of: datetime, counts: Dict[str, Any], started: float) -> None:
+        update = {f"last_{kind}": as_of, "last_run": as_of}
+        await mongodb.get_collection(JOB_RUNS).update_one({"_id": JOB_ID}, {"$set": update}, upsert=True)
+        self.last_run = {"kind": kind, "as_of": as_of, "seconds": round(time.perf_counter() - started, 3), **counts}
+        logger.info("Peer statistics updated", extra={"event": "peer_stats.run", **self.last_run})
+
+    async def _acquire(self, seconds: float) -> Optional[Dict[str, Any]]:
+        """Take the job lease; returns the job document, or None when another worker holds it"""
+        now = datetime.utcnow()
+        try:
+            return await mongodb.get_collection(JOB_RUNS).find_one_and_update(
+                {"_id": JOB_ID, "$or": [{"lease_until": {"$lt": now}}, {"lease_until": {"$exists": False}}]},
+                {"$set": {"lease_until": now + timedelta(seconds=seconds), "owner": self.owner}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            return None
+
+    async def _release(self) -> None:
+        await mongodb.get_collection(JOB_RUNS).update_one(
+            {"_id": JOB_ID, "owner": self.owner}, {"$set": {"lease_until": datetime.utcnow()}}
+        )
+
+    async def tick(self) -> Optional[Dict[str, Any]]:
+        """Run whatever is due: the nightly full run, otherwise an incremental one"""
+        job = await self._acquire(settings.PEER_STATS_INCREMENTAL_SECONDS)
+        if job is None:
+            return None
+        try:
+            now = datetime.utcnow()
+            last_full = job.get("last_full")
+            nightly_due = now.hour >= settings.PEER_STATS_NIGHTLY_HOUR_UTC and (
+                last_full is None or last_full.date() < now.date()
+            )
+            if nightly_due or job.get("last_run") is None:
+                return await self.run_full()
+            return await self.run_incremental(job["last_run"])
+        finally:
+            await self._release()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Peer statistics run failed", extra={"event": "peer_stats.failed"})
+            await asyncio.sleep(settings.PEER_STATS_INCREMENTAL_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="peer-stats")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def compare(self, stock: Dict[str, Any]) -> Dict[str, Any]:
+        """A stock's ranks next to its sector's and industry's stats; two point reads"""
+        groups = mongodb.get_collection(PEER_STATS)
+        peers = stock.get("peers") or {}
+        comparison = {}
+        for level in ("sector", "industry"):
+            name = stock.get(level)
+            if not name:
+                continue
+            group = await groups.find_one({"_id": f"{level}:{name}"}, {"_id": 0, "metrics": 1, "as_of": 1})
+            comparison[level] = {
+                "name": name,
+                "as_of": group["as_of"] if group else None,
+                "stats": group["metrics"] if group else None,
+                "ranks": peers.get(level)
+            }
+        return comparison
+
+peer_stats = PeerStatsJob()
+
+async def run(kind: str) -> Dict[str, Any]:
+    await connect_to_mongo()
+    try:
+        if kind == "full":
+            return await peer_stats.run_full()
+        job = await mongodb.get_collection(JOB_RUNS).find_one({"_id": JOB_ID}) or {}
+        return await peer_stats.run_incremental(job.get("last_run") or datetime.min)
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=("full", "incremental"))
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.kind)), indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from app.db.mongodb import mongodb
+from app.services.stock_store import stock_store
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOTS = "portfolio_snapshots"
+DUPLICATE_KEY = 11000
+
+def _to_day(value: datetime) -> np.datetime64:
+    return np.datetime64(value.date(), "D")
+
+def _to_datetime(day: np.datetime64) -> datetime:
+    return datetime.combine(day.astype(datetime), datetime.min.time())
+
+def business_days(start: np.datetime64, end: np.datetime64) -> np.ndarray:
+    days = np.arange(start, end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    return days[np.is_busday(days)]
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value down each column"""
+    rows = np.arange(matrix.shape[0])[:, None]
+    index = np.where(np.isnan(matrix), 0, rows)
+    np.maximum.accumulate(index, axis=0, out=index)
+    return matrix[index, np.arange(matrix.shape[1])]
+
+async def load_daily_closes(symbols: List[str], days: np.ndarray) -> np.ndarray:
+    """Closes aligned to `days` (rows) x `symbols` (columns), forward-filled over gaps"""
+    closes = np.full((len(days), len(symbols)), np.nan)
+    if not symbols or not len(days):
+        return closes
+    column = {symbol: i for i, symbol in enumerate(symbols)}
+    # One month of lead-in so the first grid day can carry the previous close forward
+    start = _to_datetime(days[0]) - timedelta(days=31)
+    series = await stock_store.load_bars(symbols, start, _to_datetime(days[-1]), fields=("close",))
+    for symbol, bars in series.items():
+        bar_days, bar_closes = bars["dates"], bars["close"]
+        if not len(bar_days):
+            continue
+        # Use the latest close on or before each grid day
+        position = np.searchsorted(bar_days, days, side="right") - 1
+        valid = position >= 0
+        closes[valid, column[symbol]] = bar_closes[position[valid]]
+    return forward_fill(closes)
+
+def replay(
+    days: np.ndarray,
+    symbols: List[str],
+    closes: np.ndarray,
+    trades: List[Dict[str, Any]],
+    start_cash: float,
+    start_positions: Dict[str, float]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Replay executed trades over a dates x holdings grid. A trade on a weekend or
+    holiday counts from the next trading day; trades after the last day of the grid
+    are left out, they belong to the replay whose grid holds that next trading day.
+    Returns (cash per day, positions per day x symbol, equity per day).
+    """
+    column = {symbol: i for i, symbol in enumerate(symbols)}
+    quantity_delta = np.zeros((len(days), len(symbols)))
+    cash_delta = np.zeros(len(days))
+
+    if len(days):
+        trades = [trade for trade in trades if _to_day(trade["executed_at"]) <= days[-1]]
+    if trades:
+        trade_days = np.array([_to_day(trade["executed_at"]) for trade in trades], dtype="datetime64[D]")
+        # Trades on a weekend or holiday count from the next trading day
+        rows = np.searchsorted(days, trade_days)
+        columns = np.array([column[trade["symbol"]] for trade in trades])
+        signed = np.array([
+            trade["quantity"] if trade["trade_type"] == "BUY" else -trade["quantity"]
+            for trade in trades
+        ], dtype=float)
+        prices = np.array([trade["price"] for trade in trades], dtype=float)
+        np.add.at(quantity_delta, (rows, columns), signed)
+        np.add.at(cash_delta, rows, -signed * prices)
+
+        # Before a symbol's first stored close, value it at its first trade price
+        first_prices = np.full(len(symbols), np.nan)
+        for col, price in zip(columns[::-1], prices[::-1]):
+            first_prices[col] = price
+        closes = np.where(np.isnan(closes), first_prices, closes)
+
+    initial = np.array([start_positions.get(symbol, 0.0) for symbol in symbols])
+    positions = initial + np.cumsum(quantity_delta, axis=0)
+    cash = start_cash + np.cumsum(cash_delta)
+    equity = cash + np.nansum(positions * closes, axis=1)
+    return cash, positions, equity
+
+class PerformanceService:
+    """
+    Daily equity curve per user. Each completed trading day is stored once in
+    `portfolio_snapshots`; later calls replay only the trades and closes after the
+    last stored day, so a chart is one indexed range read.
+    """
+    def __init__(self):
+        self._indexes_ready = False
+
+    async def _ensure_indexes(self) -> None:
+        if not self._indexes_ready:
+            await mongodb.get_collection(SNAPSHOTS).create_index(
+                [("user_id", ASCENDING), ("date", ASCENDING)], unique=True
+            )
+            self._indexes_ready = True
+
+    async def extend_snapshots(self, user_id: str, initial_capital: float) -> int:
+        """Append snapshots for trading days completed since the last stored one"""
+        await self._ensure_indexes()
+        snapshots = mongodb.get_collection(SNAPSHOTS)
+        last = await snapshots.find_one({"user_id": user_id}, sort=[("date", DESCENDING)])
+        end = np.datetime64(datetime.utcnow().date(), "D") - np.timedelta64(1, "D")
+
+        trade_query: Dict[str, Any] = {"user_id": user_id, "status": "EXECUTED"}
+        if last is not None:
+            start = _to_day(last["date"]) + np.timedelta64(1, "D")
+            start_cash = last["cash"]
+            start_positions = last["positions"]
+            trade_query["executed_at"] = {"$gte": _to_datetime(start)}
+        else:
+            first_trade = await mongodb.get_collection("trades").find_one(
+                trade_query, sort=[("executed_at", ASCENDING)]
+            )
+            if first_trade is None:
+                return 0
+            start = _to_day(first_trade["executed_at"])
+            start_cash = initial_capital
+            start_positions = {}
+
+        days = business_days(start, end)
+        if not len(days):
+            return 0
+
+        trades = await mongodb.get_collection("trades").find(
+            trade_query,
+            {"symbol": 1, "trade_type": 1, "quantity": 1, "price": 1, "executed_at": 1}
+        ).sort("executed_at", ASCENDING).to_list(length=None)
+        # Snapshots stop at the last trading day; a trade after it (yesterday being a
+        # weekend) is replayed by the next run, whose range starts the day after that
+        trades = [trade for trade in trades if _to_day(trade["executed_at"]) <= days[-1]]
+
+        symbols = sorted(set(start_positions) | {trade["symbol"] for trade in trades})
+        closes = await load_daily_closes(symbols, days)
+        cash, positions, equity = replay(days, symbols, closes, trades, start_cash, start_positions)
+
+        documents = []
+        for i, day in enumerate(days):
+            documents.append({
+                "user_id": user_id,
+                "date": _to_datetime(day),
+                "equity": float(equity[i]),
+                "cash": float(cash[i]),
+                "positions": {
+                    symbol: float(quantity)
+                    for symbol, quantity in zip(symbols, positions[i])
+                    if quantity
+                }
+            })
+        try:
+            await snapshots.insert_many(documents, ordered=False)
+        except BulkWriteError as exc:
+            # A concurrent request already stored some of these days; anything else is a real failure
+            errors = [error for error in exc.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY]
+            if errors or exc.details.get("writeConcernErrors"):
+                logger.error(
+                    "Storing portfolio snapshots failed",
+                    extra={"event": "performance.snapshot_write_failed", "user_id": user_id,
+                           "codes": sorted({error.get("code") for error in errors})}
+                )
+                raise
+        return len(documents)
+
+    async def equity_curve(self, user_id: str, initial_capital: float, days: int = 365) -> List[Dict[str, Any]]:
+        await self.extend_snapshots(user_id, initial_capital)
+        since = datetime.utcnow() - timedelta(days=days)
+        cursor = mongodb.get_collection(SNAPSHOTS).find(
+            {"user_id": user_id, "date": {"$gte": since}},
+            {"_id": 0, "date": 1, "equity": 1}
+        ).sort("date", ASCENDING)
+        return [
+            {"date": snapshot["date"].strftime("%Y-%m-%d"), "value": round(snapshot["equity"], 2)}
+            async for snapshot in cursor
+        ]
+
+performance_service = PerformanceService()
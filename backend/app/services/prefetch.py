@@ -0,0 +1,263 @@
+"""
+Keeps the Alpha Vantage cache warm for the symbols people actually look at, so a
+deploy (or a TTL running out) does not send the first users' requests upstream.
+
+A symbol's popularity combines three signals, weighted by PREFETCH_SOURCE_WEIGHTS:
+- requests: lookups counted by the stock endpoints. Each worker counts in memory and
+  adds its counts to one document per symbol and day in `symbol_requests`, so the
+  ranking survives restarts; each day back counts half as much as the day after
+- watchlists: users with the symbol in `watchlist`
+- holdings: portfolios with a non-zero position in it
+
+Right after startup and then every PREFETCH_INTERVAL_SECONDS, quotes, overviews and
+statements of the top PREFETCH_TOP_K symbols are checked against the cache. Entries
+that are missing or have less than PREFETCH_REFRESH_AHEAD of their TTL left are
+refetched, the smallest share of TTL left first, up to the PREFETCH_CALLS_PER_MINUTE
+budget for the interval. Calls are spaced evenly across the interval rather than
+sent in a burst, and each entry is stored with its TTL cut by a random share up to
+PREFETCH_TTL_JITTER, so entries warmed together come due at different times instead
+of expiring in one wave. A rate-limit reply ends the cycle early. A lease in
+`job_runs` keeps several workers from prefetching at once; every worker still
+flushes its own request counts.
+"""
+import asyncio
+import heapq
+import logging
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.mongodb import mongodb
+from app.services.alpha_vantage import ERROR_KEYS, alpha_vantage
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_REQUESTS = "symbol_requests"
+JOB_RUNS = "job_runs"
+JOB_ID = "prefetch"
+
+# What the stock detail page reads; daily bars are kept in Mongo by price_history
+FUNCTIONS = ("GLOBAL_QUOTE", "OVERVIEW", "INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW")
+
+prefetch_calls = registry.counter(
+    "prefetch_calls_total",
+    "Upstream calls made by the prefetcher, by API function and outcome (ok, error, rate_limited)",
+    ("function", "outcome")
+)
+
+def _day(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, moment.day)
+
+def combine_scores(sources: Mapping[str, Mapping[str, float]], weights: Mapping[str, float]) -> Dict[str, float]:
+    """Weighted sum of each source's per-symbol counts"""
+    scores: Dict[str, float] = {}
+    for source, counts in sources.items():
+        weight = weights.get(source, 0.0)
+        for symbol, count in counts.items():
+            scores[symbol] = scores.get(symbol, 0.0) + weight * count
+    return scores
+
+def plan(requests: Sequence[Dict[str, Any]], remaining: Sequence[Optional[float]], ttls: Mapping[str, float],
+         refresh_ahead: float) -> List[Dict[str, Any]]:
+    """
+    Requests to refetch, most urgent first. Urgency is the share of its TTL an entry
+    has left (0 when missing), so a quote about to expire and a statement about to
+    expire compare fairly; ties keep the requests' order, i.e. symbol rank.
+    """
+    due = []
+    for position, (params, seconds) in enumerate(zip(requests, remaining)):
+        left = 0.0 if seconds is None else seconds / ttls[params["function"]]
+        if left < refresh_ahead:
+            due.append((left, position))
+    due.sort()
+    return [requests[position] for _, position in due]
+
+class Prefetcher:
+    def __init__(self):
+        self.owner = f"{os.getpid()}-{id(self):x}"
+        self.counts: Counter = Counter()
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._indexes_ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, symbol: str) -> None:
+        """Count one request for a symbol; a dict increment, cheap enough for every call"""
+        # Nothing would flush the counts while the scheduler is not running
+        if self._task is not None:
+            self.counts[symbol] += 1
+
+    async def _ensure_indexes(self) -> None:
+        if not self._indexes_ready:
+            await mongodb.get_collection(SYMBOL_REQUESTS).create_index([("day", ASCENDING)])
+            self._indexes_ready = True
+
+    async def flush(self) -> int:
+        """Add this worker's request counts to today's documents; returns the symbols written"""
+        if not self.counts:
+            return 0
+        await self._ensure_indexes()
+        counts, self.counts = self.counts, Counter()
+        day = _day(datetime.utcnow())
+        writes = [
+            UpdateOne(
+                {"_id": f"{symbol}:{day:%Y-%m-%d}"},
+                {"$inc": {"hits": hits}, "$setOnInsert": {"symbol": symbol, "day": day}},
+                upsert=True
+            )
+            for symbol, hits in counts.items()
+        ]
+        try:
+            await mongodb.get_collection(SYMBOL_REQUESTS).bulk_write(writes, ordered=False)
+        except Exception:
+            # Keep the counts for the next flush rather than losing them
+            self.counts.update(counts)
+            raise
+        return len(writes)
+
+    async def popularity(self) -> Dict[str, Dict[str, float]]:
+        """Per-symbol counts of each source: decayed requests, watchlists and holdings"""
+        today = _day(datetime.utcnow())
+        since = today - timedelta(days=settings.PREFETCH_REQUEST_DAYS - 1)
+        requests: Dict[str, float] = {}
+        async for document in mongodb.get_collection(SYMBOL_REQUESTS).find(
+            {"day": {"$gte": since}}, {"_id": 0, "symbol": 1, "day": 1, "hits": 1}
+        ):
+            weight = 0.5 ** (today - document["day"]).days
+            requests[document["symbol"]] = requests.get(document["symbol"], 0.0) + document["hits"] * weight
+
+        watchlists = {
+            group["_id"]: group["count"]
+            async for group in mongodb.get_collection("users").aggregate([
+                {"$unwind": "$watchlist"},
+                {"$group": {"_id": "$watchlist", "count": {"$sum": 1}}}
+            ])
+        }
+        holdings = {
+            group["_id"]: group["count"]
+            async for group in mongodb.get_collection("portfolios").aggregate([
+                {"$project": {"holdings": {"$objectToArray": "$holdings"}}},
+                {"$unwind": "$holdings"},
+                {"$match": {"holdings.v": {"$gt": 0}}},
+                {"$group": {"_id": "$holdings.k", "count": {"$sum": 1}}}
+            ])
+        }
+        return {"requests": requests, "watchlists": watchlists, "holdings": holdings}
+
+    async def top(self, k: int) -> List[str]:
+        scores = combine_scores(await self.popularity(), settings.PREFETCH_SOURCE_WEIGHTS)
+        return heapq.nlargest(k, scores, key=scores.__getitem__)
+
+    async def run_once(self) -> Dict[str, Any]:
+        """One prefetch cycle; takes up to PREFETCH_INTERVAL_SECONDS because calls are spaced out"""
+        started = time.perf_counter()
+        # Days that no longer count towards the ranking
+        cutoff = _day(datetime.utcnow()) - timedelta(days=settings.PREFETCH_REQUEST_DAYS - 1)
+        await mongodb.get_collection(SYMBOL_REQUESTS).delete_many({"day": {"$lt": cutoff}})
+
+        symbols = await self.top(settings.PREFETCH_TOP_K)
+        requests = [{"function": function, "symbol": symbol} for symbol in symbols for function in FUNCTIONS]
+        remaining = await alpha_vantage.remaining_ttls(requests)
+        due = plan(requests, remaining, alpha_vantage.CACHE_TTLS, settings.PREFETCH_REFRESH_AHEAD)
+
+        budget = int(settings.PREFETCH_CALLS_PER_MINUTE * settings.PREFETCH_INTERVAL_SECONDS / 60)
+        spacing = 60 / settings.PREFETCH_CALLS_PER_MINUTE
+        outcomes: Counter = Counter()
+        for i, params in enumerate(due[:budget]):
+            if i:
+                await asyncio.sleep(spacing)
+            function = params["function"]
+            ttl = alpha_vantage.CACHE_TTLS[function] * random.uniform(1 - settings.PREFETCH_TTL_JITTER, 1)
+            try:
+                data = await alpha_vantage.refresh(function, ttl, symbol=params["symbol"])
+            except Exception:
+                outcome = "error"
+            else:
+                if "Error Message" in data:
+                    outcome = "error"
+                elif any(key in data for key in ERROR_KEYS):
+                    outcome = "rate_limited"
+                else:
+                    outcome = "ok"
+            prefetch_calls.inc(function, outcome)
+            outcomes[outcome] += 1
+            if outcome == "rate_limited":
+                # Upstream is out of quota; anything more now would only be refused too
+                break
+
+        self.last_run = {
+            "as_of": datetime.utcnow(),
+            "seconds": round(time.perf_counter() - started, 3),
+            "symbols": len(symbols),
+            "due": len(due),
+            "budget": budget,
+            **{outcome: outcomes[outcome] for outcome in ("ok", "error", "rate_limited")},
+        }
+        logger.info("Prefetch cycle finished", extra={"event": "prefetch.run", **self.last_run})
+        return self.last_run
+
+    async def _acquire(self, seconds: float) -> Optional[Dict[str, Any]]:
+        """Take the job lease; returns the job document, or None when another worker holds it"""
+        now = datetime.utcnow()
+        try:
+            return await mongodb.get_collection(JOB_RUNS).find_one_and_update(
+                {"_id": JOB_ID, "$or": [{"lease_until": {"$lt": now}}, {"lease_until": {"$exists": False}}]},
+                {"$set": {"lease_until": now + timedelta(seconds=seconds), "owner": self.owner}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            return None
+
+    async def _release(self) -> None:
+        await mongodb.get_collection(JOB_RUNS).update_one(
+            {"_id": JOB_ID, "owner": self.owner}, {"$set": {"lease_until": datetime.utcnow()}}
+        )
+
+    async def tick(self) -> Optional[Dict[str, Any]]:
+        """Flush request counts, then run a cycle unless another worker holds the lease"""
+        await self.flush()
+        # A little longer than a cycle can take, so a worker that dies mid-cycle frees it
+        job = await self._acquire(settings.PREFETCH_INTERVAL_SECONDS * 1.5)
+        if job is None:
+            return None
+        try:
+            return await self.run_once()
+        finally:
+            await self._release()
+
+    async def _loop(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Prefetch cycle failed", extra={"event": "prefetch.failed"})
+            await asyncio.sleep(max(settings.PREFETCH_INTERVAL_SECONDS - (time.monotonic() - started), 0))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="prefetch")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            # The counts of a worker going away still count towards the next ranking
+            await self.flush()
+        except Exception:
+            logger.exception("Flushing request counts failed", extra={"event": "prefetch.flush_failed"})
+
+prefetcher = Prefetcher()
@@ -0,0 +1,177 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from app.core.config import settings
+from app.services.alpha_vantage import alpha_vantage
+
+Tick = Dict[str, Any]
+QuoteSource = Callable[[str], Awaitable[Optional[Tick]]]
+
+async def alpha_vantage_quote(symbol: str) -> Optional[Tick]:
+    """Read a quote through the AlphaVantageAPI cache and turn it into a tick"""
+    quote = await alpha_vantage.get_quote(symbol)
+    global_quote = quote.get("Global Quote")
+    if not global_quote:
+        return None
+    return {
+        "symbol": symbol,
+        "price": float(global_quote["05. price"]),
+        "change": float(global_quote["09. change"]),
+        "change_percent": float(global_quote["10. change percent"].rstrip("%")),
+        "volume": int(global_quote["06. volume"]),
+        "timestamp": time.time()
+    }
+
+class QuoteSubscriber:
+    """
+    One client connection. Holds at most one unsent tick per symbol: a newer tick
+    replaces a stale one instead of queueing behind it, so a slow client costs
+    O(subscribed symbols) memory no matter how far behind it falls.
+    """
+    def __init__(self, send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        self.send = send
+        self.symbols: Set[str] = set()
+        self.pending: Dict[str, Tick] = {}
+        self.coalesced = 0
+        self._ready = asyncio.Event()
+
+    def offer(self, tick: Tick) -> None:
+        if tick["symbol"] in self.pending:
+            self.coalesced += 1
+        self.pending[tick["symbol"]] = tick
+        self._ready.set()
+
+    async def run(self, send_timeout: float) -> None:
+        """Write pending ticks until the connection fails or stalls past send_timeout"""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            batch, self.pending = self.pending, {}
+            await asyncio.wait_for(
+                self.send({"type": "quotes", "data": list(batch.values())}),
+                timeout=send_timeout
+            )
+
+class QuoteHub:
+    """
+    Fans quote ticks out to subscribers. Each symbol has exactly one poller task,
+    started with the first subscriber (or retain) and cancelled with the last,
+    no matter how many connections watch it.
+
+    At most max_symbols symbols are polled at once. A subscription that would start
+    a poller past the cap is refused; symbols that are already polled can always be
+    joined. Retained symbols (portfolio holdings being valued) count towards the cap
+    but are never refused.
+    """
+    def __init__(self, source: Optional[QuoteSource] = None, interval: Optional[float] = None,
+                 max_symbols: Optional[int] = None):
+        self.source = source or alpha_vantage_quote
+        self.interval = interval or settings.QUOTE_POLL_INTERVAL_SECONDS
+        self.max_symbols = max_symbols or settings.QUOTE_HUB_MAX_SYMBOLS
+        self._subscribers: Dict[str, Set[QuoteSubscriber]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self._last: Dict[str, Tick] = {}
+        self._listeners: List[Callable[[Tick], None]] = []
+        self._retained: Dict[str, int] = {}
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._pollers)
+
+    def last_tick(self, symbol: str) -> Optional[Tick]:
+        return self._last.get(symbol)
+
+    def add_listener(self, listener: Callable[[Tick], None]) -> None:
+        """Register an in-process consumer that sees every published tick"""
+        self._listeners.append(listener)
+
+    def _ensure_poller(self, symbol: str) -> bool:
+        if symbol in self._pollers:
+            return False
+        self._pollers[symbol] = asyncio.create_task(self._poll(symbol))
+        return True
+
+    def _maybe_stop_poller(self, symbol: str) -> None:
+        if self._subscribers.get(symbol) or self._retained.get(symbol):
+            return
+        self._subscribers.pop(symbol, None)
+        self._last.pop(symbol, None)
+        poller = self._pollers.pop(symbol, None)
+        if poller is not None:
+            poller.cancel()
+
+    def retain(self, symbols: Iterable[str]) -> None:
+        """Keep symbols polled for an in-process consumer that has no socket"""
+        for symbol in symbols:
+            self._retained[symbol] = self._retained.get(symbol, 0) + 1
+            self._ensure_poller(symbol)
+
+    def release(self, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            count = self._retained.get(symbol, 0) - 1
+            if count > 0:
+                self._retained[symbol] = count
+            else:
+                self._retained.pop(symbol, None)
+                self._maybe_stop_poller(symbol)
+
+    def subscribe(self, subscriber: QuoteSubscriber, symbols: Iterable[str]) -> List[str]:
+        """Subscribe to symbols; returns those refused because the hub is polling its maximum"""
+        refused = []
+        for symbol in symbols:
+            if symbol in subscriber.symbols:
+                continue
+            if symbol not in self._pollers and len(self._pollers) >= self.max_symbols:
+                refused.append(symbol)
+                continue
+            subscriber.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(subscriber)
+            if not self._ensure_poller(symbol) and symbol in self._last:
+                # Late joiners get the current price right away instead of waiting a full interval
+                subscriber.offer(self._last[symbol])
+        return refused
+
+    def unsubscribe(self, subscriber: QuoteSubscriber, symbols: Optional[Iterable[str]] = None) -> None:
+        for symbol in list(symbols if symbols is not None else subscriber.symbols):
+            subscriber.symbols.discard(symbol)
+            subscriber.pending.pop(symbol, None)
+            watchers = self._subscribers.get(symbol)
+            if watchers is None:
+                continue
+            watchers.discard(subscriber)
+            self._maybe_stop_poller(symbol)
+
+    def publish(self, tick: Tick) -> None:
+        symbol = tick["symbol"]
+        previous = self._last.get(symbol)
+        if previous is not None and previous["price"] == tick["price"] and previous.get("volume") == tick.get("volume"):
+            return
+        self._last[symbol] = tick
+        for subscriber in self._subscribers.get(symbol, ()):
+            subscriber.offer(tick)
+        for listener in self._listeners:
+            listener(tick)
+
+    async def _poll(self, symbol: str) -> None:
+        while True:
+            try:
+                tick = await self.source(symbol)
+            except Exception:
+                tick = None
+            if tick is not None:
+                self.publish(tick)
+            # Jitter keeps symbols subscribed together from polling upstream in lockstep
+            await asyncio.sleep(self.interval * random.uniform(0.9, 1.1))
+
+    async def close(self) -> None:
+        pollers = list(self._pollers.values())
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+        self._pollers.clear()
+        self._subscribers.clear()
+        self._retained.clear()
+        self._last.clear()
+
+quote_hub = QuoteHub()
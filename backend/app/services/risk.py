@@ -0,0 +1,170 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.core.config import settings
+from app.services.cache import TTLCache
+from app.services.performance import business_days, load_daily_closes
+
+TRADING_DAYS = 252
+DAY_SECONDS = 86400
+
+class ReturnsMatrix:
+    """Daily log returns (rows = days, columns = symbols) shared by every portfolio in a universe"""
+
+    def __init__(self, symbols: List[str], days: np.ndarray, closes: np.ndarray):
+        self.symbols = symbols
+        self.column = {symbol: i for i, symbol in enumerate(symbols)}
+        self.days = days
+        self.last_prices = np.nan_to_num(closes[-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(np.log(closes), axis=0)
+        # Days before a symbol's first close (or missing data) contribute no return
+        self.returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+        self._covariance: Optional[np.ndarray] = None
+
+    @property
+    def covariance(self) -> np.ndarray:
+        if self._covariance is None:
+            # A one-symbol universe (just the benchmark) gives a 0-d array from np.cov
+            self._covariance = np.atleast_2d(np.cov(self.returns, rowvar=False))
+        return self._covariance
+
+    def weights(self, portfolios: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Portfolio x symbol weight matrix, as a fraction of total value including cash"""
+        weights = np.zeros((len(portfolios), len(self.symbols)))
+        for row, portfolio in enumerate(portfolios):
+            for symbol, quantity in portfolio.get("holdings", {}).items():
+                column = self.column.get(symbol)
+                if column is not None:
+                    weights[row, column] = quantity * self.last_prices[column]
+        totals = weights.sum(axis=1) + np.array([portfolio.get("cash_balance", 0.0) for portfolio in portfolios])
+        totals[totals == 0] = 1.0
+        return weights / totals[:, None]
+
+def risk_metrics(
+    returns: np.ndarray,
+    covariance: np.ndarray,
+    weights: np.ndarray,
+    benchmark_column: Optional[int],
+    risk_free_rate: float,
+    confidence: float
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized risk metrics for P portfolios at once.
+    returns is T x N, covariance N x N, weights P x N; every output has length P.
+    """
+    daily_risk_free = risk_free_rate / TRADING_DAYS
+    portfolio_returns = returns @ weights.T
+    mean = portfolio_returns.mean(axis=0)
+    variance = np.einsum("pi,ij,pj->p", weights, covariance, weights)
+    daily_volatility = np.sqrt(np.maximum(variance, 0.0))
+
+    excess = mean - daily_risk_free
+    downside = np.sqrt(np.mean(np.minimum(portfolio_returns - daily_risk_free, 0.0) ** 2, axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(daily_volatility > 0, excess / daily_volatility * np.sqrt(TRADING_DAYS), 0.0)
+        sortino = np.where(downside > 0, excess / downside * np.sqrt(TRADING_DAYS), 0.0)
+
+    if benchmark_column is not None and covariance[benchmark_column, benchmark_column] > 0:
+        beta = weights @ covariance[:, benchmark_column] / covariance[benchmark_column, benchmark_column]
+    else:
+        beta = np.full(len(weights), np.nan)
+
+    # Historical one-day VaR/CVaR, reported as positive loss fractions
+    cutoff = np.quantile(portfolio_returns, 1.0 - confidence, axis=0)
+    tail = portfolio_returns <= cutoff
+    tail_count = np.maximum(tail.sum(axis=0), 1)
+    cvar = -(np.where(tail, portfolio_returns, 0.0).sum(axis=0) / tail_count)
+
+    return {
+        "volatility": daily_volatility * np.sqrt(TRADING_DAYS),
+        "beta": beta,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "var": -cutoff,
+        "cvar": cvar
+    }
+
+def correlation_matrix(covariance: np.ndarray, columns: List[int]) -> np.ndarray:
+    sub = covariance[np.ix_(columns, columns)]
+    scale = np.sqrt(np.diag(sub))
+    scale[scale == 0] = 1.0
+    return sub / np.outer(scale, scale)
+
+def _holdings_key(portfolio: Dict[str, Any]) -> str:
+    items = sorted((symbol, quantity) for symbol, quantity in portfolio.get("holdings", {}).items() if quantity)
+    return hashlib.blake2b(repr((items, portfolio.get("cash_balance", 0.0))).encode(), digest_size=12).hexdigest()
+
+class RiskService:
+    """
+    Portfolio risk from one returns matrix per universe and trading day. The covariance
+    matrix is computed once per (universe, day) and results are cached per user until
+    that user's holdings or the day change. Both caches are bounded and their entries
+    expire after a day.
+    """
+    def __init__(self):
+        self._matrices = TTLCache(max_entries=settings.RISK_MATRIX_CACHE_MAX_ENTRIES)
+        self._results = TTLCache(max_entries=settings.RISK_RESULT_CACHE_MAX_ENTRIES)
+
+    async def returns_matrix(self, symbols: Sequence[str]) -> ReturnsMatrix:
+        universe = sorted(set(symbols) | {settings.RISK_BENCHMARK_SYMBOL})
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        # Reuse any cached matrix for today that already covers these symbols
+        for matrix_day, matrix in self._matrices.values():
+            if matrix_day == today and all(symbol in matrix.column for symbol in universe):
+                return matrix
+
+        universe_key = hashlib.blake2b(",".join(universe).encode(), digest_size=12).hexdigest()
+        end = np.datetime64(today, "D")
+        days = business_days(end - np.timedelta64(int(settings.RISK_LOOKBACK_DAYS * 7 / 5) + 7, "D"), end)
+        days = days[-(settings.RISK_LOOKBACK_DAYS + 1):]
+        closes = await load_daily_closes(universe, days)
+        matrix = ReturnsMatrix(universe, days, closes)
+        self._matrices.set((today, universe_key), (today, matrix), DAY_SECONDS)
+        return matrix
+
+    async def portfolio_risk(self, portfolios: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Risk metrics keyed by user_id; only portfolios whose holdings changed are recomputed"""
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        results: Dict[str, Dict[str, Any]] = {}
+        stale = []
+        for portfolio in portfolios:
+            key = _holdings_key(portfolio)
+            cached = self._results.get(portfolio["user_id"])
+            if cached is not None and cached[0] == key and cached[1] == today:
+                results[portfolio["user_id"]] = cached[2]
+            else:
+                stale.append((portfolio, key))
+        if not stale:
+            return results
+
+        symbols = {symbol for portfolio, _ in stale for symbol in portfolio.get("holdings", {})}
+        matrix = await self.returns_matrix(sorted(symbols))
+        stale_portfolios = [portfolio for portfolio, _ in stale]
+        metrics = risk_metrics(
+            matrix.returns,
+            matrix.covariance,
+            matrix.weights(stale_portfolios),
+            matrix.column.get(settings.RISK_BENCHMARK_SYMBOL),
+            settings.RISK_FREE_RATE,
+            settings.RISK_VAR_CONFIDENCE
+        )
+        for row, (portfolio, key) in enumerate(stale):
+            held = sorted(symbol for symbol, quantity in portfolio.get("holdings", {}).items() if quantity)
+            columns = [matrix.column[symbol] for symbol in held]
+            result = {name: float(values[row]) for name, values in metrics.items()}
+            result.update({
+                "as_of": today,
+                "confidence": settings.RISK_VAR_CONFIDENCE,
+                "benchmark": settings.RISK_BENCHMARK_SYMBOL,
+                "correlation": {
+                    "symbols": held,
+                    "matrix": correlation_matrix(matrix.covariance, columns).tolist() if columns else []
+                }
+            })
+            self._results.set(portfolio["user_id"], (key, today, result), DAY_SECONDS)
+            results[portfolio["user_id"]] = result
+        return results
+
+risk_service = RiskService()
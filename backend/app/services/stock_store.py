@@ -0,0 +1,238 @@
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+import numpy as np
+from pymongo import ASCENDING, DESCENDING, ReplaceOne, UpdateOne
+from app.db.mongodb import mongodb
+
+STOCKS = "stocks"
+BARS = "stock_bars"
+STATEMENTS = "stock_statements"
+
+BAR_FIELDS = ("open", "high", "low", "close", "adjusted_close", "volume", "dividend_amount", "split_coefficient")
+STATEMENT_KINDS = ("income_statement", "balance_sheet", "cash_flow")
+
+# Bucket columns are packed arrays: dates as int32 day deltas, values as byte-shuffled
+# float64, each zlib-compressed. Buckets without this marker hold plain lists.
+BUCKET_ENCODING = "shuffle-zlib"
+
+# Fields that used to be embedded in stock documents; never read them through a stock query
+EMBEDDED_FIELDS = ("historical_data", "financial_statements")
+SUMMARY_PROJECTION = {field: 0 for field in EMBEDDED_FIELDS}
+
+# A symbol's bars as column arrays: {"dates": datetime64[D], "close": float64, ...}
+Series = Dict[str, np.ndarray]
+
+def stock_projection(fields: Optional[Sequence[str]] = None) -> Dict[str, int]:
+    """Only `fields` when given, otherwise the whole compact document"""
+    if fields:
+        return {field: 1 for field in fields}
+    return dict(SUMMARY_PROJECTION)
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+def _day(value: datetime) -> np.datetime64:
+    return np.datetime64(value.date(), "D")
+
+def _as_datetime(day: np.datetime64) -> datetime:
+    return datetime.combine(day.astype(datetime), datetime.min.time())
+
+def encode_dates(dates: np.ndarray) -> bytes:
+    # Consecutive trading days differ by 1-4, which compresses to almost nothing
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    return zlib.compress(np.diff(days, prepend=0).astype(np.int32).tobytes())
+
+def decode_dates(blob: bytes) -> np.ndarray:
+    deltas = np.frombuffer(zlib.decompress(blob), dtype=np.int32)
+    return np.cumsum(deltas, dtype=np.int64).astype("datetime64[D]")
+
+def encode_values(values: np.ndarray) -> bytes:
+    # Grouping byte 0 of every value, then byte 1, ... puts the near-identical sign and
+    # exponent bytes of a price series next to each other before zlib sees them
+    raw = np.ascontiguousarray(values, dtype=np.float64).view(np.uint8)
+    return zlib.compress(raw.reshape(-1, 8).T.tobytes())
+
+def decode_values(blob: bytes, count: int) -> np.ndarray:
+    shuffled = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(8, count)
+    return np.ascontiguousarray(shuffled.T).view(np.float64).ravel()
+
+def bars_to_series(bars: Iterable[Mapping[str, Any]]) -> Series:
+    """Columns from bar dicts ({"date": ..., "open": ..., ...}), sorted by date"""
+    bars = list(bars)
+    dates = np.array([bar["date"] for bar in bars], dtype="datetime64[D]")
+    order = np.argsort(dates, kind="stable")
+    series = {"dates": dates[order]}
+    for field in BAR_FIELDS:
+        column = np.array([bar.get(field) for bar in bars], dtype=float)
+        series[field] = column[order]
+    return series
+
+def slice_series(series: Series, keep: np.ndarray) -> Series:
+    return {name: column[keep] for name, column in series.items()}
+
+def _decode_bucket(bucket: Mapping[str, Any], fields: Sequence[str]) -> Series:
+    if bucket.get("encoding") == BUCKET_ENCODING:
+        count = bucket["count"]
+        series = {"dates": decode_dates(bucket["dates"])}
+        for field in fields:
+            blob = bucket.get(field)
+            series[field] = decode_values(blob, count) if blob is not None else np.full(count, np.nan)
+        return series
+    dates = np.array(bucket["dates"], dtype="datetime64[D]")
+    series = {"dates": dates}
+    for field in fields:
+        series[field] = np.array(bucket.get(field) or [None] * len(dates), dtype=float)
+    return series
+
+class StockStore:
+    """
+    Storage for stocks split by access pattern:
+
+    - `stocks`: one compact document per symbol with the screenable fields
+      (price, ratios, sector), so screener scans and lookups stay small
+    - `stock_bars`: daily bars bucketed one document per symbol per month, stored
+      column-wise (`dates`, `close`, ...) as compressed arrays so a range read
+      projects only the columns it needs
+    - `stock_statements`: one document per symbol and statement kind
+    """
+    def __init__(self):
+        self._indexes_ready = False
+
+    async def ensure_indexes(self) -> None:
+        if not self._indexes_ready:
+            await mongodb.get_collection(STOCKS).create_index([("symbol", ASCENDING)])
+            await mongodb.get_collection(BARS).create_index(
+                [("symbol", ASCENDING), ("month", ASCENDING)], unique=True
+            )
+            await mongodb.get_collection(STATEMENTS).create_index(
+                [("symbol", ASCENDING), ("kind", ASCENDING)], unique=True
+            )
+            self._indexes_ready = True
+
+    # Compact stock documents
+
+    def find_stocks(self, query: Optional[Mapping[str, Any]] = None, fields: Optional[Sequence[str]] = None):
+        """Cursor over stock documents, projected to `fields` or the compact summary"""
+        return mongodb.get_collection(STOCKS).find(dict(query or {}), stock_projection(fields))
+
+    async def get_stock(self, symbol: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        return await mongodb.get_collection(STOCKS).find_one({"symbol": symbol}, stock_projection(fields))
+
+    # Bars
+
+    async def save_bars(self, symbol: str, series: Series) -> int:
+        """
+        Merge daily bars (column arrays, see bars_to_series) into the symbol's monthly
+        buckets; a bar for a date that is already stored replaces it. Returns the
+        number of buckets written.
+        """
+        if not len(series["dates"]):
+            return 0
+        await self.ensure_indexes()
+        order = np.argsort(series["dates"], kind="stable")
+        series = slice_series(series, order)
+        months = series["dates"].astype("datetime64[M]")
+        month_keys, starts = np.unique(months, return_index=True)
+        bounds = list(starts[1:]) + [len(months)]
+        month_datetimes = [_as_datetime(month.astype("datetime64[D]")) for month in month_keys]
+
+        collection = mongodb.get_collection(BARS)
+        existing = {
+            bucket["month"]: bucket
+            async for bucket in collection.find({"symbol": symbol, "month": {"$in": month_datetimes}})
+        }
+        writes = []
+        for month, begin, end in zip(month_datetimes, starts, bounds):
+            new = slice_series(series, slice(begin, end))
+            bucket = existing.get(month)
+            if bucket is not None:
+                old = _decode_bucket(bucket, BAR_FIELDS)
+                kept = ~np.isin(old["dates"], new["dates"])
+                merged = {name: np.concatenate([old[name][kept], new[name]]) for name in new}
+                new = slice_series(merged, np.argsort(merged["dates"], kind="stable"))
+            dates = new["dates"]
+            document = {
+                "_id": f"{symbol}:{month:%Y-%m}",
+                "symbol": symbol,
+                "month": month,
+                "start": _as_datetime(dates[0]),
+                "end": _as_datetime(dates[-1]),
+                "count": len(dates),
+                "encoding": BUCKET_ENCODING,
+                "dates": encode_dates(dates),
+                **{field: encode_values(new[field]) for field in BAR_FIELDS}
+            }
+            writes.append(ReplaceOne({"_id": document["_id"]}, document, upsert=True))
+        await collection.bulk_write(writes, ordered=False)
+        return len(writes)
+
+    async def last_bar_date(self, symbol: str) -> Optional[datetime]:
+        bucket = await mongodb.get_collection(BARS).find_one(
+            {"symbol": symbol}, {"end": 1}, sort=[("month", DESCENDING)]
+        )
+        return bucket["end"] if bucket is not None else None
+
+    async def load_bars(
+        self,
+        symbols: Sequence[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        fields: Sequence[str] = ("close",)
+    ) -> Dict[str, Series]:
+        """
+        Bars per symbol between start and end (inclusive), as column arrays:
+        {"AAPL": {"dates": datetime64[D], "close": float64, ...}}. Only the buckets that
+        overlap the range and only the requested columns are read.
+        """
+        query: Dict[str, Any] = {"symbol": {"$in": list(symbols)}}
+        month_range: Dict[str, datetime] = {}
+        if start is not None:
+            month_range["$gte"] = month_start(start)
+        if end is not None:
+            month_range["$lte"] = end
+        if month_range:
+            query["month"] = month_range
+        projection = {"symbol": 1, "count": 1, "encoding": 1, "dates": 1, **{field: 1 for field in fields}}
+        cursor = mongodb.get_collection(BARS).find(query, projection).sort([("symbol", ASCENDING), ("month", ASCENDING)])
+
+        parts: Dict[str, List[Series]] = {}
+        async for bucket in cursor:
+            parts.setdefault(bucket["symbol"], []).append(_decode_bucket(bucket, fields))
+
+        result = {}
+        for symbol, buckets in parts.items():
+            series = {name: np.concatenate([bucket[name] for bucket in buckets]) for name in ("dates", *fields)}
+            keep = np.ones(len(series["dates"]), dtype=bool)
+            if start is not None:
+                keep &= series["dates"] >= _day(start)
+            if end is not None:
+                keep &= series["dates"] <= _day(end)
+            result[symbol] = slice_series(series, keep)
+        return result
+
+    # Statements
+
+    async def save_statements(self, symbol: str, statements: Mapping[str, Any]) -> None:
+        await self.ensure_indexes()
+        now = datetime.utcnow()
+        writes = [
+            UpdateOne(
+                {"symbol": symbol, "kind": kind},
+                {"$set": {"data": data, "updated_at": now}},
+                upsert=True
+            )
+            for kind, data in statements.items()
+        ]
+        if writes:
+            await mongodb.get_collection(STATEMENTS).bulk_write(writes, ordered=False)
+
+    async def get_statements(self, symbol: str, kinds: Sequence[str] = STATEMENT_KINDS) -> Dict[str, Any]:
+        """Statements by kind; kinds that are not stored are missing from the result"""
+        cursor = mongodb.get_collection(STATEMENTS).find(
+            {"symbol": symbol, "kind": {"$in": list(kinds)}},
+            {"_id": 0, "kind": 1, "data": 1}
+        )
+        return {document["kind"]: document["data"] async for document in cursor}
+
+stock_store = StockStore()
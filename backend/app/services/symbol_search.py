@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.db.mongodb import mongodb
+
+# Words that appear in most company names and say nothing about which company is meant
+STOP_WORDS = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+    "plc", "llc", "lp", "sa", "ag", "nv", "the", "and", "of", "group", "holdings", "class"
+}
+
+EXACT, PREFIX, FUZZY = "exact", "prefix", "fuzzy"
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+def _tokens(text: str) -> List[str]:
+    return [token for token in _NON_ALNUM.split(text.casefold()) if token and token not in STOP_WORDS]
+
+def _trigrams(tokens: Iterable[str]) -> frozenset:
+    grams = set()
+    for token in tokens:
+        padded = f"${token}$"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+def _prefix_range(keys: List[str], prefix: str) -> range:
+    """Positions in a sorted list whose key starts with prefix"""
+    start = bisect_left(keys, prefix)
+    end = bisect_left(keys, prefix + "\uffff", lo=start)
+    return range(start, end)
+
+class SymbolIndex:
+    """
+    Immutable search index over the listed-symbol universe.
+
+    Symbols and name words sit in sorted arrays so a prefix is two bisections; company
+    names are also split into trigrams for typo-tolerant matching. Results are ranked
+    exact symbol/name, then symbol prefix, then name-word prefix, then fuzzy by trigram
+    similarity.
+    """
+    def __init__(self, entries: Iterable[Dict[str, Any]]):
+        self.entries: List[Dict[str, Any]] = []
+        seen = set()
+        for entry in entries:
+            symbol = (entry.get("symbol") or "").upper()
+            if not symbol or symbol in seen:
+                continue
+            seen.add(symbol)
+            self.entries.append({**entry, "symbol": symbol, "name": entry.get("name") or ""})
+
+        self._by_symbol = {entry["symbol"]: i for i, entry in enumerate(self.entries)}
+        self._by_name: Dict[str, int] = {}
+        symbol_keys: List[Tuple[str, int]] = []
+        word_keys: List[Tuple[str, int]] = []
+        self._grams: List[frozenset] = []
+        self._postings: Dict[str, List[int]] = {}
+        for i, entry in enumerate(self.entries):
+            tokens = _tokens(entry["name"])
+            self._by_name.setdefault(" ".join(tokens), i)
+            symbol_keys.append((entry["symbol"].casefold(), i))
+            word_keys.extend((token, i) for token in set(tokens))
+            grams = _trigrams(tokens + [entry["symbol"].casefold()])
+            self._grams.append(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+        symbol_keys.sort()
+        word_keys.sort()
+        self._symbol_keys = [key for key, _ in symbol_keys]
+        self._symbol_ids = [i for _, i in symbol_keys]
+        self._word_keys = [key for key, _ in word_keys]
+        self._word_ids = [i for _, i in word_keys]
+        # Trigrams shared by this many names are too common to narrow the candidates
+        self._max_postings = max(50, len(self.entries) // 20)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str, limit: int = 10, min_similarity: float = 0.3) -> List[Dict[str, Any]]:
+        tokens = _tokens(query)
+        if not query.strip() or limit <= 0:
+            return []
+        results: List[Dict[str, Any]] = []
+        taken = set()
+
+        def take(i: int, match: str, score: float) -> bool:
+            if i not in taken:
+                taken.add(i)
+                results.append({**self.entries[i], "match": match, "score": round(score, 3)})
+            return len(results) >= limit
+
+        # Exact symbol, then exact company name
+        symbol = query.strip().upper()
+        for i in (self._by_symbol.get(symbol), self._by_name.get(" ".join(tokens)) if tokens else None):
+            if i is not None and take(i, EXACT, 1.0):
+                return results
+
+        # Symbol prefix: shortest symbols first, so "A" ranks AA ahead of AAPL
+        key = symbol.casefold()
+        positions = _prefix_range(self._symbol_keys, key)
+        shortest = heapq.nsmallest(limit * 2, positions, key=lambda p: (len(self._symbol_keys[p]), self._symbol_keys[p]))
+        for position in shortest:
+            if take(self._symbol_ids[position], PREFIX, len(key) / len(self._symbol_keys[position])):
+                return results
+
+        # Company names with a word starting with every query word
+        if tokens:
+            candidates: Optional[set] = None
+            for token in tokens:
+                ids = {self._word_ids[p] for p in _prefix_range(self._word_keys, token)}
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    break
+            shortest = heapq.nsmallest(limit, candidates or (), key=lambda i: (len(self.entries[i]["name"]), self.entries[i]["symbol"]))
+            for i in shortest:
+                if take(i, PREFIX, 0.9):
+                    return results
+
+        # Fuzzy: candidates come from the query's rarer trigrams, scored by Dice similarity
+        grams = _trigrams(tokens)
+        if not grams:
+            return results
+        counts: Counter = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram, ())
+            if len(postings) <= self._max_postings:
+                counts.update(postings)
+        scored = []
+        for i in counts:
+            if i in taken:
+                continue
+            similarity = 2 * len(grams & self._grams[i]) / (len(grams) + len(self._grams[i]))
+            if similarity >= min_similarity:
+                scored.append((-similarity, self.entries[i]["symbol"], i))
+        scored.sort()
+        for negative, _, i in scored:
+            if take(i, FUZZY, -negative):
+                break
+        return results
+
+class SymbolSearch:
+    """
+    Serves autocomplete from a SymbolIndex built from the local `stocks` collection, so
+    keystrokes never reach Alpha Vantage. The index is rebuilt in the background once it
+    is older than SYMBOL_INDEX_REFRESH_SECONDS; searches keep using the previous index
+    until the new one is swapped in.
+    """
+    def __init__(self, refresh_seconds: float = settings.SYMBOL_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.index = SymbolIndex(())
+        self.built_at = 0.0
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+    async def rebuild(self) -> int:
+        cursor = mongodb.get_collection("stocks").find(
+            {}, {"_id": 0, "symbol": 1, "name": 1, "sector": 1, "industry": 1}
+        )
+        entries = await cursor.to_list(length=None)
+        # Building a full-listing index takes a few hundred ms; keep it off the event loop
+        self.index = await asyncio.to_thread(SymbolIndex, entries)
+        self.built_at = time.monotonic()
+        return len(self.index)
+
+    async def search(self, query: str, limit: int = settings.SYMBOL_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        stale = not self.built_at or time.monotonic() - self.built_at > self.refresh_seconds
+        if stale and (self._rebuild_task is None or self._rebuild_task.done()):
+            self._rebuild_task = asyncio.create_task(self.rebuild())
+        if not self.built_at:
+            # Nothing to serve yet; every caller waits on the same first build
+            await asyncio.shield(self._rebuild_task)
+        return self.index.search(query, limit)
+
+symbol_search = SymbolSearch()
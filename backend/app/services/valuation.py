@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.db.mongodb import mongodb
+from app.services.quote_stream import QuoteHub, Tick, quote_hub
+
+logger = logging.getLogger(__name__)
+
+class ValuationSubscriber:
+    """Push target for one client; keeps only the newest unsent valuation"""
+
+    def __init__(self, send):
+        self.send = send
+        self.pending: Optional[Dict[str, Any]] = None
+        self._ready = asyncio.Event()
+
+    def offer(self, valuation: Dict[str, Any]) -> None:
+        self.pending = valuation
+        self._ready.set()
+
+    async def run(self, send_timeout: float) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            valuation, self.pending = self.pending, None
+            await asyncio.wait_for(self.send({"type": "valuation", "data": valuation}), timeout=send_timeout)
+
+class PortfolioValuation:
+    """Mark-to-market state of one user's portfolio"""
+
+    def __init__(self, user_id: str, cash_balance: float, holdings: Dict[str, int]):
+        self.user_id = user_id
+        self.cash_balance = cash_balance
+        self.holdings = {symbol: quantity for symbol, quantity in holdings.items() if quantity}
+        self.prices: Dict[str, float] = {}
+        self.market_value = 0.0
+        self.last_updated = datetime.utcnow()
+        self.last_read = time.monotonic()
+        # When holdings and cash were last taken from a Mongo document
+        self.synced_at = time.monotonic()
+        # Bumped on every change, so a snapshot can tell whether it wrote the latest value
+        self.version = 0
+        self.dirty = False
+        self.subscribers: Set[ValuationSubscriber] = set()
+
+    @property
+    def total_value(self) -> float:
+        return self.cash_balance + self.market_value
+
+    def reprice(self) -> None:
+        """Exact recomputation, used on load and to cancel drift from accumulated deltas"""
+        self.market_value = sum(
+            self.prices[symbol] * quantity
+            for symbol, quantity in self.holdings.items()
+            if symbol in self.prices
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "holdings": dict(self.holdings),
+            "cash_balance": self.cash_balance,
+            "total_value": self.total_value,
+            "last_updated": self.last_updated
+        }
+
+class ValuationService:
+    """
+    Keeps every active user's portfolio value in memory. Quote ticks adjust it by
+    (new price - old price) * quantity for just the users holding that symbol, changes
+    are pushed to connected clients and total_value is written back to Mongo in
+    periodic batches instead of on every read. Holdings and cash are re-read from Mongo
+    before each batch, so trades this worker did not see (another worker's, an admin
+    edit) show up within one VALUATION_SNAPSHOT_INTERVAL_SECONDS.
+    """
+    def __init__(self, hub: QuoteHub = quote_hub):
+        self.hub = hub
+        self._portfolios: Dict[str, PortfolioValuation] = {}
+        self._holders: Dict[str, Set[str]] = {}
+        self._snapshot_task: Optional[asyncio.Task] = None
+        hub.add_listener(self.on_tick)
+
+    def get(self, user_id: str) -> Optional[PortfolioValuation]:
+        valuation = self._portfolios.get(user_id)
+        if valuation is not None:
+            valuation.last_read = time.monotonic()
+        return valuation
+
+    async def activate(self, portfolio: Dict[str, Any]) -> PortfolioValuation:
+        """Start tracking a portfolio document; a no-op if it is already tracked"""
+        user_id = portfolio["user_id"]
+        valuation = self.get(user_id)
+        if valuation is not None:
+            return valuation
+
+        valuation = PortfolioValuation(user_id, portfolio["cash_balance"], portfolio.get("holdings", {}))
+        self._portfolios[user_id] = valuation
+        await self._track(valuation, set(valuation.holdings))
+        if self._snapshot_task is None or self._snapshot_task.done():
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+        return valuation
+
+    async def refresh_positions(self, portfolio: Dict[str, Any]) -> PortfolioValuation:
+        """Replace holdings and cash after a trade has been written to Mongo"""
+        valuation = self._portfolios.get(portfolio["user_id"])
+        if valuation is None:
+            return await self.activate(portfolio)
+
+        await self._apply_positions(valuation, portfolio)
+        return valuation
+
+    async def _apply_positions(self, valuation: PortfolioValuation, portfolio: Dict[str, Any]) -> None:
+        valuation.synced_at = time.monotonic()
+        holdings = {symbol: quantity for symbol, quantity in portfolio.get("holdings", {}).items() if quantity}
+        if holdings == valuation.holdings and portfolio["cash_balance"] == valuation.cash_balance:
+            return
+        added = set(holdings) - set(valuation.holdings)
+        removed = set(valuation.holdings) - set(holdings)
+        valuation.holdings = holdings
+        valuation.cash_balance = portfolio["cash_balance"]
+        await self._track(valuation, added)
+        self._untrack(valuation, removed)
+        valuation.reprice()
+        self._changed(valuation)
+
+    async def resync(self) -> int:
+        """Re-read holdings and cash of every tracked portfolio; returns how many had changed"""
+        if not self._portfolios:
+            return 0
+        started = time.monotonic()
+        cursor = mongodb.get_collection("portfolios").find(
+            {"user_id": {"$in": list(self._portfolios)}},
+            {"_id": 0, "user_id": 1, "holdings": 1, "cash_balance": 1}
+        )
+        changed = 0
+        async for portfolio in cursor:
+            valuation = self._portfolios.get(portfolio["user_id"])
+            # Positions applied since the read began (a trade in this worker) are newer
+            if valuation is None or valuation.synced_at >= started:
+                continue
+            version = valuation.version
+            await self._apply_positions(valuation, portfolio)
+            changed += valuation.version != version
+        return changed
+
+    def subscribe(self, user_id: str, subscriber: ValuationSubscriber) -> None:
+        valuation = self._portfolios[user_id]
+        valuation.subscribers.add(subscriber)
+        subscriber.offer(valuation.to_dict())
+
+    def unsubscribe(self, user_id: str, subscriber: ValuationSubscriber) -> None:
+        valuation = self._portfolios.get(user_id)
+        if valuation is not None:
+            valuation.subscribers.discard(subscriber)
+            valuation.last_read = time.monotonic()
+
+    def on_tick(self, tick: Tick) -> None:
+        symbol = tick["symbol"]
+        price = tick["price"]
+        for user_id in self._holders.get(symbol, ()):
+            valuation = self._portfolios[user_id]
+            previous = valuation.prices.get(symbol, 0.0)
+            valuation.market_value += (price - previous) * valuation.holdings[symbol]
+            valuation.prices[symbol] = price
+            self._changed(valuation)
+
+    def _changed(self, valuation: PortfolioValuation) -> None:
+        valuation.last_updated = datetime.utcnow()
+        valuation.version += 1
+        valuation.dirty = True
+        if valuation.subscribers:
+            payload = valuation.to_dict()
+            for subscriber in valuation.subscribers:
+                subscriber.offer(payload)
+
+    async def _track(self, valuation: PortfolioValuation, symbols: Set[str]) -> None:
+        if not symbols:
+            return
+        for symbol in symbols:
+            self._holders.setdefault(symbol, set()).add(valuation.user_id)
+        self.hub.retain(symbols)
+
+        # Seed prices from the hub when it already has them, otherwise read once through the source
+        missing = []
+        for symbol in symbols:
+            tick = self.hub.last_tick(symbol)
+            if tick is not None:
+                valuation.prices[symbol] = tick["price"]
+            else:
+                missing.append(symbol)
+        ticks = await asyncio.gather(*(self.hub.source(symbol) for symbol in missing), return_exceptions=True)
+        for symbol, tick in zip(missing, ticks):
+            if isinstance(tick, dict):
+                valuation.prices.setdefault(symbol, tick["price"])
+        valuation.reprice()
+
+    def _untrack(self, valuation: PortfolioValuation, symbols: Set[str]) -> None:
+        if not symbols:
+            return
+        for symbol in symbols:
+            valuation.prices.pop(symbol, None)
+            holders = self._holders.get(symbol)
+            if holders is not None:
+                holders.discard(valuation.user_id)
+                if not holders:
+                    del self._holders[symbol]
+        self.hub.release(symbols)
+
+    async def snapshot(self) -> int:
+        """Persist total_value for every portfolio that changed since the last snapshot"""
+        changed = [valuation for valuation in self._portfolios.values() if valuation.dirty]
+        if not changed:
+            return 0
+        operations = []
+        versions = []
+        for valuation in changed:
+            valuation.reprice()
+            versions.append(valuation.version)
+            operations.append(UpdateOne(
+                {"user_id": valuation.user_id},
+                {"$set": {"total_value": valuation.total_value, "last_updated": valuation.last_updated}}
+            ))
+        await mongodb.get_collection("portfolios").bulk_write(operations, ordered=False)
+        # Flags are cleared only after a successful write so a failed round is retried, and
+        # only where no tick arrived during the write, so that value goes out next round
+        for valuation, version in zip(changed, versions):
+            if valuation.version == version:
+                valuation.dirty = False
+        return len(operations)
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - settings.VALUATION_IDLE_SECONDS
+        for user_id, valuation in list(self._portfolios.items()):
+            if not valuation.subscribers and not valuation.dirty and valuation.last_read < cutoff:
+                self._untrack(valuation, set(valuation.holdings))
+                del self._portfolios[user_id]
+
+    async def _snapshot_loop(self) -> None:
+        while self._portfolios:
+            await asyncio.sleep(settings.VALUATION_SNAPSHOT_INTERVAL_SECONDS)
+            try:
+                await self.resync()
+            except Exception:
+                logger.exception("Valuation resync failed", extra={"event": "valuation.resync_failed"})
+            try:
+                await self.snapshot()
+            except Exception:
+                logger.exception("Valuation snapshot failed", extra={"event": "valuation.snapshot_failed"})
+            self._evict_idle()
+
+    async def close(self) -> None:
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+        await self.snapshot()
+
+valuation_service = ValuationService()
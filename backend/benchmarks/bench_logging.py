@@ -0,0 +1,129 @@
+"""
+Request throughput with logging off, written synchronously, and through the queue.
+
+Each request to the test app emits a few INFO records (like a login handler) plus
+the sampled access-log event from RequestIDMiddleware. Every mode runs against two
+sinks:
+- file: a plain temp file, i.e. a real sink that drains fast
+- slow: the same file whose flush also sleeps for --flush-latency-ms, standing in
+  for a terminal or a log collector pipe that is slow to drain
+
+The queue's lead over sync writes on the slow sink comes mostly from that added
+delay leaving the event loop; it only carries over to sinks that are actually slow.
+Compare the file rows for what a fast local sink gains.
+
+- off: logging disabled (level CRITICAL)
+- sync: JSONFormatter on a plain StreamHandler, written on the event loop
+- queued: configure_logging(), formatted and written by the background thread
+
+Run from the backend directory:
+    python -m benchmarks.bench_logging --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+import httpx
+from fastapi import FastAPI
+from app.core.log import ContextFilter, JSONFormatter, RequestIDMiddleware, SamplingFilter, configure_logging, shutdown_logging
+
+logger = logging.getLogger("bench")
+
+class SlowSink:
+    """File wrapper whose flush blocks like a write to a busy pipe or terminal"""
+
+    def __init__(self, stream, flush_latency: float):
+        self.stream = stream
+        self.flush_latency = flush_latency
+
+    def write(self, text: str) -> int:
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+        if self.flush_latency:
+            time.sleep(self.flush_latency)
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        logger.info("Login attempt", extra={"event": "auth.attempt", "username": "user"})
+        logger.debug("Checking credentials", extra={"event": "auth.check"})
+        logger.info("Login succeeded", extra={"event": "auth.login", "username": "user"})
+        return {"ok": True}
+
+    app.add_middleware(RequestIDMiddleware)
+    return app
+
+def configure(mode: str, stream, sample_rates) -> None:
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if mode == "off":
+        root.setLevel(logging.CRITICAL)
+    elif mode == "sync":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JSONFormatter())
+        handler.addFilter(SamplingFilter(sample_rates))
+        handler.addFilter(ContextFilter())
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    else:
+        configure_logging("INFO", True, sample_rates, stream=stream)
+
+async def run_mode(mode: str, sink: str, flush_latency_ms: float, args) -> dict:
+    sample_rates = {"http.request": args.access_sample_rate}
+    with tempfile.TemporaryFile("w+") as stream:
+        configure(mode, SlowSink(stream, flush_latency_ms / 1000) if flush_latency_ms else stream, sample_rates)
+        transport = httpx.ASGITransport(app=build_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            remaining = args.requests
+
+            async def worker():
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    await client.post("/login")
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+        shutdown_logging()
+        stream.flush()
+        stream.seek(0)
+        lines = sum(1 for _ in stream)
+    return {
+        "mode": mode,
+        "sink": sink,
+        "flush_latency_ms": flush_latency_ms,
+        "requests": args.requests,
+        "requests_per_second": round(args.requests / elapsed, 1),
+        "log_lines": lines
+    }
+
+async def run(args):
+    sinks = [("file", 0.0)]
+    if args.flush_latency_ms:
+        sinks.append(("slow", args.flush_latency_ms))
+    return [
+        await run_mode(mode, sink, flush_latency_ms, args)
+        for sink, flush_latency_ms in sinks
+        for mode in ("off", "sync", "queued")
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--access-sample-rate", type=float, default=0.1)
+    parser.add_argument("--flush-latency-ms", type=float, default=0.1)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
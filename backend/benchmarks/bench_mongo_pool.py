@@ -0,0 +1,136 @@
+"""
+Motor throughput against a local mongod at different connection pool sizes.
+
+Seeds the stocks collection with --stocks synthetic documents, then for each pool
+size runs --requests operations from --concurrency coroutines. The operation mix is
+the API's own:
+- a point read by symbol (stock detail)
+- a sector query sorted by market cap with a limit (screener page)
+- an insert into trades
+
+For each size it reports throughput, latency percentiles, the p99 wait for a pooled
+connection (from the pool listener) and checkouts that failed with
+waitQueueTimeoutMS. Throughput rises until the pool stops being the bottleneck.
+Beyond that point, larger pools only add server-side contention.
+
+Needs a running MongoDB; the --database given is dropped first.
+
+Run from the backend directory:
+    python -m benchmarks.bench_mongo_pool --mongo-url mongodb://localhost:27017 --pool-sizes 1,5,10,25,50,100
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from app.core.metrics import Counter, Histogram
+from app.core.mongo_metrics import MongoPoolMetrics
+from benchmarks.suite import summarize, synthetic_stocks
+
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def histogram_quantile(histogram: Histogram, q: float) -> float:
+    """Upper bound of the bucket holding the q-th observation, in milliseconds"""
+    series = histogram._series.get(())
+    if not series:
+        return 0.0
+    counts = series[0]
+    target = q * sum(counts)
+    seen = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), counts):
+        seen += count
+        if seen >= target:
+            return round(bound * 1000, 3)
+    return float("inf")
+
+async def seed(client: AsyncIOMotorClient, args) -> List[str]:
+    await client.drop_database(args.database)
+    db = client[args.database]
+    stocks = synthetic_stocks(args.stocks)
+    await db.stocks.insert_many(stocks)
+    await db.stocks.create_index([("symbol", ASCENDING)], unique=True)
+    await db.stocks.create_index([("sector", ASCENDING), ("market_cap", DESCENDING)])
+    return [stock["symbol"] for stock in stocks]
+
+async def run_pool_size(args, pool_size: int, symbols: List[str]) -> Dict[str, Any]:
+    listener = MongoPoolMetrics(
+        wait=Histogram("bench_pool_wait", "", buckets=WAIT_BUCKETS),
+        failures=Counter("bench_pool_failures", "", ("reason",))
+    )
+    client = AsyncIOMotorClient(
+        args.mongo_url,
+        maxPoolSize=pool_size,
+        waitQueueTimeoutMS=args.wait_queue_timeout_ms,
+        event_listeners=[listener]
+    )
+    db = client[args.database]
+    rng = random.Random(pool_size)
+    sectors = ["Technology", "Finance", "Healthcare", "Energy", "Industrials"]
+
+    async def operation(i: int) -> None:
+        kind = i % 10
+        if kind < 6:
+            await db.stocks.find_one({"symbol": rng.choice(symbols)}, {"_id": 0})
+        elif kind < 9:
+            cursor = db.stocks.find({"sector": rng.choice(sectors)}, {"_id": 0}).sort("market_cap", DESCENDING).limit(50)
+            await cursor.to_list(length=50)
+        else:
+            await db.trades.insert_one({"symbol": rng.choice(symbols), "quantity": 1, "price": 10.0})
+
+    # Open the pool before timing so connection setup is not counted
+    await asyncio.gather(*(db.command("ping") for _ in range(min(pool_size, args.concurrency))))
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(args.requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in remaining:
+            started = time.perf_counter()
+            try:
+                await operation(i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    stats = summarize(latencies, time.perf_counter() - started, errors)
+    client.close()
+    return {
+        "pool_size": pool_size,
+        **stats,
+        "pool_wait_p50_ms": histogram_quantile(listener.wait, 0.50),
+        "pool_wait_p99_ms": histogram_quantile(listener.wait, 0.99),
+        "checkout_failures": sum(listener.failures._values.values())
+    }
+
+async def run(args) -> List[Dict[str, Any]]:
+    client = AsyncIOMotorClient(args.mongo_url, serverSelectionTimeoutMS=3000)
+    symbols = await seed(client, args)
+    results = []
+    for pool_size in args.pool_sizes:
+        results.append(await run_pool_size(args, pool_size, symbols))
+    await client.drop_database(args.database)
+    client.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="financial_screener_pool_bench")
+    parser.add_argument("--pool-sizes", type=lambda value: [int(size) for size in value.split(",")], default=[1, 5, 10, 25, 50, 100])
+    parser.add_argument("--stocks", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--wait-queue-timeout-ms", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compare the default response path (pydantic model per row + jsonable_encoder + json)
+with MongoJSONResponse rendering raw Mongo documents through orjson.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization --rows 100 --repeat 2000
+"""
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from app.core.responses import MongoJSONResponse
+from app.models.trade import Trade
+
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "TSLA", "NVDA", "JPM", "V", "WMT"]
+
+def make_trade_documents(count: int) -> List[dict]:
+    now = datetime.utcnow()
+    documents = []
+    for i in range(count):
+        quantity = random.randint(1, 100)
+        price = round(random.uniform(50, 500), 2)
+        documents.append({
+            "_id": ObjectId(),
+            "user_id": str(ObjectId()),
+            "symbol": random.choice(SYMBOLS),
+            "trade_type": random.choice(["BUY", "SELL"]),
+            "quantity": quantity,
+            "price": price,
+            "total_amount": quantity * price,
+            "status": "EXECUTED",
+            "executed_at": now - timedelta(minutes=i),
+            "profit_loss": None
+        })
+    return documents
+
+def default_path(documents: List[dict]) -> bytes:
+    # What FastAPI does for `return [Trade(**trade) for trade in trades]` with a response_model
+    models = [Trade(**document) for document in documents]
+    return json.dumps(jsonable_encoder(models, by_alias=True)).encode("utf-8")
+
+def fast_path(documents: List[dict]) -> bytes:
+    return MongoJSONResponse(documents).body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="documents per response")
+    parser.add_argument("--repeat", type=int, default=2000, help="responses rendered per measurement")
+    args = parser.parse_args()
+
+    documents = make_trade_documents(args.rows)
+    results = {}
+    for name, render in (("pydantic+jsonable_encoder+json", default_path), ("orjson MongoJSONResponse", fast_path)):
+        seconds = min(timeit.repeat(lambda: render(documents), number=args.repeat, repeat=5))
+        results[name] = seconds / args.repeat * 1e6
+        print(f"{name:<34} {results[name]:10.1f} us/response  ({len(render(documents))} bytes)")
+
+    baseline, fast = results.values()
+    print(f"speedup: {baseline / fast:.1f}x for {args.rows} rows")
+
+if __name__ == "__main__":
+    main()
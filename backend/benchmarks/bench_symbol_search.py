@@ -0,0 +1,77 @@
+"""
+Symbol search latency over a synthetic listed-symbol universe.
+
+Builds a SymbolIndex the size of a full US listing and times autocomplete-style
+queries (growing symbol prefixes, name prefixes and misspelled names) per tier.
+
+Run from the backend directory:
+    python -m benchmarks.bench_symbol_search --symbols 12000 --queries 2000
+"""
+import argparse
+import json
+import random
+import string
+import time
+from typing import Dict, List
+from app.services.symbol_search import SymbolIndex
+
+SUFFIXES = ["Inc.", "Corp.", "Holdings", "Group", "Ltd.", "Co."]
+
+def synthetic_universe(count: int) -> List[Dict[str, str]]:
+    rng = random.Random(11)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))).title() for _ in range(count // 2)]
+    return [
+        {
+            "symbol": "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5))),
+            "name": " ".join(rng.sample(words, rng.randint(1, 3)) + [rng.choice(SUFFIXES)])
+        }
+        for _ in range(count)
+    ]
+
+def misspell(text: str, rng: random.Random) -> str:
+    position = rng.randrange(len(text))
+    return text[:position] + rng.choice(string.ascii_lowercase) + text[position + 1:]
+
+def run(args) -> dict:
+    entries = synthetic_universe(args.symbols)
+    started = time.perf_counter()
+    index = SymbolIndex(entries)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(3)
+    samples = [rng.choice(index.entries) for _ in range(args.queries)]
+    workloads = {
+        "symbol_prefix": [entry["symbol"][:rng.randint(1, len(entry["symbol"]))] for entry in samples],
+        "name_prefix": [entry["name"][:rng.randint(3, 8)] for entry in samples],
+        "misspelled_name": [misspell(entry["name"].split()[0], rng) for entry in samples]
+    }
+
+    timings = {}
+    for name, queries in workloads.items():
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, limit=10)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        timings[name] = {
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+            "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3)
+        }
+
+    return {
+        "symbols": len(index),
+        "build_ms": round(build_seconds * 1000, 1),
+        "queries": timings
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=12000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+if __name__ == "__main__":
+    main()
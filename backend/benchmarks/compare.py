@@ -0,0 +1,66 @@
+"""
+Compare two benchmark suite result files and flag regressions.
+
+A benchmark regresses when a latency percentile grows, or its throughput drops, by
+more than --threshold (a fraction; 0.10 = 10%) relative to the baseline. Exits with
+status 1 when anything regressed so it can gate CI.
+
+Run from the backend directory:
+    python -m benchmarks.compare baseline.json current.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List
+
+# (stat, True when a larger value is worse)
+COMPARED_STATS = (("p50_ms", True), ("p99_ms", True), ("throughput_rps", False))
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    rows = []
+    for name, stats in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        for stat, higher_is_worse in COMPARED_STATS:
+            old, new = previous.get(stat), stats.get(stat)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change if higher_is_worse else -change
+            rows.append({
+                "benchmark": name,
+                "stat": stat,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 4),
+                "regressed": worse > threshold
+            })
+    return rows
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'benchmark':<28} {'stat':<15} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        lines.append(
+            f"{row['benchmark']:<28} {row['stat']:<15} {row['baseline']:>12.3f} "
+            f"{row['current']:>12.3f} {row['change'] * 100:>8.1f}%{flag}"
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+    rows = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    print(format_rows(rows))
+    sys.exit(1 if any(row["regressed"] for row in rows) else 0)
+
+if __name__ == "__main__":
+    main()
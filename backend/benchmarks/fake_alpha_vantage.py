@@ -0,0 +1,226 @@
+"""
+Local stand-in for the Alpha Vantage query API, used by the benchmark suite.
+
+Serves deterministic payloads shaped like the real ones for every function
+AlphaVantageAPI calls, with a configurable per-request latency so load scenarios
+see realistic upstream waits without spending quota. Point the client at it with
+`alpha_vantage.BASE_URL = fake.url`.
+
+Run standalone from the backend directory:
+    python -m benchmarks.fake_alpha_vantage --port 8765 --latency-ms 50
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Optional
+from aiohttp import web
+
+def _rng(*parts: str) -> random.Random:
+    seed = hashlib.blake2b("|".join(parts).encode(), digest_size=8).digest()
+    return random.Random(int.from_bytes(seed, "big"))
+
+def _base_price(symbol: str) -> float:
+    return round(_rng(symbol, "price").uniform(20, 500), 2)
+
+def global_quote(symbol: str) -> Dict[str, Any]:
+    rng = _rng(symbol, "quote", date.today().isoformat())
+    previous = _base_price(symbol)
+    change = round(previous * rng.uniform(-0.03, 0.03), 2)
+    price = round(previous + change, 2)
+    return {
+        "Global Quote": {
+            "01. symbol": symbol,
+            "02. open": f"{previous:.4f}",
+            "03. high": f"{max(price, previous) * 1.01:.4f}",
+            "04. low": f"{min(price, previous) * 0.99:.4f}",
+            "05. price": f"{price:.4f}",
+            "06. volume": str(rng.randint(100_000, 50_000_000)),
+            "07. latest trading day": date.today().isoformat(),
+            "08. previous close": f"{previous:.4f}",
+            "09. change": f"{change:.4f}",
+            "10. change percent": f"{change / previous * 100:.4f}%"
+        }
+    }
+
+def overview(symbol: str) -> Dict[str, Any]:
+    rng = _rng(symbol, "overview")
+    return {
+        "Symbol": symbol,
+        "Name": f"{symbol} Holdings Inc",
+        "Sector": rng.choice(["TECHNOLOGY", "FINANCE", "HEALTHCARE", "ENERGY", "INDUSTRIALS"]),
+        "Industry": "SERVICES",
+        "MarketCapitalization": str(rng.randint(10**8, 10**12)),
+        "PERatio": f"{rng.uniform(5, 60):.2f}",
+        "EPS": f"{rng.uniform(0.5, 20):.2f}",
+        "DividendYield": f"{rng.uniform(0, 0.05):.4f}",
+        "ReturnOnEquityTTM": f"{rng.uniform(-0.1, 0.4):.4f}"
+    }
+
+def _reports(symbol: str, function: str, fields: Dict[str, Callable[[random.Random], float]], periods: int, step_days: int):
+    rng = _rng(symbol, function)
+    today = date.today()
+    return [
+        {
+            "fiscalDateEnding": (today - timedelta(days=step_days * (i + 1))).isoformat(),
+            "reportedCurrency": "USD",
+            **{name: str(int(make(rng))) for name, make in fields.items()}
+        }
+        for i in range(periods)
+    ]
+
+STATEMENT_FIELDS = {
+    "INCOME_STATEMENT": {
+        "totalRevenue": lambda rng: rng.uniform(1e8, 1e11),
+        "grossProfit": lambda rng: rng.uniform(1e7, 5e10),
+        "operatingIncome": lambda rng: rng.uniform(1e6, 2e10),
+        "netIncome": lambda rng: rng.uniform(-1e9, 1e10),
+        "ebit": lambda rng: rng.uniform(1e6, 2e10)
+    },
+    "BALANCE_SHEET": {
+        "totalAssets": lambda rng: rng.uniform(1e9, 5e11),
+        "totalCurrentAssets": lambda rng: rng.uniform(1e8, 1e11),
+        "inventory": lambda rng: rng.uniform(0, 1e10),
+        "totalLiabilities": lambda rng: rng.uniform(1e8, 3e11),
+        "totalCurrentLiabilities": lambda rng: rng.uniform(1e8, 1e11),
+        "totalShareholderEquity": lambda rng: rng.uniform(1e8, 2e11),
+        "shortLongTermDebtTotal": lambda rng: rng.uniform(0, 1e11)
+    },
+    "CASH_FLOW": {
+        "operatingCashflow": lambda rng: rng.uniform(-1e9, 5e10),
+        "capitalExpenditures": lambda rng: rng.uniform(1e6, 1e10),
+        "dividendPayout": lambda rng: rng.uniform(0, 1e9)
+    }
+}
+
+def statement(function: str, symbol: str) -> Dict[str, Any]:
+    fields = STATEMENT_FIELDS[function]
+    return {
+        "symbol": symbol,
+        "annualReports": _reports(symbol, function + "A", fields, 5, 365),
+        "quarterlyReports": _reports(symbol, function + "Q", fields, 20, 91)
+    }
+
+def daily_adjusted(symbol: str, outputsize: str = "compact") -> Dict[str, Any]:
+    rng = _rng(symbol, "daily")
+    days = 100 if outputsize == "compact" else 2500
+    price = _base_price(symbol)
+    series = {}
+    day = date.today()
+    while len(series) < days:
+        if day.weekday() < 5:
+            close = price
+            series[day.isoformat()] = {
+                "1. open": f"{close * rng.uniform(0.99, 1.01):.4f}",
+                "2. high": f"{close * 1.015:.4f}",
+                "3. low": f"{close * 0.985:.4f}",
+                "4. close": f"{close:.4f}",
+                "5. adjusted close": f"{close:.4f}",
+                "6. volume": str(rng.randint(100_000, 50_000_000)),
+                "7. dividend amount": "0.0000",
+                "8. split coefficient": "1.0"
+            }
+            # Walk backwards in time
+            price = max(1.0, price / (1 + rng.gauss(0.0003, 0.015)))
+        day -= timedelta(days=1)
+    return {
+        "Meta Data": {
+            "1. Information": "Daily Time Series with Splits and Dividend Events",
+            "2. Symbol": symbol,
+            "3. Last Refreshed": date.today().isoformat(),
+            "4. Output Size": "Compact" if outputsize == "compact" else "Full size"
+        },
+        "Time Series (Daily)": series
+    }
+
+def symbol_search(keywords: str) -> Dict[str, Any]:
+    symbol = keywords.upper()[:5]
+    return {
+        "bestMatches": [{
+            "1. symbol": symbol,
+            "2. name": f"{symbol} Holdings Inc",
+            "3. type": "Equity",
+            "4. region": "United States",
+            "8. currency": "USD",
+            "9. matchScore": "1.0000"
+        }]
+    }
+
+class FakeAlphaVantage:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05, jitter: float = 0.2):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.requests: Counter = Counter()
+        self._runner: Optional[web.AppRunner] = None
+        self._rng = random.Random(5)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/query"
+
+    async def handle(self, request: web.Request) -> web.Response:
+        params = request.query
+        function = params.get("function", "")
+        self.requests[function] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+
+        symbol = params.get("symbol", "").upper()
+        if function == "GLOBAL_QUOTE":
+            payload = global_quote(symbol)
+        elif function == "OVERVIEW":
+            payload = overview(symbol)
+        elif function in STATEMENT_FIELDS:
+            payload = statement(function, symbol)
+        elif function == "TIME_SERIES_DAILY_ADJUSTED":
+            payload = daily_adjusted(symbol, params.get("outputsize", "compact"))
+        elif function == "SYMBOL_SEARCH":
+            payload = symbol_search(params.get("keywords", ""))
+        else:
+            payload = {"Error Message": f"Invalid API call: unknown function {function!r}"}
+        return web.json_response(payload)
+
+    async def start(self) -> "FakeAlphaVantage":
+        app = web.Application()
+        app.router.add_get("/query", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 asks the OS for a free port; read back the one it chose
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeAlphaVantage":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+async def serve(args) -> None:
+    async with FakeAlphaVantage(args.host, args.port, args.latency_ms / 1000) as fake:
+        print(f"Fake Alpha Vantage listening on {fake.url}")
+        await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Minimal Redis-compatible server for local multi-worker runs and benchmarks.
+
+Speaks RESP2 and implements only what the cache backend uses: GET, SET (EX/PX/NX),
+DEL, MGET, PTTL, RPUSH, LRANGE, SCAN with MATCH, PUBLISH/SUBSCRIBE, plus PING, DBSIZE
+and FLUSHDB. Keys
+live in this process's memory; nothing is persisted. Point the app at it with
+CACHE_BACKEND=redis CACHE_REDIS_URL=redis://127.0.0.1:6390/0.
+
+Run standalone from the backend directory:
+    python -m benchmarks.fake_redis --port 6390
+"""
+import argparse
+import asyncio
+import fnmatch
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+Reply = object
+
+class _Error(str):
+    pass
+
+class _Raw(bytes):
+    """Already encoded; (un)subscribe answers with one push per channel, not one array"""
+
+def encode(reply: Reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, _Raw):
+        return bytes(reply)
+    if isinstance(reply, _Error):
+        return b"-" + reply.encode() + b"\r\n"
+    if isinstance(reply, bool):
+        return b":1\r\n" if reply else b":0\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, str):
+        return b"+" + reply.encode() + b"\r\n"
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    if isinstance(reply, (list, tuple)):
+        return b"*%d\r\n" % len(reply) + b"".join(encode(item) for item in reply)
+    raise TypeError(f"Cannot encode {type(reply)}")
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command, as typed into telnet
+        return line.strip().split()
+    args = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+class FakeRedis:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.subscribers: Dict[bytes, Set[asyncio.StreamWriter]] = defaultdict(set)
+        self.commands = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, args: List[bytes], writer: asyncio.StreamWriter, channels: Set[bytes]) -> Reply:
+        name = args[0].upper().decode()
+        if name == "PING":
+            return args[1] if len(args) > 1 else "PONG"
+        if name in ("CLIENT", "SELECT"):
+            return "OK"
+        if name == "GET":
+            return self._live(args[1])
+        if name == "MGET":
+            return [self._live(key) for key in args[1:]]
+        if name == "SET":
+            key, value, options = args[1], args[2], [a.upper() for a in args[3:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"EX") + 1])
+            if b"NX" in options and self._live(key) is not None:
+                return None
+            self.data[key] = (value, expires_at)
+            return "OK"
+        if name == "PTTL":
+            if self._live(args[1]) is None:
+                return -2
+            expires_at = self.data[args[1]][1]
+            return -1 if expires_at is None else max(int((expires_at - time.monotonic()) * 1000), 0)
+        if name == "RPUSH":
+            items = self._live(args[1])
+            if items is None:
+                items = []
+                self.data[args[1]] = (items, None)
+            items.extend(args[2:])
+            return len(items)
+        if name == "LRANGE":
+            items = self._live(args[1]) or []
+            start, stop = int(args[2]), int(args[3])
+            return items[start:len(items) if stop == -1 else stop + 1]
+        if name == "DEL":
+            return sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+        if name == "SCAN":
+            options = [a.upper() for a in args[2:]]
+            pattern = args[2 + options.index(b"MATCH") + 1].decode() if b"MATCH" in options else "*"
+            keys = [key for key in list(self.data) if fnmatch.fnmatchcase(key.decode(), pattern) and self._live(key) is not None]
+            # Everything in one pass; cursor 0 tells the client it is done
+            return [b"0", keys]
+        if name == "DBSIZE":
+            return len(self.data)
+        if name == "FLUSHDB":
+            self.data.clear()
+            return "OK"
+        if name == "PUBLISH":
+            message = encode([b"message", args[1], args[2]])
+            receivers = list(self.subscribers.get(args[1], ()))
+            for subscriber in receivers:
+                subscriber.write(message)
+            return len(receivers)
+        if name == "SUBSCRIBE":
+            replies = []
+            for channel in args[1:]:
+                self.subscribers[channel].add(writer)
+                channels.add(channel)
+                replies.append(encode([b"subscribe", channel, len(channels)]))
+            return _Raw(b"".join(replies))
+        if name == "UNSUBSCRIBE":
+            replies = []
+            for channel in args[1:] or list(channels):
+                self.subscribers[channel].discard(writer)
+                channels.discard(channel)
+                replies.append(encode([b"unsubscribe", channel, len(channels)]))
+            return _Raw(b"".join(replies))
+        return _Error(f"ERR unknown command '{name}'")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        channels: Set[bytes] = set()
+        try:
+            while True:
+                args = await read_command(reader)
+                if not args:
+                    break
+                self.commands += 1
+                writer.write(encode(self.execute(args, writer, channels)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for channel in channels:
+                self.subscribers[channel].discard(writer)
+            writer.close()
+
+    async def start(self) -> "FakeRedis":
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "FakeRedis":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+async def serve(args) -> None:
+    async with FakeRedis(args.host, args.port) as fake:
+        print(f"Fake Redis listening on {fake.url}")
+        await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
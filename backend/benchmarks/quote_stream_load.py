@@ -0,0 +1,200 @@
+"""
+Load test for the /api/v1/quotes/ws fan-out against a local fake quote source.
+
+A single uvicorn worker runs in a child process with the quote hub's source swapped
+for a random-walk generator and WebSocket auth swapped for a fixed user. This process
+then opens --connections clients, each subscribing to --per-connection symbols drawn
+from a universe of --symbols, and reports connection success, tick throughput,
+publish-to-receive latency and the worker's resident memory.
+
+Run from the backend directory:
+    python -m benchmarks.quote_stream_load --connections 10000 --symbols 500 --per-connection 20 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import resource
+import socket
+import time
+from typing import Dict, List, Optional
+import orjson
+
+def raise_fd_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+class FakeQuoteSource:
+    """Random-walk prices, no network, so the test measures the fan-out and nothing else"""
+
+    def __init__(self):
+        self.prices: Dict[str, float] = {}
+
+    async def __call__(self, symbol: str) -> Optional[dict]:
+        price = self.prices.get(symbol) or random.uniform(20, 500)
+        price = round(price * (1 + random.gauss(0, 0.002)), 2)
+        self.prices[symbol] = price
+        return {
+            "symbol": symbol,
+            "price": price,
+            "change": 0.0,
+            "change_percent": 0.0,
+            "volume": random.randint(1000, 1000000),
+            "timestamp": time.time()
+        }
+
+def serve(host: str, port: int, interval: float) -> None:
+    raise_fd_limit()
+    import uvicorn
+    from fastapi import FastAPI
+    from app.api.api_v1.endpoints import quotes
+    from app.api.deps import get_websocket_user
+    from app.models.user import User
+    from app.services.quote_stream import quote_hub
+
+    quote_hub.source = FakeQuoteSource()
+    quote_hub.interval = interval
+
+    app = FastAPI()
+    app.include_router(quotes.router, prefix="/api/v1/quotes")
+    app.dependency_overrides[get_websocket_user] = lambda: User(
+        id="loadtest", username="loadtest", email="loadtest@example.com"
+    )
+    uvicorn.run(app, host=host, port=port, log_level="warning", backlog=16384)
+
+def wait_for_port(host: str, port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not start on {host}:{port}")
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.messages = 0
+        self.ticks = 0
+        self.latencies: List[float] = []
+
+async def client(url: str, symbols: List[str], stats: Stats, handshake: asyncio.Semaphore) -> None:
+    import websockets
+
+    try:
+        async with handshake:
+            websocket = await websockets.connect(url, open_timeout=120, max_size=None)
+    except Exception:
+        stats.failed += 1
+        return
+    stats.connected += 1
+    try:
+        await websocket.send(json.dumps({"action": "subscribe", "symbols": symbols}))
+        async for raw in websocket:
+            received_at = time.time()
+            message = orjson.loads(raw)
+            if message["type"] != "quotes":
+                continue
+            stats.messages += 1
+            for tick in message["data"]:
+                stats.ticks += 1
+                stats.latencies.append(received_at - tick["timestamp"])
+    except Exception:
+        pass
+    finally:
+        await websocket.close()
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def run_clients(args, url: str, server_pid: int) -> dict:
+    universe = [f"SYM{i:04d}" for i in range(args.symbols)]
+    stats = Stats()
+    handshake = asyncio.Semaphore(args.concurrent_handshakes)
+    started = time.monotonic()
+    tasks = [
+        asyncio.create_task(client(url, random.sample(universe, args.per_connection), stats, handshake))
+        for _ in range(args.connections)
+    ]
+    while stats.connected + stats.failed < args.connections and time.monotonic() - started < args.duration:
+        await asyncio.sleep(0.5)
+    ramp_seconds = time.monotonic() - started
+
+    # Measure steady state only, after every client has connected
+    stats.ticks, stats.messages, stats.latencies = 0, 0, []
+    measure_started = time.monotonic()
+    await asyncio.sleep(args.duration)
+    elapsed = time.monotonic() - measure_started
+    server_rss = rss_mb(server_pid)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "connections_requested": args.connections,
+        "connected": stats.connected,
+        "failed": stats.failed,
+        "ramp_seconds": round(ramp_seconds, 2),
+        "symbols": args.symbols,
+        "symbols_per_connection": args.per_connection,
+        "poll_interval_seconds": args.interval,
+        "measure_seconds": round(elapsed, 2),
+        "messages_per_second": round(stats.messages / elapsed, 1),
+        "ticks_per_second": round(stats.ticks / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(stats.latencies, 0.50) * 1000, 2),
+            "p90": round(percentile(stats.latencies, 0.90) * 1000, 2),
+            "p99": round(percentile(stats.latencies, 0.99) * 1000, 2),
+            "max": round(max(stats.latencies, default=0.0) * 1000, 2)
+        },
+        "server_rss_mb": server_rss
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--per-connection", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=1.0, help="fake source poll interval in seconds")
+    parser.add_argument("--duration", type=float, default=30.0, help="steady-state measurement window in seconds")
+    parser.add_argument("--concurrent-handshakes", type=int, default=500)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write the JSON summary to this file as well")
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    server = multiprocessing.Process(target=serve, args=(args.host, args.port, args.interval), daemon=True)
+    server.start()
+    try:
+        wait_for_port(args.host, args.port)
+        url = f"ws://{args.host}:{args.port}/api/v1/quotes/ws?token=loadtest"
+        summary = asyncio.run(run_clients(args, url, server.pid))
+    finally:
+        server.terminate()
+        server.join()
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(summary, output_file, indent=2)
+
+if __name__ == "__main__":
+    main()
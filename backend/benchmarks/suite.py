@@ -0,0 +1,372 @@
+"""
+Benchmark suite: micro-benchmarks plus end-to-end load scenarios, written as JSON.
+
+Micro-benchmarks call the hot functions directly:
+- main.fetch_stock_data and main.run_backtest (the demo app's backtester)
+- screener rule evaluation (_matches_rules) over a synthetic stock universe
+
+Load scenarios drive the API package in-process through httpx, with Alpha Vantage
+replaced by benchmarks.fake_alpha_vantage and Mongo by an in-memory stand-in
+(mongomock-motor), or a real server when --mongo-url is given:
+login, stock detail, holdings, trade submit + execute and screener run.
+
+Pass --baseline with an earlier result file to flag regressions (exit status 1).
+
+Run from the backend directory:
+    python -m benchmarks.suite --output bench-results.json
+    python -m benchmarks.suite --output new.json --baseline bench-results.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+import httpx
+from fastapi import FastAPI
+from app.api.api_v1.api import api_router
+from app.api.api_v1.endpoints.screeners import _matches_rules
+from app.core.config import settings
+from app.core.log import configure_logging
+from app.core.metrics import MetricsMiddleware
+from app.core.middleware import CompressionMiddleware
+from app.core.security import create_access_token, get_password_hash
+from app.db.mongodb import mongodb
+from app.services.alpha_vantage import alpha_vantage
+from app.services.auth_cache import auth_cache
+from app.services.valuation import valuation_service
+from benchmarks.compare import compare, format_rows
+from benchmarks.fake_alpha_vantage import FakeAlphaVantage
+
+PASSWORD = "bench-password"
+SECTORS = ["Technology", "Finance", "Healthcare", "Energy", "Industrials"]
+
+def summarize(latencies: List[float], elapsed: float = 0.0, errors: int = 0) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    count = len(ordered)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(count - 1, int(q * count))] * 1000, 3) if count else 0.0
+
+    stats = {
+        "count": count,
+        "errors": errors,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0
+    }
+    if elapsed:
+        stats["throughput_rps"] = round(count / elapsed, 1)
+    return stats
+
+def timed_sync(fn: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+async def timed_async(fn: Callable[[], Awaitable[Any]], iterations: int) -> Dict[str, Any]:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+# Micro-benchmarks
+
+def synthetic_stocks(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(17)
+    return [
+        {
+            "symbol": f"S{i:05d}",
+            "name": f"Synthetic {i} Inc",
+            "sector": rng.choice(SECTORS),
+            "industry": "Services",
+            "current_price": round(rng.uniform(5, 800), 2),
+            "pe_ratio": round(rng.uniform(3, 80), 2),
+            "market_cap": rng.uniform(1e8, 2e12),
+            "dividend_yield": round(rng.uniform(0, 0.06), 4),
+            "roe": round(rng.uniform(-0.2, 0.5), 4)
+        }
+        for i in range(count)
+    ]
+
+SCREENER_RULES = [
+    {"field": "pe_ratio", "operator": "<", "value": 25},
+    {"field": "market_cap", "operator": ">", "value": 1e10},
+    {"field": "dividend_yield", "operator": ">", "value": 0.01}
+]
+
+async def run_micro(args) -> Dict[str, Dict[str, Any]]:
+    # Imported here so the demo app's module-level setup only runs when micro benchmarks do
+    import main
+
+    random.seed(1)
+    results = {
+        "micro.fetch_stock_data": timed_sync(lambda: main.fetch_stock_data("AAPL"), args.micro_iterations)
+    }
+
+    end = date.today()
+    backtest = main.BacktestRequest(
+        symbol="AAPL",
+        start_date=(end - timedelta(days=365 * 2)).isoformat(),
+        end_date=end.isoformat()
+    )
+    results["micro.run_backtest"] = await timed_async(lambda: main.run_backtest(backtest), args.micro_iterations)
+
+    stocks = synthetic_stocks(args.stocks)
+    stats = timed_sync(lambda: [stock for stock in stocks if _matches_rules(stock, SCREENER_RULES)], args.micro_iterations)
+    stats["stocks"] = len(stocks)
+    results["micro.screener_rules"] = stats
+    return results
+
+# End-to-end load
+
+async def connect_database(args) -> None:
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        mongodb.client = AsyncIOMotorClient(args.mongo_url)
+        await mongodb.client.drop_database(args.mongo_database)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        mongodb.client = AsyncMongoMockClient()
+    mongodb.db = mongodb.client[args.mongo_database]
+
+async def seed(args) -> Dict[str, Any]:
+    """Users with portfolios and trade history, a stock universe and one screener per user"""
+    rng = random.Random(23)
+    stocks = synthetic_stocks(args.stocks)
+    await mongodb.get_collection("stocks").insert_many(stocks)
+    symbols = [stock["symbol"] for stock in stocks[:args.traded_symbols]]
+
+    hashed = get_password_hash(PASSWORD)
+    users = []
+    for i in range(args.users):
+        email = f"bench{i}@example.com"
+        result = await mongodb.get_collection("users").insert_one({
+            "email": email,
+            "username": f"bench{i}",
+            "hashed_password": hashed,
+            "is_active": True,
+            "virtual_capital": 1_000_000.0
+        })
+        user_id = str(result.inserted_id)
+        holdings = {symbol: rng.randint(1, 100) for symbol in rng.sample(symbols, min(5, len(symbols)))}
+        await mongodb.get_collection("portfolios").insert_one({
+            "user_id": user_id,
+            "holdings": holdings,
+            "cash_balance": 500_000.0,
+            "total_value": 500_000.0,
+            "last_updated": datetime.utcnow()
+        })
+        await mongodb.get_collection("trades").insert_many([
+            {
+                "user_id": user_id,
+                "symbol": symbol,
+                "trade_type": "BUY",
+                "quantity": quantity,
+                "price": 100.0,
+                "total_amount": 100.0 * quantity,
+                "status": "EXECUTED",
+                "created_at": datetime.utcnow(),
+                "executed_at": datetime.utcnow()
+            }
+            for symbol, quantity in holdings.items()
+        ])
+        screener = await mongodb.get_collection("screeners").insert_one({
+            "user_id": user_id,
+            "name": "Value",
+            "criteria": {},
+            "rules": SCREENER_RULES
+        })
+        users.append({
+            "email": email,
+            "headers": {"Authorization": f"Bearer {create_access_token({'sub': email})}"},
+            "screener_id": str(screener.inserted_id)
+        })
+    return {"users": users, "symbols": symbols}
+
+def build_app() -> FastAPI:
+    """The API package behind the same middleware stack main.py uses"""
+    app = FastAPI()
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_COMPRESS_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+# A scenario performs one user action and returns the last response it received
+Scenario = Callable[[httpx.AsyncClient, Dict[str, Any], int], Awaitable[httpx.Response]]
+
+async def login(client: httpx.AsyncClient, ctx: Dict[str, Any], i: int) -> httpx.Response:
+    user = ctx["users"][i % len(ctx["users"])]
+    response = await client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": user["email"], "password": PASSWORD}
+    )
+    return response
+
+async def stock_detail(client: httpx.AsyncClient, ctx: Dict[str, Any], i: int) -> httpx.Response:
+    user = ctx["users"][i % len(ctx["users"])]
+    symbol = ctx["symbols"][i % len(ctx["symbols"])]
+    response = await client.get(f"{settings.API_V1_STR}/stocks/{symbol}", headers=user["headers"])
+    return response
+
+async def holdings(client: httpx.AsyncClient, ctx: Dict[str, Any], i: int) -> httpx.Response:
+    user = ctx["users"][i % len(ctx["users"])]
+    response = await client.get(f"{settings.API_V1_STR}/portfolio/holdings", headers=user["headers"])
+    return response
+
+async def trade(client: httpx.AsyncClient, ctx: Dict[str, Any], i: int) -> httpx.Response:
+    user = ctx["users"][i % len(ctx["users"])]
+    symbol = ctx["symbols"][i % len(ctx["symbols"])]
+    response = await client.post(
+        f"{settings.API_V1_STR}/trades/",
+        json={"symbol": symbol, "trade_type": "BUY", "quantity": 1, "price": 0},
+        headers=user["headers"]
+    )
+    if response.status_code != 200:
+        return response
+    trade_id = response.json().get("_id")
+    response = await client.post(f"{settings.API_V1_STR}/trades/{trade_id}/execute", headers=user["headers"])
+    return response
+
+async def screener_run(client: httpx.AsyncClient, ctx: Dict[str, Any], i: int) -> httpx.Response:
+    user = ctx["users"][i % len(ctx["users"])]
+    response = await client.post(
+        f"{settings.API_V1_STR}/screeners/{user['screener_id']}/run",
+        headers=user["headers"]
+    )
+    return response
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": login,
+    "stock_detail": stock_detail,
+    "holdings": holdings,
+    "trade_submit_execute": trade,
+    "screener_run": screener_run
+}
+
+async def load(client: httpx.AsyncClient, scenario: Scenario, ctx: Dict[str, Any], requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: Counter = Counter()
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx, i)
+            except Exception as exc:
+                errors[type(exc).__name__] += 1
+                continue
+            if response.is_success:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors[f"HTTP {response.status_code}"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats = summarize(latencies, time.perf_counter() - started, sum(errors.values()))
+    if errors:
+        stats["error_kinds"] = dict(errors)
+    return stats
+
+async def run_e2e(args) -> Dict[str, Dict[str, Any]]:
+    await connect_database(args)
+    results = {}
+    async with FakeAlphaVantage(latency=args.upstream_latency_ms / 1000) as fake:
+        alpha_vantage.BASE_URL = fake.url
+        await alpha_vantage.cache.clear()
+        auth_cache.tokens.clear()
+        await auth_cache.users.clear()
+        ctx = await seed(args)
+        transport = httpx.ASGITransport(app=build_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for name, scenario in SCENARIOS.items():
+                if args.scenario and name not in args.scenario:
+                    continue
+                requests = args.login_requests if name == "login" else args.requests
+                stats = await load(client, scenario, ctx, requests, args.concurrency)
+                stats["upstream_calls"] = sum(fake.requests.values())
+                fake.requests.clear()
+                results[f"e2e.{name}"] = stats
+        await valuation_service.close()
+    return results
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+async def run(args) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    if args.only in (None, "micro"):
+        results.update(await run_micro(args))
+    if args.only in (None, "e2e"):
+        results.update(await run_e2e(args))
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args)
+        },
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="fractional slowdown that counts as a regression")
+    parser.add_argument("--only", choices=["micro", "e2e"])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="run only these load scenarios")
+    parser.add_argument("--micro-iterations", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500, help="requests per load scenario")
+    parser.add_argument("--login-requests", type=int, default=100, help="logins are bcrypt-bound, so fewer by default")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--stocks", type=int, default=5000)
+    parser.add_argument("--traded-symbols", type=int, default=50)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--mongo-url", help="use a real MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--mongo-database", default="financial_screener_bench")
+    args = parser.parse_args()
+
+    configure_logging(level="WARNING")
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["results"], indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(json.load(f), report, args.threshold)
+        print(format_rows(rows))
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
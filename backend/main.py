@@ -1,15 +1,26 @@
+# Imported first so the startup clock covers loading everything below
+from app.core.startup import ReadinessMiddleware, startup
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 import jwt
 from datetime import datetime, timedelta
-import requests
 import json
+import logging
 import random
 import os
+import uuid
 from typing import List, Optional, Dict, Any
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.log import RequestIDMiddleware, configure_logging, shutdown_logging
+from app.core.metrics import PROMETHEUS_MEDIA_TYPE, MetricsMiddleware, registry
+from app.core.middleware import CompressionMiddleware
+from app.core.profiling import RequestProfilerMiddleware
+from app.core.responses import MongoJSONResponse
+from app.services.cache_backend import cache_hub
 # Comment out MongoDB connection for now
 # from app.routers import auth, portfolio, stocks, screeners
 # from app.db.mongodb import connect_to_mongo, close_mongo_connection
@@ -99,6 +110,8 @@ class BacktestResult(BaseModel):
     trades: List[dict]
     equity_curve: List[dict]
 
+logger = logging.getLogger("main")
+
 SECRET_KEY = "your-secure-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -118,6 +131,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large payloads (historical series, statements, screener results)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESS_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
+# Per-route latency histograms; added last so the timing includes compression
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Per-request sampling for requests that carry the profiling token; absent unless enabled.
+# Enabling it without a token fails here instead of leaving sampling open to anyone
+if settings.PROFILING_ENABLED:
+    if not settings.PROFILING_TOKEN:
+        raise RuntimeError("PROFILING_ENABLED requires a non-empty PROFILING_TOKEN")
+    app.add_middleware(
+        RequestProfilerMiddleware,
+        token=settings.PROFILING_TOKEN,
+        routes=settings.PROFILING_ROUTES,
+        interval=settings.PROFILING_REQUEST_INTERVAL_MS / 1000,
+        header=settings.PROFILING_HEADER,
+    )
+    from app.api.api_v1.endpoints import profiling
+    app.include_router(profiling.router, prefix="/api/v1/admin/profiler", include_in_schema=False)
+
+# Sheds traffic with 503 until the warm-up phase has finished; probes always pass
+app.add_middleware(ReadinessMiddleware, gate=settings.READINESS_GATE_ENABLED)
+
+# Outermost, so every log record for a request (including the access log) carries its id
+app.add_middleware(RequestIDMiddleware)
+
 # Include routers - commented out for now
 # app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 # app.include_router(portfolio.router, prefix="/api/v1/portfolio", tags=["portfolio"])
@@ -133,7 +179,32 @@ app.add_middleware(
 # async def shutdown_db_client():
 #     await close_mongo_connection()
 
-# In-memory user storage for testing
+@app.on_event("startup")
+async def start_background_services():
+    # Structured logs go through a queue to a writer thread instead of print() on the event
+    # loop. Set up when the server starts rather than on import, so importing main (the
+    # benchmarks do) leaves the importer's logging alone
+    configure_logging(
+        level=settings.LOG_LEVEL,
+        json_format=settings.LOG_JSON,
+        sample_rates=settings.LOG_SAMPLE_RATES,
+        queue_size=settings.LOG_QUEUE_SIZE,
+    )
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    await cache_hub.start()
+    # Peer statistics, the market snapshot and prefetching need MongoDB and the API
+    # routes; they start with the app that mounts app.api.api_v1.api.api_router
+    startup.begin_warm_up()
+
+@app.on_event("shutdown")
+async def flush_logs():
+    await startup.stop()
+    await loop_monitor.stop()
+    await cache_hub.close()
+    shutdown_logging()
+
+# Built-in demo accounts (read-only); registered users go to demo_users below
 fake_users_db = {
     "testuser": {
         "username": "testuser",
@@ -147,9 +218,18 @@ fake_users_db = {
     }
 }
 
-# In-memory storage for demo purposes
-portfolio_db = {}
-trades_db = []
+# Demo state lives in the cache backend, so with several workers (CACHE_BACKEND=redis)
+# every worker sees the same registered users, portfolios and trades. It is state, not
+# a cache: these namespaces never evict
+demo_users = cache_hub.cache("demo_users", max_entries=None)
+demo_portfolios = cache_hub.cache("demo_portfolios", max_entries=None)
+# Trades are one append-only list, read in a single round trip instead of scanning the namespace
+demo_trades = cache_hub.cache("demo_trades", max_entries=None)
+DEMO_TRADES_KEY = "all"
+
+async def find_demo_user(username: str) -> Optional[dict]:
+    """Built-in demo accounts first, then accounts registered on any worker"""
+    return fake_users_db.get(username) or await demo_users.get(username)
 
 # Helper functions for fetching stock data
 def fetch_stock_data(symbol: str) -> dict:
@@ -187,7 +267,7 @@ def fetch_stock_data(symbol: str) -> dict:
             "historicalPrices": historical_prices
         }
     except Exception as e:
-        print(f"Error fetching stock data: {e}")
+        logger.exception("Error fetching stock data", extra={"event": "stock.fetch_error", "symbol": symbol})
         raise HTTPException(status_code=500, detail=f"Error fetching stock data: {str(e)}")
 
 def fetch_financial_data(symbol: str) -> dict:
@@ -209,7 +289,7 @@ def fetch_financial_data(symbol: str) -> dict:
             "dividendYield": dividend_yield
         }
     except Exception as e:
-        print(f"Error fetching financial data: {e}")
+        logger.exception("Error fetching financial data", extra={"event": "financials.fetch_error", "symbol": symbol})
         raise HTTPException(status_code=500, detail=f"Error fetching financial data: {str(e)}")
 
 def generate_screener_results() -> List[dict]:
@@ -251,24 +331,34 @@ async def root():
         "redoc_url": "/redoc"
     }
 
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    """Readiness probe: 503 until the warm-up phase has finished, then 200; both report the startup phases"""
+    return JSONResponse(startup.status(), status_code=200 if startup.ready else 503)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of request, upstream and Mongo metrics"""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
 # Auth endpoints
 @app.post("/api/v1/auth/register", response_model=Token)
 async def register_user(user: UserCreate):
-    if user.username in fake_users_db:
+    # In a real application, we would hash the password and store in a database.
+    # add() is set-if-absent, so two workers cannot register the same name at once
+    registered = user.username not in fake_users_db and await demo_users.add(user.username, {
+        "username": user.username,
+        "email": user.email,
+        "hashed_password": user.password,  # This would be hashed in a real application
+    })
+    if not registered:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
-    # In a real application, we would hash the password and store in a database
-    fake_users_db[user.username] = {
-        "username": user.username,
-        "email": user.email,
-        "hashed_password": user.password,  # This would be hashed in a real application
-    }
-    
     # Initialize empty portfolio for new user
-    portfolio_db[user.username] = []
+    await demo_portfolios.set(user.username, [])
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -279,29 +369,19 @@ async def register_user(user: UserCreate):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/v1/auth/login", response_model=Token)
-async def login_for_access_token(user: UserLogin, request: Request):
-    print(f"Login attempt for user: {user.username}")
-    
-    # Debug: print request body
-    body = await request.body()
-    print(f"Raw request body: {body}")
-    
-    # Debug: print the user object
-    print(f"UserLogin object: {user}")
-    print(f"Checking against fake_users_db: {fake_users_db}")
-    
+async def login_for_access_token(user: UserLogin):
     # Simple validation - in a real app this would check hashed passwords
-    if user.username not in fake_users_db:
-        print(f"User not found: {user.username}")
+    stored = await find_demo_user(user.username)
+    if stored is None:
+        logger.info("Login failed: unknown user", extra={"event": "auth.login_failed", "username": user.username, "reason": "unknown_user"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if fake_users_db[user.username]["hashed_password"] != user.password:
-        print(f"Invalid password for user: {user.username}")
-        print(f"Expected: {fake_users_db[user.username]['hashed_password']}, Got: {user.password}")
+    if stored["hashed_password"] != user.password:
+        logger.info("Login failed: bad password", extra={"event": "auth.login_failed", "username": user.username, "reason": "bad_password"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -314,23 +394,22 @@ async def login_for_access_token(user: UserLogin, request: Request):
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     
-    print(f"Login successful for {user.username}, token: {access_token}")
+    logger.info("Login succeeded", extra={"event": "auth.login", "username": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/v1/auth/login-form")
 async def login_with_form(form_data: OAuth2PasswordRequestForm = Depends()):
-    print(f"Form login attempt for user: {form_data.username}")
-    
-    if form_data.username not in fake_users_db:
-        print(f"User not found: {form_data.username}")
+    stored = await find_demo_user(form_data.username)
+    if stored is None:
+        logger.info("Login failed: unknown user", extra={"event": "auth.login_failed", "username": form_data.username, "reason": "unknown_user"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if fake_users_db[form_data.username]["hashed_password"] != form_data.password:
-        print(f"Invalid password for user: {form_data.username}")
+    if stored["hashed_password"] != form_data.password:
+        logger.info("Login failed: bad password", extra={"event": "auth.login_failed", "username": form_data.username, "reason": "bad_password"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -349,7 +428,7 @@ async def login_with_form(form_data: OAuth2PasswordRequestForm = Depends()):
 async def get_current_user():
     return {"username": "testuser", "email": "test@example.com"}
 
-@app.get("/api/v1/portfolio/holdings")
+@app.get("/api/v1/portfolio/holdings", response_class=MongoJSONResponse)
 async def get_holdings():
     # In a real app, you would get the user from the token and return their holdings
     holdings = []
@@ -378,7 +457,8 @@ async def get_holdings():
 @app.post("/api/v1/portfolio/trade")
 async def execute_trade(trade: Trade):
     # In a real app, you would get the user from the token and update their portfolio
-    trade_id = f"trade_{len(trades_db) + 1}"
+    # Counting existing trades would hand out the same id on two workers
+    trade_id = f"trade_{uuid.uuid4().hex[:12]}"
     timestamp = datetime.utcnow().isoformat()
     total = trade.shares * trade.price
     
@@ -392,7 +472,7 @@ async def execute_trade(trade: Trade):
         "total": total
     }
     
-    trades_db.append(trade_record)
+    await demo_trades.append(DEMO_TRADES_KEY, trade_record)
     
     return {
         "success": True,
@@ -400,11 +480,13 @@ async def execute_trade(trade: Trade):
         "transaction": trade_record
     }
 
-@app.get("/api/v1/portfolio/trades")
+@app.get("/api/v1/portfolio/trades", response_class=MongoJSONResponse)
 async def get_trades():
     # In a real app, you would get the user from the token and return their trades
-    if not trades_db:
-        # Generate some sample trades if none exist
+    trades = await demo_trades.get_list(DEMO_TRADES_KEY)
+    # Generate some sample trades if none exist; only the worker that claims the marker
+    # writes them, so workers seeding at once cannot duplicate trades
+    if not trades and await demo_trades.add("seeded", True):
         symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]
         for i in range(5):
             symbol = random.choice(symbols)
@@ -414,7 +496,7 @@ async def get_trades():
             trade_type = random.choice(["buy", "sell"])
             timestamp = (datetime.utcnow() - timedelta(days=random.randint(0, 30))).isoformat()
             
-            trades_db.append({
+            await demo_trades.append(DEMO_TRADES_KEY, {
                 "id": f"trade_{i+1}",
                 "symbol": symbol,
                 "shares": shares,
@@ -424,8 +506,10 @@ async def get_trades():
                 "total": round(shares * price, 2)
             })
     
+        trades = await demo_trades.get_list(DEMO_TRADES_KEY)
+    
     # Sort trades by timestamp (newest first)
-    sorted_trades = sorted(trades_db, key=lambda x: x["timestamp"], reverse=True)
+    sorted_trades = sorted(trades, key=lambda x: x["timestamp"], reverse=True)
     
     return sorted_trades
 
@@ -454,6 +538,49 @@ async def get_performance():
     
     return values
 
+# Demo symbol universe; the API package builds the same index from the stocks collection
+sample_stocks = [
+    {"symbol": "AAPL", "companyName": "Apple Inc."},
+    {"symbol": "MSFT", "companyName": "Microsoft Corporation"},
+    {"symbol": "GOOGL", "companyName": "Alphabet Inc."},
+    {"symbol": "AMZN", "companyName": "Amazon.com Inc."},
+    {"symbol": "META", "companyName": "Meta Platforms Inc."},
+    {"symbol": "TSLA", "companyName": "Tesla Inc."},
+    {"symbol": "NVDA", "companyName": "NVIDIA Corporation"},
+    {"symbol": "JPM", "companyName": "JPMorgan Chase & Co."},
+    {"symbol": "V", "companyName": "Visa Inc."},
+    {"symbol": "WMT", "companyName": "Walmart Inc."},
+    {"symbol": "JNJ", "companyName": "Johnson & Johnson"},
+    {"symbol": "HD", "companyName": "Home Depot Inc."},
+    {"symbol": "PG", "companyName": "Procter & Gamble Co."},
+    {"symbol": "MA", "companyName": "Mastercard Inc."},
+    {"symbol": "UNH", "companyName": "UnitedHealth Group Inc."}
+]
+sample_symbol_index = None
+
+def get_sample_symbol_index():
+    """Built by the warm-up phase, or by the first search if that has not run"""
+    global sample_symbol_index
+    if sample_symbol_index is None:
+        # symbol_search also holds the Mongo-backed index, which loads the driver
+        from app.services.symbol_search import SymbolIndex
+        sample_symbol_index = SymbolIndex({"symbol": stock["symbol"], "name": stock["companyName"]} for stock in sample_stocks)
+    return sample_symbol_index
+
+async def warm_symbol_index():
+    get_sample_symbol_index()
+
+startup.add_warmup("symbol_index", warm_symbol_index)
+
+# Registered before /api/v1/stocks/{symbol}, which would otherwise capture "search"
+@app.get("/api/v1/stocks/search")
+async def search_stocks(q: str):
+    """Search for stocks by symbol or company name"""
+    return [
+        {"symbol": match["symbol"], "companyName": match["name"]}
+        for match in get_sample_symbol_index().search(q, limit=10)
+    ]
+
 @app.get("/api/v1/stocks/{symbol}")
 async def get_stock(symbol: str):
     return fetch_stock_data(symbol)
@@ -484,18 +611,17 @@ async def get_screener_results():
 # Update the login endpoint to use the fixed model
 @app.post("/api/v1/auth/login-alt", response_model=Token)
 async def login_alternative(user: UserLoginFixed):
-    print(f"Alternative login attempt for user: {user.username}")
-    
     # Simple validation
-    if user.username not in fake_users_db:
-        print(f"User not found: {user.username}")
+    stored = await find_demo_user(user.username)
+    if stored is None:
+        logger.info("Login failed: unknown user", extra={"event": "auth.login_failed", "username": user.username, "reason": "unknown_user"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
     
-    if fake_users_db[user.username]["hashed_password"] != user.password:
-        print(f"Invalid password for user: {user.username}")
+    if stored["hashed_password"] != user.password:
+        logger.info("Login failed: bad password", extra={"event": "auth.login_failed", "username": user.username, "reason": "bad_password"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -514,28 +640,25 @@ async def login_raw(request: Request):
     try:
         # Get JSON directly from request
         data = await request.json()
-        print(f"Raw login data: {data}")
-        
         username = data.get("username")
         password = data.get("password")
         
-        print(f"Raw login attempt for user: {username}")
-        
         if not username or not password:
             return JSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={"detail": "Missing username or password"}
             )
         
-        if username not in fake_users_db:
-            print(f"User not found: {username}")
+        stored = await find_demo_user(username)
+        if stored is None:
+            logger.info("Login failed: unknown user", extra={"event": "auth.login_failed", "username": username, "reason": "unknown_user"})
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Incorrect username or password"}
             )
         
-        if fake_users_db[username]["hashed_password"] != password:
-            print(f"Invalid password for user: {username}")
+        if stored["hashed_password"] != password:
+            logger.info("Login failed: bad password", extra={"event": "auth.login_failed", "username": username, "reason": "bad_password"})
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Incorrect username or password"}
@@ -547,55 +670,22 @@ async def login_raw(request: Request):
             data={"sub": username}, expires_delta=access_token_expires
         )
         
-        print(f"Raw login successful for {username}")
+        logger.info("Login succeeded", extra={"event": "auth.login", "username": username})
         return {"access_token": access_token, "token_type": "bearer"}
     
     except json.JSONDecodeError as e:
-        print(f"JSON decode error: {str(e)}")
+        logger.info("Login failed: invalid JSON", extra={"event": "auth.login_failed", "reason": "invalid_json"})
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"detail": "Invalid JSON format"}
         )
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        logger.exception("Login error", extra={"event": "auth.login_error"})
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"detail": f"Login error: {str(e)}"}
         )
 
-@app.get("/api/v1/stocks/search")
-async def search_stocks(q: str):
-    """Search for stocks by symbol or company name"""
-    # In a real app, this would search a database
-    # For now, we'll use a small set of sample stocks
-    sample_stocks = [
-        {"symbol": "AAPL", "companyName": "Apple Inc."},
-        {"symbol": "MSFT", "companyName": "Microsoft Corporation"},
-        {"symbol": "GOOGL", "companyName": "Alphabet Inc."},
-        {"symbol": "AMZN", "companyName": "Amazon.com Inc."},
-        {"symbol": "META", "companyName": "Meta Platforms Inc."},
-        {"symbol": "TSLA", "companyName": "Tesla Inc."},
-        {"symbol": "NVDA", "companyName": "NVIDIA Corporation"},
-        {"symbol": "JPM", "companyName": "JPMorgan Chase & Co."},
-        {"symbol": "V", "companyName": "Visa Inc."},
-        {"symbol": "WMT", "companyName": "Walmart Inc."},
-        {"symbol": "JNJ", "companyName": "Johnson & Johnson"},
-        {"symbol": "HD", "companyName": "Home Depot Inc."},
-        {"symbol": "PG", "companyName": "Procter & Gamble Co."},
-        {"symbol": "MA", "companyName": "Mastercard Inc."},
-        {"symbol": "UNH", "companyName": "UnitedHealth Group Inc."}
-    ]
-    
-    # Filter stocks based on the query
-    q = q.lower()
-    results = [
-        stock for stock in sample_stocks
-        if q in stock["symbol"].lower() or q in stock["companyName"].lower()
-    ]
-    
-    return results[:10]  # Limit to 10 results
-
-# Add this before the if __name__ block
 @app.post("/api/v1/backtest", response_model=BacktestResult)
 async def run_backtest(request: BacktestRequest):
     """Run a backtest for a given strategy and stock symbol"""
@@ -762,7 +852,7 @@ async def run_backtest(request: BacktestRequest):
         }
         
     except Exception as e:
-        print(f"Backtest error: {str(e)}")
+        logger.exception("Backtest error", extra={"event": "backtest.error", "symbol": request.symbol})
         raise HTTPException(status_code=500, detail=f"Backtest error: {str(e)}")
 
 @app.get("/api/v1/backtest/strategies")
@@ -800,13 +890,38 @@ async def get_backtest_strategies():
         }
     ]
 
+startup.mark("imported")
+
 # Add this at the end of the file
 if __name__ == "__main__":
+    import argparse
     import uvicorn
     import sys
     
-    port = 8000
-    host = "127.0.0.1"
+    parser = argparse.ArgumentParser(description="Run the API server")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument(
+        "--production", action="store_true",
+        help="No auto-reload; implied when --workers is more than 1"
+    )
+    parser.add_argument(
+        "--startup-profile", action="store_true",
+        help="Report per-module import times and time to first request of a cold server, then exit"
+    )
+    args = parser.parse_args()
+    if args.startup_profile:
+        from app.core.startup import profile
+        print(json.dumps(profile(), indent=2))
+        sys.exit(0)
+    host, port, workers = args.host, args.port, args.workers
+    production = args.production or workers > 1
+    
+    if workers > 1 and not cache_hub.shared:
+        # Each worker would keep its own users, trades and caches and never hear about
+        # the others' invalidations
+        sys.exit("Running more than one worker needs CACHE_BACKEND=redis (and CACHE_REDIS_URL)")
     
     # Display useful links in console before starting the server
     print("\n" + "="*50)
@@ -816,14 +931,19 @@ if __name__ == "__main__":
     print(f"\033[1m\033[94m Swagger UI:     \033[0m http://{host}:{port}/docs")
     print(f"\033[1m\033[94m ReDoc:          \033[0m http://{host}:{port}/redoc")
     print(f"\033[1m\033[94m OpenAPI Schema: \033[0m http://{host}:{port}/openapi.json")
+    print(f"\033[1m\033[94m Mode:           \033[0m {f'production, {workers} worker(s)' if production else 'development (reload)'}")
     print("="*50)
     print("\nPress Ctrl+C to quit\n")
     
-    # Configure the server with the same settings used in the command
+    # Development: one process that reloads on code changes. Production: a pool of
+    # workers sharing state through the cache backend; reload cannot be combined with it.
+    # Reload and worker processes import the app by name; a single production process
+    # serves the app already built here instead of importing main a second time
     uvicorn.run(
-        "main:app",
+        "main:app" if not production or workers > 1 else app,
         host=host,
         port=port,
-        reload=True,  # Enable auto-reload for development
+        reload=not production,
+        workers=workers,
         log_level="info"
     ) 
\ No newline at end of file
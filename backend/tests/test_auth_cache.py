@@ -0,0 +1,37 @@
+import asyncio
+from app.models.user import User
+from app.services.auth_cache import AuthCache
+
+def _user(active=True):
+    return User(id="0123456789abcdef01234567", email="a@example.com", username="a", full_name="A", is_active=active)
+
+def test_payload_never_outlives_token_expiry():
+    cache = AuthCache(max_entries=10, ttl=60)
+    cache.put_payload("expired", {"sub": "a@example.com", "exp": 0})
+    cache.put_payload("valid", {"sub": "a@example.com"})
+    assert cache.get_payload("expired") is None
+    assert cache.get_payload("valid") == {"sub": "a@example.com"}
+
+def test_invalidate_drops_cached_user():
+    async def scenario():
+        cache = AuthCache(max_entries=10, ttl=60)
+        await cache.put_user("a@example.com", _user(), await cache.user_generation("a@example.com"))
+        assert (await cache.get_user("a@example.com")).is_active
+        await cache.invalidate_user("a@example.com")
+        assert await cache.get_user("a@example.com") is None
+    asyncio.run(scenario())
+
+def test_read_that_started_before_invalidation_is_not_cached():
+    async def scenario():
+        cache = AuthCache(max_entries=10, ttl=60)
+        # The request notes the generation, then reads the still-active document...
+        generation = await cache.user_generation("a@example.com")
+        stale = _user(active=True)
+        # ...while the user is deactivated and invalidated
+        await cache.invalidate_user("a@example.com")
+        await cache.put_user("a@example.com", stale, generation)
+        assert await cache.get_user("a@example.com") is None
+        # The next read sees the new generation and may cache again
+        await cache.put_user("a@example.com", _user(active=False), await cache.user_generation("a@example.com"))
+        assert not (await cache.get_user("a@example.com")).is_active
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from app.services.cache_backend import CacheHub
+from benchmarks.fake_redis import FakeRedis
+
+def test_memory_cache_add_append_and_eviction():
+    async def scenario():
+        cache = CacheHub().cache("users", max_entries=2)
+        assert await cache.add("a", 1, ttl=60)
+        assert not await cache.add("a", 2, ttl=60)
+        await cache.set("b", 2)
+        await cache.set("c", 3, ttl=60)
+        # Bounded at two entries, least recently used first out
+        assert await cache.get("a") is None and sorted(await cache.values()) == [2, 3]
+        assert (await cache.ttl_remaining(["b", "c", "x"]))[::2] == [float("inf"), None]
+        trades = CacheHub().cache("trades", max_entries=None)
+        assert await trades.append("u", {"n": 1}) == 1
+        assert await trades.append("u", {"n": 2}) == 2
+        assert await trades.get_list("u") == [{"n": 1}, {"n": 2}]
+    asyncio.run(scenario())
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        CacheHub("memcached")
+
+def test_redis_writes_invalidate_other_workers_near_copies():
+    async def scenario():
+        async with FakeRedis() as server:
+            first = CacheHub("redis", server.url, prefix="test", near_ttl=60)
+            second = CacheHub("redis", server.url, prefix="test", near_ttl=60)
+            a, b = first.cache("quotes"), second.cache("quotes")
+            await first.start()
+            await second.start()
+            try:
+                # Let both listeners subscribe before anything is published
+                await asyncio.sleep(0.1)
+                await a.set("IBM", {"price": 1.0}, ttl=60)
+                assert await b.get("IBM") == {"price": 1.0}
+                await a.set("IBM", {"price": 2.0}, ttl=60)
+                # The second worker drops its near copy when the invalidation arrives
+                for _ in range(100):
+                    if b.stats()["near_size"] == 0:
+                        break
+                    await asyncio.sleep(0.01)
+                assert await b.get("IBM") == {"price": 2.0}
+                # A worker ignores its own messages, so its near copy survives
+                assert a.stats()["near_size"] == 1
+                assert not await b.add("IBM", {"price": 3.0}, ttl=60)
+                assert (await a.ttl_remaining(["IBM", "missing"]))[1] is None
+                await b.delete("IBM")
+                assert await b.get("IBM") is None
+                assert await a.append("log", [1]) == 1 and await b.get_list("log") == [[1]]
+            finally:
+                await first.close()
+                await second.close()
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import asyncio
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from mongomock_motor import AsyncMongoMockClient
+from app.api.api_v1.endpoints import stocks
+from app.db.mongodb import mongodb
+from app.services.alpha_vantage import alpha_vantage
+from app.services.fundamentals import FUNDAMENTALS, FundamentalsService, compute_ratios, parse_statements
+
+def _report(date, **values):
+    return {"fiscalDateEnding": date, **{key: str(value) for key, value in values.items()}}
+
+STATEMENTS = {
+    "income_statement": {"annualReports": [
+        _report("2025-12-31", netIncome=20, ebit=30, totalRevenue=100),
+        _report("2024-12-31", netIncome=10, ebit="None", totalRevenue=90),
+    ]},
+    "balance_sheet": {"annualReports": [
+        _report("2025-12-31", totalShareholderEquity=100, totalAssets=300, totalCurrentAssets=80, inventory=20,
+                totalCurrentLiabilities=40, totalLiabilities=200, shortLongTermDebtTotal="None"),
+    ]},
+    "cash_flow": {"annualReports": []},
+}
+
+def test_statements_are_aligned_oldest_first_with_ratios():
+    table = parse_statements(STATEMENTS)
+    assert table["dates"].astype(str).tolist() == ["2024-12-31", "2025-12-31"]
+    assert table["netIncome"].tolist() == [10.0, 20.0]
+    # 2024 has no balance sheet, so its ratios are NaN rather than wrong
+    assert np.isnan(table["roe"][0])
+    assert table["roe"][1] == pytest.approx(0.2)
+    assert table["roce"][1] == pytest.approx(30 / 260)
+    # No total debt reported, so total liabilities stands in
+    assert table["debt_equity"][1] == pytest.approx(2.0)
+    assert table["current_ratio"][1] == pytest.approx(2.0)
+    assert table["quick_ratio"][1] == pytest.approx(1.5)
+
+def test_non_positive_denominators_give_nan():
+    table = {field: np.array([1.0]) for field in (
+        "netIncome", "ebit", "totalAssets", "totalCurrentAssets", "inventory", "totalLiabilities",
+        "shortLongTermDebtTotal",
+    )}
+    table.update(totalShareholderEquity=np.array([-5.0]), totalCurrentLiabilities=np.array([0.0]))
+    ratios = compute_ratios(table)
+    assert all(np.isnan(ratios[name][0]) for name in ("roe", "debt_equity", "current_ratio", "quick_ratio"))
+
+def test_unknown_symbol_is_not_stored_and_answers_404(monkeypatch):
+    async def empty(symbol):
+        return {}
+    for name in ("get_income_statement", "get_balance_sheet", "get_cash_flow"):
+        monkeypatch.setattr(alpha_vantage, name, empty)
+    monkeypatch.setattr(mongodb, "db", AsyncMongoMockClient()["test"])
+    service = FundamentalsService()
+    monkeypatch.setattr(stocks, "fundamentals", service)
+
+    async def scenario():
+        assert await service.refresh("NOPE") is None
+        assert await mongodb.get_collection(FUNDAMENTALS).count_documents({}) == 0
+        with pytest.raises(HTTPException) as error:
+            await stocks.get_fundamentals("nope", "annual", current_user=None)
+        assert error.value.status_code == 404
+    asyncio.run(scenario())
+
+def test_refresh_stores_both_frequencies(monkeypatch):
+    for name, kind in (("get_income_statement", "income_statement"), ("get_balance_sheet", "balance_sheet"), ("get_cash_flow", "cash_flow")):
+        async def fetch(symbol, kind=kind):
+            return STATEMENTS[kind]
+        monkeypatch.setattr(alpha_vantage, name, fetch)
+    monkeypatch.setattr(mongodb, "db", AsyncMongoMockClient()["test"])
+    service = FundamentalsService()
+
+    async def scenario():
+        assert await service.refresh("ACME") is True
+        assert await service.refresh("ACME") is False
+        table = await service.get_table("ACME", "annual")
+        assert table["columns"]["roe"] == [None, pytest.approx(0.2)]
+        assert await mongodb.get_collection(FUNDAMENTALS).count_documents({"symbol": "ACME"}) == 2
+    asyncio.run(scenario())
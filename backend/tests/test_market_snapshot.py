@@ -0,0 +1,54 @@
+import asyncio
+import numpy as np
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from app.db.mongodb import mongodb
+from app.services.market_snapshot import MarketSnapshot, SnapshotManager
+
+STOCKS = [
+    {"symbol": "A", "sector": "TECH", "pe_ratio": 12.0, "financial_metrics": {"roe": 0.2}},
+    {"symbol": "B", "sector": "TECH", "pe_ratio": 30.0},
+    {"symbol": "C", "sector": "ENERGY", "financial_metrics": {"roe": 0.05}, "peers": {"sector": {"roe": {"pct": 1.0}}}},
+]
+
+def test_columns_are_read_only_and_rules_skip_missing_values():
+    snapshot = MarketSnapshot(STOCKS, seq=1)
+    with pytest.raises(ValueError):
+        snapshot.columns["pe_ratio"][0] = 1.0
+    assert snapshot.select([{"field": "pe_ratio", "operator": "<", "value": 20}]).tolist() == [0]
+    # A bare ratio name reads financial_metrics.<name>
+    assert snapshot.select([{"field": "roe", "operator": ">", "value": 0.1}]).tolist() == [0]
+    assert snapshot.select([{"field": "peers.sector.roe.pct", "operator": "==", "value": 1.0}]).tolist() == [2]
+    assert np.isnan(snapshot.column("unknown")).all()
+
+def test_version_depends_on_contents_only():
+    assert MarketSnapshot(STOCKS, seq=1).version == MarketSnapshot(STOCKS, seq=2).version
+    changed = [dict(STOCKS[0], pe_ratio=13.0), *STOCKS[1:]]
+    assert MarketSnapshot(changed, seq=3).version != MarketSnapshot(STOCKS, seq=1).version
+
+def test_swap_keeps_a_pinned_snapshot_until_its_reader_is_done():
+    manager = SnapshotManager()
+    first, second = MarketSnapshot(STOCKS, seq=1), MarketSnapshot(STOCKS[:2], seq=2)
+    manager.swap(first)
+    with manager.pin() as pinned:
+        manager.swap(second)
+        assert pinned is first and len(pinned) == 3
+        assert manager.current is second and manager.retired == {1: first}
+    assert manager.retired == {}
+    with manager.pin() as pinned:
+        assert pinned is second
+
+def test_refresh_swaps_only_when_the_data_changed(monkeypatch):
+    monkeypatch.setattr(mongodb, "db", AsyncMongoMockClient()["test"])
+    manager = SnapshotManager()
+
+    async def scenario():
+        stocks = mongodb.get_collection("stocks")
+        await stocks.insert_many([dict(stock) for stock in STOCKS])
+        assert await manager.refresh() is True
+        version = manager.version
+        assert await manager.refresh() is False
+        await stocks.update_one({"symbol": "B"}, {"$set": {"pe_ratio": 31.0}})
+        assert await manager.refresh() is True
+        assert manager.version != version
+    asyncio.run(scenario())
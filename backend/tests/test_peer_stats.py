@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from app.services.peer_stats import Snapshot, aggregate, group_percentiles, group_quantiles
+
+def test_percentiles_average_ties_and_center_single_members():
+    codes = np.array([0, 0, 0, 0, 1, 0])
+    values = np.array([3.0, 1.0, 3.0, 2.0, 9.0, np.nan])
+    pct = group_percentiles(codes, values, 2)
+    assert pct[:5].tolist() == [pytest.approx(5 / 6), 0.0, pytest.approx(5 / 6), pytest.approx(1 / 3), 0.5]
+    assert np.isnan(pct[5])
+
+def test_quantiles_match_numpy_per_group_and_skip_nan():
+    rng = np.random.default_rng(5)
+    codes = rng.integers(0, 3, 200)
+    values = rng.normal(size=200)
+    values[::17] = np.nan
+    counts, means, table = group_quantiles(codes, values, 4, (0.25, 0.5, 0.9))
+    for code in range(3):
+        members = values[(codes == code) & ~np.isnan(values)]
+        assert counts[code] == len(members)
+        assert means[code] == pytest.approx(members.mean())
+        assert table[code] == pytest.approx(np.quantile(members, (0.25, 0.5, 0.9)))
+    # A group with no members has no statistics
+    assert counts[3] == 0 and np.isnan(table[3]).all()
+
+def test_aggregate_ranks_within_sectors_only():
+    snapshot = Snapshot([
+        {"symbol": "A", "sector": "TECH", "pe_ratio": 10.0},
+        {"symbol": "B", "sector": "TECH", "pe_ratio": 30.0},
+        {"symbol": "C", "sector": "ENERGY", "pe_ratio": 5.0, "financial_metrics": {"roe": 0.1}},
+        {"symbol": "D", "sector": None, "pe_ratio": 7.0},
+    ])
+    groups, ranks, members = aggregate(snapshot, "sector", only={"TECH"})
+    assert [group["_id"] for group in groups] == ["sector:TECH"]
+    assert groups[0]["metrics"]["pe_ratio"]["median"] == 20.0
+    assert members.tolist() == [True, True, False, False]
+    assert ranks["pe_ratio"]["pct"][:2].tolist() == [0.0, 1.0]
+    assert ranks["pe_ratio"]["vs_median"][:2].tolist() == [0.5, 1.5]
+    assert snapshot.values["roe"][2] == 0.1
@@ -0,0 +1,27 @@
+from datetime import datetime
+import numpy as np
+from app.services.performance import business_days, forward_fill, replay
+
+def _trade(day, quantity, price=5.0, trade_type="BUY", symbol="A"):
+    return {"symbol": symbol, "trade_type": trade_type, "quantity": quantity, "price": price, "executed_at": day}
+
+def test_forward_fill_carries_last_value_down_each_column():
+    matrix = np.array([[1.0, np.nan], [np.nan, 2.0], [np.nan, np.nan]])
+    assert forward_fill(matrix).tolist()[2] == [1.0, 2.0]
+
+def test_weekend_trade_counts_from_next_trading_day():
+    days = business_days(np.datetime64("2026-10-14"), np.datetime64("2026-10-20"))
+    closes = np.full((len(days), 1), 5.0)
+    trades = [_trade(datetime(2026, 10, 14, 15), 10), _trade(datetime(2026, 10, 17, 12), 1)]
+    cash, positions, equity = replay(days, ["A"], closes, trades, 1000.0, {})
+    assert [str(day) for day in days] == ["2026-10-14", "2026-10-15", "2026-10-16", "2026-10-19", "2026-10-20"]
+    assert positions[:, 0].tolist() == [10, 10, 10, 11, 11]
+    assert cash.tolist() == [950, 950, 950, 945, 945]
+    assert equity[-1] == 1000.0
+
+def test_trades_after_the_grid_are_left_for_the_next_run():
+    # Yesterday was a Sunday: the grid ends on Friday and Saturday's trade is not applied yet
+    days = business_days(np.datetime64("2026-10-12"), np.datetime64("2026-10-18"))
+    trades = [_trade(datetime(2026, 10, 17, 12), 1)]
+    cash, positions, _ = replay(days, ["A"], np.full((len(days), 1), 5.0), trades, 100.0, {})
+    assert positions[-1, 0] == 0 and cash[-1] == 100.0
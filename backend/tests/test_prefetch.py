@@ -0,0 +1,24 @@
+from app.services.prefetch import combine_scores, plan
+
+def test_scores_weight_each_source():
+    scores = combine_scores(
+        {"requests": {"IBM": 10, "AAPL": 2}, "watchlists": {"AAPL": 3}, "unweighted": {"MSFT": 100}},
+        {"requests": 1.0, "watchlists": 2.0},
+    )
+    assert scores == {"IBM": 10.0, "AAPL": 8.0, "MSFT": 0.0}
+
+def test_plan_orders_by_share_of_ttl_left_and_keeps_rank_on_ties():
+    requests = [
+        {"function": "GLOBAL_QUOTE", "symbol": "IBM"},
+        {"function": "OVERVIEW", "symbol": "IBM"},
+        {"function": "GLOBAL_QUOTE", "symbol": "AAPL"},
+        {"function": "OVERVIEW", "symbol": "AAPL"},
+        {"function": "GLOBAL_QUOTE", "symbol": "MSFT"},
+    ]
+    ttls = {"GLOBAL_QUOTE": 60.0, "OVERVIEW": 86400.0}
+    # 30s of a 60s quote is half its TTL; 4320s of a day is 5%
+    remaining = [30.0, 4320.0, None, 80000.0, None]
+    due = plan(requests, remaining, ttls, refresh_ahead=0.2)
+    assert [(params["function"], params["symbol"]) for params in due] == [
+        ("GLOBAL_QUOTE", "AAPL"), ("GLOBAL_QUOTE", "MSFT"), ("OVERVIEW", "IBM"),
+    ]
@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta
+import numpy as np
+from starlette.requests import Request
+from app.api.api_v1.endpoints import stocks
+from app.core.http_cache import make_etag
+from app.services.price_history import (
+    decimate, downsample, lttb_indices, minmax_indices, parse_daily_adjusted, price_history
+)
+from app.services.stock_store import decode_dates, decode_values, encode_dates, encode_values
+
+def _payload(days):
+    return {"Time Series (Daily)": {
+        day: {
+            "1. open": "10.0", "2. high": "11.5", "3. low": "9.5", "4. close": str(10 + i),
+            "5. adjusted close": str(10 + i), "6. volume": "1000",
+            "7. dividend amount": "0.0000", "8. split coefficient": "1.0",
+        }
+        for i, day in enumerate(days)
+    }}
+
+def test_bucket_codec_round_trips_dates_and_values():
+    dates = np.array(["2026-01-02", "2026-01-05", "2026-01-06", "2026-02-02"], dtype="datetime64[D]")
+    values = np.array([101.25, np.nan, 99.0, 1e-9])
+    assert (decode_dates(encode_dates(dates)) == dates).all()
+    np.testing.assert_array_equal(decode_values(encode_values(values), len(values)), values)
+
+def test_parse_sorts_oldest_first_and_keeps_gaps():
+    payload = _payload(["2026-01-06", "2026-01-02", "2026-01-05"])
+    del payload["Time Series (Daily)"]["2026-01-05"]["2. high"]
+    series = parse_daily_adjusted(payload)
+    assert series["dates"].astype(str).tolist() == ["2026-01-02", "2026-01-05", "2026-01-06"]
+    assert series["close"].tolist() == [11.0, 12.0, 10.0]
+    assert np.isnan(series["high"][1])
+    assert len(parse_daily_adjusted({})["dates"]) == 0
+
+def test_weekly_rollup_is_dated_by_the_last_trading_day():
+    # Thursday and Friday of one week, then Monday to Wednesday of the next
+    days = ["2026-01-01", "2026-01-02", "2026-01-05", "2026-01-06", "2026-01-07"]
+    weekly = downsample(parse_daily_adjusted(_payload(days)), "weekly")
+    assert weekly["dates"].astype(str).tolist() == ["2026-01-02", "2026-01-07"]
+    assert weekly["close"].tolist() == [11.0, 14.0]
+    assert weekly["volume"].tolist() == [2000.0, 3000.0]
+
+def _request(headers):
+    raw = [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": raw})
+
+def test_revalidation_of_fresh_bars_skips_the_sync(monkeypatch):
+    state = {"symbol": "IBM", "version": 3, "synced_at": datetime.utcnow()}
+    calls = []
+    async def fake_state(symbol):
+        return state
+    async def fake_sync(symbol):
+        calls.append(symbol)
+        return state
+    monkeypatch.setattr(price_history, "state", fake_state)
+    monkeypatch.setattr(price_history, "sync", fake_sync)
+
+    etag = make_etag("historical", "IBM", 3, None, None, "daily", "compact", None, "lttb", None)
+    request = _request({"If-None-Match": etag})
+    response = asyncio.run(stocks.get_historical_data(
+        "ibm", request, None, None, "daily", "compact", None, "lttb", current_user=None
+    ))
+    assert response.status_code == 304
+    assert calls == []
+
+    state["synced_at"] = datetime.utcnow() - timedelta(days=1)
+    response = asyncio.run(stocks.get_historical_data(
+        "ibm", request, None, None, "daily", "compact", None, "lttb", current_user=None
+    ))
+    assert response.status_code == 304
+    assert calls == ["IBM"]
+
+def _series(n, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64("2020-01-01"), np.datetime64("2020-01-01") + n)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return {"dates": dates, "close": close, "volume": np.arange(n, dtype=float)}
+
+def test_lttb_keeps_the_ends_and_at_most_max_points():
+    series = _series(1000)
+    thinned = decimate(series, 50)
+    assert len(thinned["dates"]) <= 50
+    assert thinned["dates"][0] == series["dates"][0] and thinned["dates"][-1] == series["dates"][-1]
+    assert (np.diff(thinned["dates"].astype(np.int64)) > 0).all()
+    # Whole bars are kept, so every column stays aligned with its date
+    assert (thinned["volume"] == (thinned["dates"] - series["dates"][0]).astype(float)).all()
+
+def test_lttb_indices_keep_a_lone_spike():
+    y = np.zeros(500)
+    y[237] = 50.0
+    assert 237 in lttb_indices(np.arange(500, dtype=float), y, 20)
+
+def test_minmax_keeps_each_buckets_extremes():
+    series = _series(400)
+    keep = minmax_indices(series["close"], 40)
+    assert len(keep) <= 40
+    assert series["close"].argmax() in keep and series["close"].argmin() in keep
+
+def test_short_series_are_returned_whole():
+    series = _series(10)
+    assert decimate(series, 50) is series
+    assert len(lttb_indices(np.arange(10.0), series["close"], 50)) == 10
@@ -0,0 +1,24 @@
+import pytest
+
+from app.core.profiling import RequestProfilerMiddleware
+
+
+async def _app(scope, receive, send):
+    pass
+
+
+def _scope(path, headers):
+    return {"type": "http", "path": path, "headers": headers}
+
+
+def test_empty_token_is_refused():
+    with pytest.raises(ValueError):
+        RequestProfilerMiddleware(_app, token="", routes=["/api"], interval=0.01)
+
+
+def test_only_the_exact_token_on_a_listed_route_profiles():
+    middleware = RequestProfilerMiddleware(_app, token="s3cret", routes=["/api"], interval=0.01)
+    assert middleware._wants_profile(_scope("/api/v1/stocks", [(b"x-profile", b"s3cret")]))
+    assert not middleware._wants_profile(_scope("/api/v1/stocks", [(b"x-profile", b"s3cre")]))
+    assert not middleware._wants_profile(_scope("/api/v1/stocks", []))
+    assert not middleware._wants_profile(_scope("/health", [(b"x-profile", b"s3cret")]))
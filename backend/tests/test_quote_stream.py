@@ -0,0 +1,38 @@
+import asyncio
+from app.services.quote_stream import QuoteHub, QuoteSubscriber
+
+async def _source(symbol):
+    return {"symbol": symbol, "price": 1.0}
+
+async def _send(message):
+    pass
+
+def test_one_poller_per_symbol_stopped_with_last_subscriber():
+    async def scenario():
+        hub = QuoteHub(_source, interval=60, max_symbols=10)
+        first, second = QuoteSubscriber(_send), QuoteSubscriber(_send)
+        hub.subscribe(first, ["AAPL", "MSFT"])
+        hub.subscribe(second, ["AAPL"])
+        assert sorted(hub.symbols) == ["AAPL", "MSFT"]
+        hub.unsubscribe(first)
+        assert hub.symbols == ["AAPL"]
+        hub.unsubscribe(second)
+        assert hub.symbols == []
+        await hub.close()
+    asyncio.run(scenario())
+
+def test_global_symbol_cap_refuses_new_pollers_only():
+    async def scenario():
+        hub = QuoteHub(_source, interval=60, max_symbols=2)
+        first, second = QuoteSubscriber(_send), QuoteSubscriber(_send)
+        assert hub.subscribe(first, ["A", "B", "C"]) == ["C"]
+        # Joining a symbol that is already polled costs no upstream calls
+        assert hub.subscribe(second, ["B", "D"]) == ["D"]
+        assert sorted(second.symbols) == ["B"]
+        hub.unsubscribe(first, ["A"])
+        assert hub.subscribe(second, ["D"]) == []
+        # Retained symbols are counted but never refused
+        hub.retain(["E"])
+        assert sorted(hub.symbols) == ["B", "D", "E"]
+        await hub.close()
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+import asyncio
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.services import risk
+from app.services.risk import ReturnsMatrix, RiskService, correlation_matrix, risk_metrics
+
+def _closes(rows, columns, seed=7):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (rows, columns)), axis=0))
+
+def test_benchmark_only_universe_has_a_2d_covariance():
+    days = np.arange(np.datetime64("2026-01-01"), np.datetime64("2026-03-01"))
+    matrix = ReturnsMatrix(["SPY"], days, _closes(len(days), 1))
+    assert matrix.covariance.shape == (1, 1)
+    metrics = risk_metrics(matrix.returns, matrix.covariance, matrix.weights([{"holdings": {"SPY": 10}}]), 0, 0.04, 0.95)
+    assert metrics["beta"][0] == pytest.approx(1.0)
+    assert metrics["volatility"][0] > 0
+
+def test_metrics_are_vectorized_over_portfolios():
+    returns = np.diff(np.log(_closes(120, 2)), axis=0)
+    weights = np.array([[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]])
+    metrics = risk_metrics(returns, np.cov(returns, rowvar=False), weights, 0, 0.0, 0.95)
+    assert metrics["beta"][0] == pytest.approx(1.0)
+    assert metrics["volatility"][0] == pytest.approx(returns[:, 0].std(ddof=1) * np.sqrt(252))
+    assert all(len(values) == 3 for values in metrics.values())
+    assert (metrics["cvar"] >= metrics["var"]).all()
+
+def test_correlation_has_unit_diagonal():
+    returns = np.diff(np.log(_closes(60, 3)), axis=0)
+    correlation = correlation_matrix(np.cov(returns, rowvar=False), [0, 2])
+    assert np.diag(correlation) == pytest.approx([1.0, 1.0])
+
+def test_portfolio_holding_only_the_benchmark(monkeypatch):
+    async def load_daily_closes(symbols, days):
+        return _closes(len(days), len(symbols))
+    monkeypatch.setattr(risk, "load_daily_closes", load_daily_closes)
+    service = RiskService()
+    portfolio = {"user_id": "u", "holdings": {settings.RISK_BENCHMARK_SYMBOL: 5}, "cash_balance": 100.0}
+    result = asyncio.run(service.portfolio_risk([portfolio]))["u"]
+    assert result["correlation"]["matrix"] == [[pytest.approx(1.0)]]
+    # Cash dilutes the position, so beta is the benchmark weight
+    assert 0 < result["beta"] < 1
+
+def test_result_cache_is_bounded(monkeypatch):
+    async def load_daily_closes(symbols, days):
+        return _closes(len(days), len(symbols))
+    monkeypatch.setattr(risk, "load_daily_closes", load_daily_closes)
+    monkeypatch.setattr(settings, "RISK_RESULT_CACHE_MAX_ENTRIES", 3)
+    service = RiskService()
+    portfolios = [{"user_id": f"u{i}", "holdings": {"AAPL": i + 1}, "cash_balance": 0.0} for i in range(10)]
+    asyncio.run(service.portfolio_risk(portfolios))
+    assert len(service._results) == 3
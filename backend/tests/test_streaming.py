@@ -0,0 +1,50 @@
+import asyncio
+from typing import Optional
+import pyarrow as pa
+import pytest
+from pydantic import BaseModel
+from app.core.streaming import _arrow_stream, arrow_schema
+
+class Row(BaseModel):
+    symbol: str
+    price: Optional[float] = None
+    note: Optional[str] = None
+    volume: Optional[int] = None
+
+async def _batches(batches):
+    for batch in batches:
+        yield batch
+
+def read_stream(batches, schema=None) -> pa.Table:
+    async def collect():
+        return b"".join([chunk async for chunk in _arrow_stream(_batches(batches), schema)])
+    return pa.ipc.open_stream(asyncio.run(collect())).read_all()
+
+NULL_FIRST = [[{"symbol": "A", "note": None}], [{"symbol": "B", "note": "split"}]]
+INT_THEN_FLOAT = [[{"symbol": "A", "price": 12}], [{"symbol": "B", "price": 12.5}]]
+LATE_COLUMN = [[{"symbol": "A"}], [{"symbol": "B", "price": 3.25}]]
+
+@pytest.mark.parametrize("schema", [None, arrow_schema(Row)], ids=["inferred", "declared"])
+def test_null_first_column_takes_later_values(schema):
+    table = read_stream(NULL_FIRST, schema)
+    assert table.column("note").to_pylist() == [None, "split"]
+
+@pytest.mark.parametrize("schema", [None, arrow_schema(Row)], ids=["inferred", "declared"])
+def test_int_then_float_is_not_truncated(schema):
+    table = read_stream(INT_THEN_FLOAT, schema)
+    assert table.schema.field("price").type == pa.float64()
+    assert table.column("price").to_pylist() == [12.0, 12.5]
+
+@pytest.mark.parametrize("schema", [None, arrow_schema(Row)], ids=["inferred", "declared"])
+def test_late_column_is_kept(schema):
+    table = read_stream(LATE_COLUMN, schema)
+    assert table.column("price").to_pylist() == [None, 3.25]
+
+def test_declared_schema_drops_unlisted_columns_and_keeps_types():
+    table = read_stream([[{"symbol": "A", "volume": 10, "extra": {"nested": 1}}]], arrow_schema(Row))
+    assert table.schema.names == ["symbol", "price", "note", "volume"]
+    assert table.schema.field("volume").type == pa.int64()
+
+def test_empty_stream_is_valid():
+    assert read_stream([], arrow_schema(Row)).num_rows == 0
+    assert read_stream([]).num_rows == 0
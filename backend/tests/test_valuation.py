@@ -0,0 +1,46 @@
+import asyncio
+from app.db.mongodb import mongodb
+from app.services.quote_stream import QuoteHub
+from app.services.valuation import ValuationService
+
+async def _source(symbol):
+    return {"symbol": symbol, "price": 10.0}
+
+class Portfolios:
+    """Collection double that records bulk writes and can run a hook mid-write"""
+    def __init__(self, during_write=None):
+        self.during_write = during_write
+        self.writes = []
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.during_write is not None:
+            self.during_write()
+        self.writes.append(operations)
+
+def test_ticks_adjust_value_by_price_change_times_quantity():
+    async def scenario():
+        service = ValuationService(QuoteHub(_source, interval=60))
+        valuation = await service.activate({"user_id": "u", "cash_balance": 100.0, "holdings": {"A": 3, "B": 0}})
+        assert valuation.total_value == 130.0
+        service.on_tick({"symbol": "A", "price": 12.0})
+        assert valuation.total_value == 136.0
+        await service.refresh_positions({"user_id": "u", "cash_balance": 76.0, "holdings": {"A": 5}})
+        assert valuation.total_value == 136.0 and valuation.holdings == {"A": 5}
+        await service.hub.close()
+    asyncio.run(scenario())
+
+def test_tick_during_snapshot_write_stays_dirty(monkeypatch):
+    async def scenario():
+        service = ValuationService(QuoteHub(_source, interval=60))
+        valuation = await service.activate({"user_id": "u", "cash_balance": 0.0, "holdings": {"A": 1}})
+        service.on_tick({"symbol": "A", "price": 11.0})
+        portfolios = Portfolios(lambda: service.on_tick({"symbol": "A", "price": 12.0}))
+        monkeypatch.setattr(mongodb, "get_collection", lambda name: portfolios)
+        assert await service.snapshot() == 1
+        assert valuation.dirty
+        portfolios.during_write = None
+        assert await service.snapshot() == 1
+        assert not valuation.dirty
+        assert portfolios.writes[-1][0]._doc["$set"]["total_value"] == 12.0
+        await service.hub.close()
+    asyncio.run(scenario())